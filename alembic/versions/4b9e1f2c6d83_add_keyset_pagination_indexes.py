@@ -0,0 +1,30 @@
+"""add keyset pagination indexes
+
+Revision ID: 4b9e1f2c6d83
+Revises: e2a7c5d8f610
+Create Date: 2026-10-17 23:12:30.662817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b9e1f2c6d83'
+down_revision: Union[str, Sequence[str], None] = 'e2a7c5d8f610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_images_upload_date_id', 'images', ['upload_date', 'id'], unique=False)
+    op.create_index('ix_events_created_at_id', 'events', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_created_at_id', table_name='events')
+    op.drop_index('ix_images_upload_date_id', table_name='images')
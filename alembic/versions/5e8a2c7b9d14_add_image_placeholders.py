@@ -0,0 +1,31 @@
+"""add image placeholders
+
+Revision ID: 5e8a2c7b9d14
+Revises: c47d1e9f3a25
+Create Date: 2026-10-17 18:22:51.907346
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8a2c7b9d14'
+down_revision: Union[str, Sequence[str], None] = 'c47d1e9f3a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows are filled by `python -m app.commands.backfill_image_placeholders`
+    op.add_column('images', sa.Column('placeholder', sa.Text(), nullable=True))
+    op.add_column('images', sa.Column('dominant_color', sa.String(length=7), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('images', 'dominant_color')
+    op.drop_column('images', 'placeholder')
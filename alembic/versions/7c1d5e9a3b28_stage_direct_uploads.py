@@ -0,0 +1,28 @@
+"""stage direct uploads
+
+Revision ID: 7c1d5e9a3b28
+Revises: 4b9e1f2c6d83
+Create Date: 2026-10-18 10:14:52.408316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d5e9a3b28'
+down_revision: Union[str, Sequence[str], None] = '4b9e1f2c6d83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('upload_sessions', sa.Column('finalized_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('upload_sessions', 'finalized_at')
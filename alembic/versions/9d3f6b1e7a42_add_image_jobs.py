@@ -0,0 +1,49 @@
+"""add image jobs
+
+Revision ID: 9d3f6b1e7a42
+Revises: 5e8a2c7b9d14
+Create Date: 2026-10-17 20:41:09.318264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f6b1e7a42'
+down_revision: Union[str, Sequence[str], None] = '5e8a2c7b9d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('images', sa.Column('status', sa.String(), server_default='ready', nullable=False))
+    op.create_index(op.f('ix_images_status'), 'images', ['status'], unique=False)
+    op.create_table(
+        'image_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('image_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('source_key', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['image_id'], ['images.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('image_id'),
+    )
+    op.create_index('ix_image_jobs_status_run_after', 'image_jobs', ['status', 'run_after'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_image_jobs_status_run_after', table_name='image_jobs')
+    op.drop_table('image_jobs')
+    op.drop_index(op.f('ix_images_status'), table_name='images')
+    op.drop_column('images', 'status')
@@ -0,0 +1,58 @@
+"""deduplicate image content
+
+Revision ID: c47d1e9f3a25
+Revises: 8b2e4f6a1c3d
+Create Date: 2026-10-17 16:41:08.306127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d1e9f3a25'
+down_revision: Union[str, Sequence[str], None] = '8b2e4f6a1c3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('images', sa.Column('content_hash', sa.String(), nullable=True))
+    op.add_column('images', sa.Column('perceptual_hash', sa.String(), nullable=True))
+    op.create_index(op.f('ix_images_content_hash'), 'images', ['content_hash'], unique=False)
+    op.create_index(op.f('ix_images_perceptual_hash'), 'images', ['perceptual_hash'], unique=False)
+
+    # Duplicates share storage keys
+    op.drop_constraint('images_uploadthing_key_key', 'images', type_='unique')
+    op.create_index(op.f('ix_images_uploadthing_key'), 'images', ['uploadthing_key'], unique=False)
+    op.drop_constraint('image_variants_storage_key_key', 'image_variants', type_='unique')
+    op.create_index(op.f('ix_image_variants_storage_key'), 'image_variants', ['storage_key'], unique=False)
+
+    op.create_table(
+        'image_blobs',
+        sa.Column('storage_key', sa.String(), nullable=False),
+        sa.Column('content_hash', sa.String(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('storage_key'),
+    )
+    op.create_index(op.f('ix_image_blobs_content_hash'), 'image_blobs', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_image_blobs_content_hash'), table_name='image_blobs')
+    op.drop_table('image_blobs')
+
+    op.drop_index(op.f('ix_image_variants_storage_key'), table_name='image_variants')
+    op.create_unique_constraint('image_variants_storage_key_key', 'image_variants', ['storage_key'])
+    op.drop_index(op.f('ix_images_uploadthing_key'), table_name='images')
+    op.create_unique_constraint('images_uploadthing_key_key', 'images', ['uploadthing_key'])
+
+    op.drop_index(op.f('ix_images_perceptual_hash'), table_name='images')
+    op.drop_index(op.f('ix_images_content_hash'), table_name='images')
+    op.drop_column('images', 'perceptual_hash')
+    op.drop_column('images', 'content_hash')
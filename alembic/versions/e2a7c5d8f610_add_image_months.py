@@ -0,0 +1,56 @@
+"""add image months
+
+Revision ID: e2a7c5d8f610
+Revises: 9d3f6b1e7a42
+Create Date: 2026-10-17 22:05:44.170392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c5d8f610'
+down_revision: Union[str, Sequence[str], None] = '9d3f6b1e7a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'image_months',
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('image_count', sa.Integer(), nullable=False),
+        sa.Column('cover_image_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('cover_upload_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('year', 'month'),
+    )
+    # Same as `python -m app.commands.rebuild_image_months`
+    op.execute("""
+        INSERT INTO image_months (year, month, image_count, cover_image_id, cover_upload_date)
+        SELECT year, month, image_count, id, upload_date
+        FROM (
+            SELECT
+                CAST(EXTRACT(year FROM date_trunc('month', upload_date AT TIME ZONE 'UTC')) AS INTEGER) AS year,
+                CAST(EXTRACT(month FROM date_trunc('month', upload_date AT TIME ZONE 'UTC')) AS INTEGER) AS month,
+                count(*) OVER w AS image_count,
+                row_number() OVER (w ORDER BY upload_date DESC, id DESC) AS rank,
+                id,
+                upload_date
+            FROM images
+            WHERE status = 'ready'
+            WINDOW w AS (PARTITION BY date_trunc('month', upload_date AT TIME ZONE 'UTC'))
+        ) AS ranked
+        WHERE rank = 1
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('image_months')
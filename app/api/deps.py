@@ -0,0 +1,8 @@
+from fastapi import Request
+
+from app.services.storage_service import StorageBackend
+
+
+def get_storage(request: Request) -> StorageBackend:
+    """Return the process-wide storage client created in the app lifespan."""
+    return request.app.state.storage
@@ -1,12 +1,16 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.serialization import dump_json
+from app.db.routing import get_read_db
 from app.db.session import get_db
 from app.schemas.event import Event, EventCreate, EventUpdate
-from app.services.event_service import EventService
+from app.services.event_service import EVENTS_TAG, EventService, event_tag
+from app.services.response_cache_service import response_cache
 
 router = APIRouter()
 
@@ -20,23 +24,44 @@ async def create_event(
 
 @router.get("/", response_model=List[Event])
 async def read_events(
-    skip: int = 0,
-    limit: int = 20,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    limit: int = Query(20, ge=1),
+    cursor: Optional[str] = Query(None, description=f"The {NEXT_CURSOR_HEADER} header of the previous page"),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True, description="Offset paging; use `cursor` instead"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    service = EventService(db)
-    return await service.get_events(skip=skip, limit=limit)
+    """
+    Get a page of events, newest first. The next page's cursor is returned
+    in the `X-Next-Cursor` header, which is absent on the last page.
+    Responses are cached and carry an ETag for conditional requests.
+    """
+    async def build():
+        service = EventService(db)
+        if skip is not None:
+            events = await service.get_events(skip=skip, limit=limit)
+            return dump_json(events), {"Deprecation": "true"}
+        try:
+            events, next_cursor = await service.get_events_page(limit=limit, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+        return dump_json(events), headers
+
+    return await response_cache.respond(request, [EVENTS_TAG], build)
 
 @router.get("/{event_id}", response_model=Event)
 async def read_event(
     event_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    service = EventService(db)
-    event = await service.get_event(event_id)
-    if not event:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-    return event
+    async def build():
+        event = await EventService(db).get_event(event_id)
+        if not event:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+        return Event.model_validate(event).model_dump_json().encode(), {}
+
+    return await response_cache.respond(request, [event_tag(event_id)], build)
 
 @router.put("/{event_id}", response_model=Event)
 async def update_event(
@@ -1,85 +1,270 @@
-from typing import Dict, List
+import asyncio
+from typing import Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_storage
+from app.core.config import settings
+from app.core.http import RangeNotSatisfiable, format_http_date, is_not_modified, parse_range
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.serialization import dump_json
+from app.core.spool import PayloadTooLarge
+from app.db.routing import get_read_db
 from app.db.session import get_db
-from app.schemas.image import Image, ImageUpdate, GroupedImagesResponse
-from app.services.image_db_service import ImageService
-from app.services.image_service import ImageProcessor
-from app.services.storage_service import StorageService
+from app.schemas.image import (
+    BatchUploadItem, BatchUploadResponse, Image, ImageStatus, ImageUpdate, GroupedImagesResponse,
+    TimelineMonth, TimelineResponse, TimelineYear,
+)
+from app.services.image_db_service import IMAGES_TAG, MONTH_NAMES, READY, ImageService
+from app.services.image_job_service import ImageJobService
+from app.services.image_processing_service import ImageProcessingBusy
+from app.services.image_service import negotiate_image_types
+from app.services.image_upload_service import ImageStorageError, ImageUploadService, StoredImage
+from app.services.response_cache_service import response_cache
+from app.services.storage_service import DownloadLink, StorageBackend
 
 router = APIRouter()
 
-@router.post("/", response_model=Image, status_code=status.HTTP_201_CREATED)
+def _upload_error(e: BaseException) -> HTTPException:
+    """The HTTP error reported for a failed upload."""
+    if isinstance(e, PayloadTooLarge):
+        return HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(e))
+    if isinstance(e, ValueError):
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if isinstance(e, ImageProcessingBusy):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"},
+        )
+    import traceback
+    traceback.print_exception(e)
+    detail = str(e) if isinstance(e, ImageStorageError) else f"Failed to upload image: {str(e)}"
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
+
+@router.post(
+    "/",
+    response_model=Image,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": Image, "description": "Accepted for background processing"}},
+)
 async def upload_image(
+    response: Response,
     file: UploadFile = File(...),
     description: str = Form(...),
-    db: AsyncSession = Depends(get_db)
+    run_async: Optional[bool] = Query(
+        None,
+        alias="async",
+        description="Process in the background and answer 202 with a pending image (default: IMAGE_UPLOAD_ASYNC)",
+    ),
+    db: AsyncSession = Depends(get_db),
+    storage_service: StorageBackend = Depends(get_storage)
 ):
-    # 1. Process Image
-    try:
-        content = await file.read()
-        processed_file, width, height, fmt = ImageProcessor.process_image(content)
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if settings.IMAGE_UPLOAD_ASYNC if run_async is None else run_async:
+        # Store the raw upload and leave processing to the job workers;
+        # poll GET /images/{id}/status until it is ready
+        try:
+            image = await ImageJobService(db, storage_service).enqueue_upload(file, description)
+        except (PayloadTooLarge, ValueError, ImageProcessingBusy, ImageStorageError) as e:
+            raise _upload_error(e)
+        if image.status != READY:
+            response.status_code = status.HTTP_202_ACCEPTED
+        return image
 
-    # 2. Upload to B2
-    storage_service = StorageService()
+    # Process the image and upload it with its variants (or reuse a duplicate's)
+    uploads = ImageUploadService(storage_service, db)
     try:
-        # We need to pass the processed file content. 
-        # Since StorageService expects a file-like object,
-        # we pass the BytesIO object.
-        filename = f"{file.filename.split('.')[0]}.{fmt.lower()}"
-        # StorageService is synchronous (boto3)
-        upload_res = storage_service.upload_file(processed_file, filename)
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to upload image: {str(e)}")
-
-    # 3. Save Metadata to DB
-    image_data = {
-        "description": description,
-        "image_url": upload_res["url"],
-        "uploadthing_key": upload_res["key"], # We keep the column name for now, but it stores B2 key
-        "file_size": processed_file.getbuffer().nbytes,
-        "mime_type": f"image/{fmt.lower()}",
-        "width": width,
-        "height": height
-    }
-    
+        stored = await uploads.store(file, description)
+    except (PayloadTooLarge, ValueError, ImageProcessingBusy, ImageStorageError) as e:
+        raise _upload_error(e)
+
+    # Save Metadata to DB
     db_service = ImageService(db)
-    return await db_service.create_image(image_data)
+    try:
+        return await db_service.create_image(stored.image_data, stored.variants, claimed=stored.claimed)
+    except Exception:
+        await db.rollback()
+        await uploads.discard(stored)
+        raise
+
+@router.post("/batch", response_model=BatchUploadResponse)
+async def upload_images_batch(
+    files: List[UploadFile] = File(...),
+    descriptions: List[str] = Form(..., description="One per file, in order, or a single one for all files"),
+    db: AsyncSession = Depends(get_db),
+    storage_service: StorageBackend = Depends(get_storage)
+):
+    """
+    Upload many images at once, e.g. an event album.
+    Files are processed and stored concurrently (``IMAGE_BATCH_CONCURRENCY``
+    at a time) and all rows are inserted in one transaction. Every item
+    reports its own outcome, so one bad file does not fail the batch.
+    """
+    if len(files) > settings.IMAGE_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.IMAGE_BATCH_MAX_FILES} files per batch",
+        )
+    if len(descriptions) == 1:
+        descriptions = descriptions * len(files)
+    elif len(descriptions) != len(files):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Send one description per file, or a single description for all files",
+        )
+
+    uploads = ImageUploadService(storage_service, db)
+    semaphore = asyncio.Semaphore(settings.IMAGE_BATCH_CONCURRENCY)
+
+    async def store(file: UploadFile, description: str) -> StoredImage:
+        async with semaphore:
+            return await uploads.store(file, description)
+
+    results = await asyncio.gather(
+        *(store(file, description) for file, description in zip(files, descriptions)),
+        return_exceptions=True,
+    )
+    stored = [result for result in results if isinstance(result, StoredImage)]
+    try:
+        images = await ImageService(db).create_images(
+            [(item.image_data, item.variants, item.claimed) for item in stored]
+        )
+    except Exception:
+        await db.rollback()
+        for item in stored:
+            await uploads.discard(item)
+        raise
+
+    created = iter(images)
+    items = []
+    for index, (file, result) in enumerate(zip(files, results)):
+        if isinstance(result, StoredImage):
+            items.append(BatchUploadItem(
+                index=index,
+                filename=file.filename,
+                status_code=status.HTTP_201_CREATED,
+                image=Image.model_validate(next(created)),
+            ))
+        else:
+            error = _upload_error(result)
+            items.append(BatchUploadItem(
+                index=index,
+                filename=file.filename,
+                status_code=error.status_code,
+                error=error.detail,
+            ))
+    return BatchUploadResponse(created=len(images), failed=len(files) - len(images), items=items)
 
 @router.get("/", response_model=List[Image])
 async def read_images(
-    skip: int = 0,
-    limit: int = 20,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    limit: int = Query(20, ge=1),
+    cursor: Optional[str] = Query(None, description=f"The {NEXT_CURSOR_HEADER} header of the previous page"),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True, description="Offset paging; use `cursor` instead"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Get a paginated list of all images, ordered by upload date (newest first)
+    Get a page of images, ordered by upload date (newest first).
+    The next page's cursor is returned in the `X-Next-Cursor` header,
+    which is absent on the last page.
+    Responses are cached and carry an ETag for conditional requests.
     """
-    service = ImageService(db)
-    return await service.get_images(skip=skip, limit=limit)
+    async def build():
+        service = ImageService(db)
+        if skip is not None:
+            images = await service.get_images(skip=skip, limit=limit)
+            return dump_json(images), {"Deprecation": "true"}
+        try:
+            images, next_cursor = await service.get_images_page(limit=limit, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+        return dump_json(images), headers
+
+    return await response_cache.respond(request, [IMAGES_TAG], build)
 
 @router.get("/grouped", response_model=GroupedImagesResponse)
 async def read_images_grouped(
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    year: Optional[int] = Query(None, ge=1900, le=9999, description="Only this year"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Only this month of `year`"),
+    months: Optional[int] = Query(None, ge=1, le=120, description="Return at most this many months"),
+    per_month: Optional[int] = Query(None, ge=1, le=500, description="Return at most this many images per month"),
+    cursor: Optional[str] = Query(None, description="A `next_cursor` from an earlier response"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get images grouped by year and month, newest first.
+    Use `months` and `per_month` to load the gallery lazily: the top-level
+    `next_cursor` loads older months, a month's `next_cursor` more of its images.
+    Responses are cached and carry an ETag for conditional requests.
+    """
+    if month is not None and year is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="month requires year")
+
+    async def build():
+        service = ImageService(db)
+        try:
+            grouped = await service.get_images_grouped_by_year_month(
+                year=year, month=month, months=months, per_month=per_month, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return dump_json(grouped), {}
+
+    return await response_cache.respond(request, [IMAGES_TAG], build)
+
+@router.get("/timeline", response_model=TimelineResponse)
+async def read_image_timeline(
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Get all images grouped by year and month
+    Years and months that have images, with counts and a cover image, for
+    gallery navigation. Read from a per-month summary, so it costs the same
+    however many images there are.
     """
     service = ImageService(db)
-    result = await service.get_images_grouped_by_year_month()
-    return result
+    years: List[TimelineYear] = []
+    for row in await service.get_timeline():
+        if not years or years[-1].year != row.year:
+            years.append(TimelineYear(year=row.year, image_count=0, months=[]))
+        years[-1].image_count += row.image_count
+        years[-1].months.append(TimelineMonth(
+            month=row.month,
+            name=MONTH_NAMES[row.month - 1],
+            image_count=row.image_count,
+            cover_image_id=row.cover_image_id,
+            updated_at=row.updated_at,
+        ))
+    return TimelineResponse(years=years)
+
+@router.get("/{image_id}/status", response_model=ImageStatus)
+async def read_image_status(
+    image_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    storage_service: StorageBackend = Depends(get_storage)
+):
+    """
+    Processing status of an image uploaded with ``?async=true``.
+    """
+    found = await ImageJobService(db, storage_service).get_status(image_id)
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    image, job = found
+    return ImageStatus(
+        id=image.id,
+        status=image.status,
+        attempts=job.attempts if job else 0,
+        error=job.last_error if job else None,
+    )
 
 @router.get("/{image_id}", response_model=Image)
 async def read_image(
     image_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     service = ImageService(db)
     image = await service.get_image(image_id)
@@ -102,52 +287,145 @@ async def update_image(
 @router.delete("/{image_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_image(
     image_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    storage_service: StorageBackend = Depends(get_storage)
 ):
     service = ImageService(db)
-    # Get key before deleting from DB
-    image = await service.get_image(image_id)
-    if not image:
+    # Delete from DB; the files stay while duplicates of the image still use them
+    keys = await service.delete_image(image_id)
+    if keys is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
     
-    key = image.uploadthing_key
-    
-    # Delete from DB
-    await service.delete_image(image_id)
-    
     # Delete from B2
-    storage_service = StorageService()
-    storage_service.delete_file(key)
+    await asyncio.gather(*(storage_service.delete(key) for key in keys))
+
+async def _redirect_to_storage(storage_service: StorageBackend, file_key: str) -> Optional[RedirectResponse]:
+    """
+    Send the client straight to storage (or the CDN) according to
+    IMAGE_SERVE_MODE. Returns None to fall back to proxying the bytes.
+    """
+    if settings.IMAGE_SERVE_MODE == "redirect" and settings.IMAGE_PUBLIC_BASE_URL:
+        link = DownloadLink(f"{settings.IMAGE_PUBLIC_BASE_URL.rstrip('/')}/{file_key}")
+    else:
+        try:
+            link = await storage_service.download_link(
+                file_key, signed=settings.IMAGE_SERVE_MODE == "signed"
+            )
+        except Exception as e:
+            print(f"Failed to create download link, proxying instead: {e}")
+            return None
+    if link is None:
+        return None
+
+    if link.expires_in is None:
+        # Keys are immutable, so the redirect target never changes
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        # Stop handing out the link a minute before its token expires
+        cache_control = f"public, max-age={max(0, link.expires_in - 60)}"
+    return RedirectResponse(
+        link.url,
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        headers={"Cache-Control": cache_control},
+    )
 
 @router.get("/serve/{file_key}", response_class=Response)
 async def serve_image(
     file_key: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, description="Serve the narrowest variant at least this wide"),
+    db: AsyncSession = Depends(get_read_db),
+    storage_service: StorageBackend = Depends(get_storage)
 ):
     """
     Serve an image by its file key.
-    This endpoint acts as a proxy to serve images from Backblaze B2.
+    This endpoint acts as a streaming proxy to serve images from Backblaze B2.
+    Supports conditional GETs (ETag / Last-Modified) and single byte ranges.
+    With ``?w=`` a resized variant is served when one is wide enough, and
+    WebP/AVIF copies are served to clients whose Accept header lists them.
+    A variant's own key serves that variant as is.
     """
-    # Verify the image exists in our database
+    # Verify the image exists in our database (usually answered from cache)
     image_service = ImageService(db)
-    image = await image_service.get_image_by_key(file_key)
+    image = await image_service.get_image_metadata_by_key(file_key)
     
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
-    
+
+    if file_key == image.key:
+        # Pick size and format; the response varies with the Accept header
+        selected = image.pick(w, negotiate_image_types(request.headers.get("accept")))
+    else:
+        # A variant's own URL (as listed in ``srcset``) names one exact rendition
+        selected = image.rendition(file_key)
+    storage_key = selected.key
+
+    if settings.IMAGE_SERVE_MODE != "proxy":
+        redirect = await _redirect_to_storage(storage_service, storage_key)
+        if redirect is not None:
+            redirect.headers["Vary"] = "Accept"
+            return redirect
+
+    # Keys are immutable, so the key itself identifies the bytes
+    etag = f'"{storage_key}"'
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",  # Cache for 1 year
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept",
+    }
+    if image.upload_date:
+        headers["Last-Modified"] = format_http_date(image.upload_date)
+
+    # Revalidation never touches storage
+    if is_not_modified(
+        etag,
+        image.upload_date,
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    size = selected.file_size
+    content_type = selected.mime_type
+    if size is None or content_type is None:
+        info = await storage_service.stat(storage_key)
+        if info is None:
+            raise HTTPException(status_code=404, detail="Image not found")
+        size, content_type = info.size, info.content_type
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            raise HTTPException(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+
     # Get the image from B2
-    storage_service = StorageService()
     try:
-        file_content, content_type = storage_service.download_file(file_key)
-        
-        # Return the image data with appropriate headers
-        return Response(
-            content=file_content,
-            media_type=content_type,
-            headers={"Cache-Control": "public, max-age=31536000"}  # Cache for 1 year
-        )
+        chunks = await storage_service.open_stream(storage_key, byte_range)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve image: {str(e)}"
         )
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(chunks, media_type=content_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        chunks,
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=content_type,
+        headers=headers,
+    )
@@ -0,0 +1,42 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_storage
+from app.core.compression import compression_stats
+from app.core.singleflight import singleflight_stats
+from app.db.pool import pool_snapshot
+from app.db.routing import database_router
+from app.db.session import engine
+from app.services.image_job_service import image_job_stats
+from app.services.image_processing_service import image_processing_pool
+from app.services.image_upload_service import upload_stats
+from app.services.metadata_cache_service import image_key_filter, image_metadata_cache
+from app.services.response_cache_service import response_cache
+from app.services.storage_service import StorageBackend, large_file_upload_stats
+from app.services.upload_session_service import upload_session_stats
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def read_metrics(
+    storage: StorageBackend = Depends(get_storage)
+) -> Dict[str, Any]:
+    """
+    Internal counters for the shared clients of this worker process.
+    """
+    return {
+        "db_pool": pool_snapshot(engine),
+        "db_replicas": database_router.snapshot(),
+        "storage": dict(storage.stats),
+        "large_file_uploads": dict(large_file_upload_stats),
+        "singleflight": singleflight_stats(),
+        "image_metadata_cache": dict(image_metadata_cache.stats),
+        "image_key_filter": dict(image_key_filter.stats),
+        "response_cache": dict(response_cache.stats),
+        "compression": dict(compression_stats),
+        "image_processing": image_processing_pool.snapshot(),
+        "uploads": dict(upload_stats),
+        "image_jobs": dict(image_job_stats),
+        "upload_sessions": dict(upload_session_stats),
+    }
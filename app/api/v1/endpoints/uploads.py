@@ -0,0 +1,110 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_storage
+from app.core.config import settings
+from app.core.spool import PayloadTooLarge, spool_stream
+from app.db.session import get_db
+from app.schemas.image import Image, UploadSession, UploadSessionCreate
+from app.services.storage_service import StorageBackend
+from app.services.upload_session_service import UploadSessionService
+
+router = APIRouter()
+
+@router.post("/", response_model=UploadSession, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    session_in: UploadSessionCreate,
+    db: AsyncSession = Depends(get_db),
+    storage_service: StorageBackend = Depends(get_storage)
+):
+    """
+    Authorize a direct upload: send the file to ``upload_url`` with
+    ``upload_method`` and ``upload_headers``, then call ``finalize``
+    before ``expires_at``.
+    """
+    service = UploadSessionService(db, storage_service)
+    try:
+        created = await service.create_session(session_in)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if created is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Direct uploads are not supported by this storage backend",
+        )
+
+    session, link = created
+    return UploadSession(
+        id=session.id,
+        storage_key=session.storage_key,
+        upload_url=link.url,
+        upload_method=link.method,
+        upload_headers=link.headers,
+        max_bytes=session.max_bytes,
+        expires_at=session.expires_at,
+    )
+
+@router.post("/{session_id}/finalize", response_model=Image, status_code=status.HTTP_201_CREATED)
+async def finalize_upload_session(
+    session_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    storage_service: StorageBackend = Depends(get_storage)
+):
+    """
+    Validate the uploaded file and create the image.
+    """
+    service = UploadSessionService(db, storage_service)
+    try:
+        image = await service.finalize(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not image:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found or expired")
+    return image
+
+@router.put("/local/{file_key}", status_code=status.HTTP_204_NO_CONTENT, include_in_schema=False)
+async def receive_local_upload(
+    file_key: str,
+    request: Request,
+    content_type: str = Query(...),
+    expires: int = Query(...),
+    signature: str = Query(...),
+    db: AsyncSession = Depends(get_db),
+    storage_service: StorageBackend = Depends(get_storage)
+):
+    """
+    Upload target for links handed out by the local storage backend,
+    standing in for a presigned storage URL. Only accepts keys of upload
+    sessions that are still open.
+    """
+    if not storage_service.verify_upload(file_key, content_type, expires, signature):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired upload link")
+    if await UploadSessionService(db, storage_service).get_active_session_by_key(file_key) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found, expired or finalized"
+        )
+    if request.headers.get("content-type") != content_type:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Content-Type must be {content_type}")
+
+    chunks = request.stream()
+
+    async def read(size: int) -> bytes:
+        return await anext(chunks, b"")
+
+    try:
+        upload = await spool_stream(
+            read,
+            max_bytes=settings.IMAGE_UPLOAD_MAX_BYTES,
+            memory_limit=settings.IMAGE_UPLOAD_SPOOL_BYTES,
+            spool_dir=settings.UPLOAD_SPOOL_PATH,
+        )
+    except PayloadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(e))
+    try:
+        with upload.open() as f:
+            await storage_service.upload(f, file_key, content_type)
+    finally:
+        upload.discard()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
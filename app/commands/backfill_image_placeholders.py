@@ -0,0 +1,88 @@
+"""
+Fill in the placeholder, dominant colour and perceptual hash of images
+stored before these were computed at upload (or uploaded directly to
+storage, which skips processing).
+
+    python -m app.commands.backfill_image_placeholders [--batch-size 100]
+"""
+import argparse
+import asyncio
+from typing import Dict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.image import Image
+from app.services.image_db_service import IMAGES_TAG
+from app.services.image_processing_service import image_processing_pool
+from app.services.response_cache_service import response_cache
+from app.services.image_service import ImageProcessor, ImageSummary
+from app.services.storage_service import StorageBackend
+
+
+def _smallest_key(image: Image) -> str:
+    """The narrowest stored rendition in the original format: least to download and decode."""
+    for variant in image.variants:
+        if variant.mime_type == image.mime_type:
+            return variant.storage_key
+    return image.uploadthing_key
+
+
+async def backfill_image_placeholders(db: AsyncSession, storage: StorageBackend, batch_size: int = 100) -> int:
+    """Returns the number of images updated. Images that fail are reported and skipped."""
+    updated = 0
+    last_id = None
+    # Duplicates share files, so summarize each file once
+    summaries: Dict[str, ImageSummary] = {}
+    while True:
+        query = select(Image).filter(Image.placeholder.is_(None)).order_by(Image.id).limit(batch_size)
+        if last_id is not None:
+            query = query.filter(Image.id > last_id)
+        images = (await db.execute(query)).scalars().all()
+        if not images:
+            return updated
+        last_id = images[-1].id
+
+        for image in images:
+            key = _smallest_key(image)
+            try:
+                if key not in summaries:
+                    content, _ = await storage.download(key)
+                    summaries[key] = await image_processing_pool.run(
+                        ImageProcessor.summarize, content, settings.IMAGE_MAX_PIXELS
+                    )
+            except Exception as e:
+                print(f"Skipping image {image.id} ({key}): {e}")
+                continue
+            summary = summaries[key]
+            image.placeholder = summary.placeholder
+            image.dominant_color = summary.dominant_color
+            if image.perceptual_hash is None:
+                image.perceptual_hash = summary.perceptual_hash
+            updated += 1
+        await db.commit()
+        # Reaches the API workers with a shared RESPONSE_CACHE_BACKEND only
+        await response_cache.invalidate(IMAGES_TAG)
+        print(f"Backfilled {updated} images")
+
+
+async def main(batch_size: int) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.services.storage_service import create_storage_backend
+
+    storage = create_storage_backend()
+    await storage.start()
+    try:
+        async with AsyncSessionLocal() as db:
+            await backfill_image_placeholders(db, storage, batch_size)
+    finally:
+        image_processing_pool.close()
+        await storage.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,23 @@
+"""
+Recompute the per-month image summary behind GET /images/timeline from
+the images table, e.g. after images were changed outside the API.
+
+    python -m app.commands.rebuild_image_months
+"""
+import argparse
+import asyncio
+
+from app.services.image_db_service import ImageService
+
+
+async def main() -> None:
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        months = await ImageService(db).rebuild_months()
+    print(f"Rebuilt {months} months")
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    asyncio.run(main())
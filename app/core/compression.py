@@ -0,0 +1,63 @@
+import gzip
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+from app.core.config import settings
+
+# Only text formats shrink; images, archives and the like are compressed already
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+compression_stats: Dict[str, int] = {"responses": 0, "bytes_in": 0, "bytes_out": 0}
+
+
+def supported_encodings() -> tuple:
+    """Content codings this process can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    The coding to compress a response with for this Accept-Encoding header,
+    or None to send it as is. Ties in q-value go to the better coding.
+    """
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        accepted[coding.strip().lower()] = q
+    best = None
+    for coding in supported_encodings():
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (coding, q)
+    return best[0] if best else None
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return content_type is not None and content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    elif encoding == "gzip":
+        # mtime=0 keeps the output (and so cached copies) byte-identical
+        compressed = gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+    else:
+        raise ValueError(f"Unsupported content coding: {encoding}")
+    compression_stats["responses"] += 1
+    compression_stats["bytes_in"] += len(body)
+    compression_stats["bytes_out"] += len(compressed)
+    return compressed
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from pydantic import AnyHttpUrl, validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,6 +11,29 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Connection pool per worker process: DB_POOL_SIZE connections kept open
+    # plus up to DB_MAX_OVERFLOW more under load; a checkout waits up to
+    # DB_POOL_TIMEOUT_SECONDS before failing. Connections older than
+    # DB_POOL_RECYCLE_SECONDS are replaced, and with DB_POOL_PRE_PING tested
+    # before use. DB_STATEMENT_CACHE_SIZE is asyncpg's prepared statement
+    # cache per connection (0 behind pgbouncer in transaction mode).
+    # DB_ECHO logs SQL from a background thread: "off", "info" (statements)
+    # or "debug" (with result rows)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_ECHO: str = "off"
+    # Read replicas (comma-separated URLs) for read-only GET handlers, used
+    # round-robin while their health check (every
+    # DB_REPLICA_HEALTH_CHECK_SECONDS) passes, else the primary. A client's
+    # reads go to the primary for DB_READ_YOUR_WRITES_SECONDS after it
+    # writes; cached responses built in that window are dropped again after it
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
     
     # UploadThing
     # Backblaze B2
@@ -18,6 +41,100 @@ class Settings(BaseSettings):
     B2_KEY_ID: str
     B2_APPLICATION_KEY: str
     B2_BUCKET_NAME: str
+    # B2 auth tokens are valid for 24h; refresh well before that
+    B2_AUTH_REFRESH_INTERVAL_SECONDS: int = 20 * 60 * 60
+
+    # Storage backend: "b2" in production, "local" for tests and development
+    STORAGE_BACKEND: str = "b2"
+    # Size of the thread pool running blocking b2sdk calls
+    STORAGE_MAX_WORKERS: int = 8
+    LOCAL_STORAGE_PATH: str = "storage"
+    # Objects of at least STORAGE_LARGE_FILE_THRESHOLD_BYTES are uploaded as
+    # parts of STORAGE_PART_SIZE_BYTES (at least 5 MB on B2), sent
+    # STORAGE_PART_CONCURRENCY at a time and each tried up to
+    # STORAGE_PART_MAX_ATTEMPTS times
+    STORAGE_LARGE_FILE_THRESHOLD_BYTES: int = 16 * 1024 * 1024
+    STORAGE_PART_SIZE_BYTES: int = 8 * 1024 * 1024
+    STORAGE_PART_CONCURRENCY: int = 4
+    STORAGE_PART_MAX_ATTEMPTS: int = 3
+
+    # Read-through disk cache for served image bytes (0 disables it)
+    IMAGE_CACHE_PATH: str = "cache/images"
+    IMAGE_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+    IMAGE_CACHE_WARM_ON_UPLOAD: bool = True
+
+    # Resized copies generated at upload ({name: width in px}); widths not
+    # smaller than the original are skipped
+    IMAGE_VARIANT_WIDTHS: Dict[str, int] = {"thumbnail": 320, "medium": 800, "large": 1600}
+    # Extra encodings of every rendition, served to clients whose Accept
+    # header lists them ("WEBP", "AVIF"; AVIF is much slower to encode)
+    IMAGE_MODERN_FORMATS: List[str] = ["WEBP"]
+    # Decoding/encoding runs in a process pool (0 workers: run on a thread);
+    # jobs beyond MAX_CONCURRENCY queue, beyond MAX_QUEUE get a 503
+    IMAGE_PROCESS_WORKERS: int = 2
+    IMAGE_PROCESS_MAX_CONCURRENCY: int = 2
+    IMAGE_PROCESS_MAX_QUEUE: int = 32
+
+    # Request bodies over MAX_REQUEST_BODY_BYTES get a 413 while streaming in.
+    # Each uploaded image is capped at IMAGE_UPLOAD_MAX_BYTES, held in memory
+    # up to IMAGE_UPLOAD_SPOOL_BYTES and spooled to UPLOAD_SPOOL_PATH (system
+    # temp dir when unset) above that
+    MAX_REQUEST_BODY_BYTES: int = 1024 * 1024 * 1024
+    IMAGE_UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+    IMAGE_UPLOAD_SPOOL_BYTES: int = 2 * 1024 * 1024
+    UPLOAD_SPOOL_PATH: Optional[str] = None
+    # Pixel budget checked from the image header, before decoding
+    IMAGE_MAX_PIXELS: int = 50_000_000
+    # Batch uploads: files per request, and files processed/stored at once
+    IMAGE_BATCH_MAX_FILES: int = 250
+    IMAGE_BATCH_CONCURRENCY: int = 4
+    # Direct-to-storage uploads: how long a session's upload link is valid,
+    # and how often expired, never-finalized sessions are reaped
+    UPLOAD_SESSION_TTL_SECONDS: int = 15 * 60
+    UPLOAD_SESSION_REAP_SECONDS: int = 5 * 60
+    # Background processing: with IMAGE_UPLOAD_ASYNC (or ?async=true) uploads
+    # are stored raw and answered with 202; IMAGE_JOB_WORKERS loops per
+    # process (0: none here) pick jobs up, retrying failures with backoff.
+    # Jobs locked for longer than IMAGE_JOB_TIMEOUT_SECONDS are taken over
+    IMAGE_UPLOAD_ASYNC: bool = False
+    IMAGE_JOB_WORKERS: int = 2
+    IMAGE_JOB_POLL_SECONDS: float = 2.0
+    IMAGE_JOB_MAX_ATTEMPTS: int = 3
+    IMAGE_JOB_TIMEOUT_SECONDS: int = 10 * 60
+
+    # How serve_image delivers bytes: "proxy" streams them through the API,
+    # "redirect" sends clients to the public storage (or CDN) URL and
+    # "signed" to a time-limited signed download URL
+    IMAGE_SERVE_MODE: str = "proxy"
+    IMAGE_SIGNED_URL_TTL_SECONDS: int = 24 * 60 * 60
+    # Optional CDN in front of the bucket used by "redirect" mode
+    IMAGE_PUBLIC_BASE_URL: Optional[str] = None
+
+    # serve_image key checks: per-worker TTL cache of image metadata (with
+    # negative entries) and a Bloom filter of known keys that rejects unknown
+    # keys without a DB query
+    IMAGE_METADATA_CACHE_SIZE: int = 10000
+    IMAGE_METADATA_CACHE_TTL_SECONDS: int = 60
+    IMAGE_KEY_FILTER_ENABLED: bool = True
+    IMAGE_KEY_FILTER_SYNC_SECONDS: int = 10
+    IMAGE_KEY_FILTER_REBUILD_SECONDS: int = 60 * 60
+
+    # Cached JSON of the event and image listings, revalidated by clients
+    # with ETag/If-None-Match. "memory": LRU per worker, "redis": shared by
+    # all workers (needs the redis package), "none": off. Writes drop the
+    # entries they affect; the TTL bounds staleness where they cannot (other
+    # workers with "memory")
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Text responses of at least COMPRESSION_MIN_BYTES (0 disables) are sent
+    # compressed to clients that accept it: brotli when the brotli package is
+    # installed, gzip otherwise. Cached responses keep their compressed copies
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
     
     # CORS
     ALLOWED_ORIGINS: List[AnyHttpUrl] = []
@@ -0,0 +1,132 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.compression import compress, is_compressible, negotiate_encoding
+
+
+class RequestBodyTooLarge(HTTPException):
+    def __init__(self, max_body_size: int):
+        super().__init__(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Request body exceeds the limit of {max_body_size} bytes",
+        )
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejects request bodies larger than ``max_body_size`` with a 413.
+
+    A declared Content-Length over the limit is refused before anything is
+    read; otherwise the body is counted as it streams in, and reading stops
+    as soon as the limit is passed, so chunked uploads are bounded too.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.max_body_size <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Raised inside body parsing, FastAPI turns this into the 413 itself
+                    raise RequestBodyTooLarge(self.max_body_size)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send) -> None:
+        error = RequestBodyTooLarge(self.max_body_size)
+        response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+        await response(scope, receive, send)
+
+
+class CompressionMiddleware:
+    """
+    Compresses text responses (JSON, HTML, ...) of at least ``minimum_size``
+    bytes with the best coding the client accepts (see ``negotiate_encoding``).
+
+    Responses that already have a Content-Encoding (cached responses are
+    compressed once by ``ResponseCache``), partial content, image bodies and
+    streamed bodies (served images) pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        start: Optional[Message] = None
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] == status.HTTP_206_PARTIAL_CONTENT
+                    or "content-encoding" in headers
+                    or not is_compressible(headers.get("content-type"))
+                ):
+                    await send(message)
+                    return
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    await send(message)
+                    return
+                # Hold the start until the body shows whether it is worth it
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            if message.get("more_body") or len(body) < self.minimum_size:
+                await send(held)
+                await send(message)
+                return
+            compressed = compress(body, encoding)
+            headers = MutableHeaders(raw=held["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(held)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Tuple
+from uuid import UUID
+
+# List endpoints return a plain JSON array and put the next page's cursor here
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Opaque, URL-safe token for a position in a listing."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Inverse of ``encode_cursor``; raises ValueError for malformed tokens."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def encode_position(moment: datetime, row_id: UUID) -> str:
+    """Cursor for keyset pagination on ``(timestamp, id)``, newest first."""
+    return encode_cursor({"t": moment.isoformat(), "id": str(row_id)})
+
+
+def decode_position(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Inverse of ``encode_position``; raises ValueError for malformed tokens.
+    Naive timestamps (SQLite) are taken as UTC.
+    """
+    position = decode_cursor(cursor)
+    try:
+        moment = datetime.fromisoformat(position["t"])
+        row_id = UUID(position["id"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)), row_id
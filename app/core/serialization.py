@@ -0,0 +1,29 @@
+from typing import Any, Collection, List, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Compact JSON of plain data (dicts, lists, UUIDs, datetimes, ...) by
+    pydantic-core's serializer: the same output as the response models give,
+    without building them.
+    """
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """The app's default response class; renders with ``dump_json`` instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def schema_columns(model: type, schema: Type[BaseModel], exclude: Collection[str] = ()) -> List[Any]:
+    """
+    The columns of ``model`` named like the fields of response ``schema``,
+    in field order, so rows selected with them map straight onto the schema.
+    """
+    return [getattr(model, name) for name in schema.model_fields if name not in exclude]
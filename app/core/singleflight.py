@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+# Every SingleFlight registers itself here so its counters show up in /internal/metrics
+_registry: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Keyed request coalescing within one worker process.
+
+    Concurrent ``do(key, fn)`` calls with the same key share a single
+    execution of ``fn``: the first caller starts it, later callers wait for
+    it and receive the same result (or exception). Results are shared
+    objects, so callers must treat them as read-only.
+
+    The work runs in its own task, so a cancelled caller (e.g. a client
+    disconnect) does not cancel the fetch the other callers are waiting on.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.stats: Dict[str, int] = {"calls": 0, "executions": 0, "coalesced": 0}
+        _registry[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.stats["calls"] += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def forget(self, key: Hashable) -> None:
+        """Let the next call for ``key`` start a fresh execution."""
+        self._in_flight.pop(key, None)
+
+
+def singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: dict(group.stats) for name, group in _registry.items()}
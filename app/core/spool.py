@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Awaitable, BinaryIO, Callable, Optional, Union
+
+# Size of the reads used to copy an upload stream
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+class PayloadTooLarge(Exception):
+    """Raised when streamed content exceeds its size limit."""
+
+
+@dataclass
+class SpooledContent:
+    """
+    Bytes held either in memory (``data``) or in a temporary file (``path``).
+    Picklable, so it can be handed to and returned from worker processes.
+    """
+    size: int
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    # Hex SHA-256 of the bytes, when computed while spooling
+    sha256: Optional[str] = None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """The bytes, or the path of the file holding them."""
+        return self.data if self.path is None else self.path
+
+    def open(self) -> BinaryIO:
+        # BytesIO shares an initial bytes object instead of copying it
+        return BytesIO(self.data) if self.path is None else open(self.path, "rb")
+
+    def discard(self) -> None:
+        """Remove the temporary file, if any."""
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def spool_file(spool_dir: Optional[str] = None, suffix: str = "") -> BinaryIO:
+    """A new, named temporary file that the caller must remove."""
+    if spool_dir:
+        os.makedirs(spool_dir, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=spool_dir or None, suffix=suffix, delete=False)
+
+
+async def spool_stream(
+    read: Callable[[int], Awaitable[bytes]],
+    max_bytes: int,
+    memory_limit: int,
+    spool_dir: Optional[str] = None,
+) -> SpooledContent:
+    """
+    Copy a stream (e.g. ``UploadFile.read``) in ``SPOOL_CHUNK_SIZE`` reads,
+    keeping at most ``memory_limit`` bytes in memory before moving to a
+    temporary file in ``spool_dir``. Raises ``PayloadTooLarge`` as soon as
+    more than ``max_bytes`` have been read. The content is hashed on the way.
+    """
+    buffer: Optional[BytesIO] = BytesIO()
+    f: Optional[BinaryIO] = None
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        while chunk := await read(SPOOL_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise PayloadTooLarge(f"Upload exceeds the limit of {max_bytes} bytes")
+            digest.update(chunk)
+            if f is None and size > memory_limit:
+                f = await asyncio.to_thread(spool_file, spool_dir, ".upload")
+                await asyncio.to_thread(f.write, buffer.getvalue())
+                buffer = None
+            if f is None:
+                buffer.write(chunk)
+            else:
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        if f is not None:
+            f.close()
+            os.unlink(f.name)
+        raise
+
+    if f is None:
+        return SpooledContent(size=size, data=buffer.getvalue(), sha256=digest.hexdigest())
+    await asyncio.to_thread(f.close)
+    return SpooledContent(size=size, path=f.name, sha256=digest.hexdigest())
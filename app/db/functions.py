@@ -0,0 +1,24 @@
+from sqlalchemy import DateTime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class utc_month_start(FunctionElement):
+    """
+    First instant (naive, UTC) of the calendar month of a timestamp, for
+    grouping by month in SQL: ``date_trunc`` on PostgreSQL, ``strftime``
+    on SQLite.
+    """
+    type = DateTime()
+    name = "utc_month_start"
+    inherit_cache = True
+
+
+@compiles(utc_month_start)
+def _utc_month_start_default(element, compiler, **kw):
+    return "strftime('%%Y-%%m-01 00:00:00', %s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(utc_month_start, "postgresql")
+def _utc_month_start_postgresql(element, compiler, **kw):
+    return "date_trunc('month', %s AT TIME ZONE 'UTC')" % compiler.process(element.clauses, **kw)
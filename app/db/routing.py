@@ -0,0 +1,193 @@
+import asyncio
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.pool import pool_snapshot
+from app.db.session import create_database_engine, get_db
+
+# Set on responses to writes; until it expires the client's reads go to the primary
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class Replica:
+    """A read replica's engine, sessions and last known health."""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        # ``session.info["replica"]`` tells readers their data may lag the primary
+        self.sessions = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, info={"replica": name})
+        self.healthy = True
+        self.stats: Dict[str, int] = {"reads": 0, "failures": 0}
+
+
+class DatabaseRouter:
+    """
+    Sends read-only handlers (``get_read_db``) to read replicas, round-robin
+    over the healthy ones. A replica is taken out when a connection to it
+    fails and put back by the periodic health check (``maintain``). Without
+    a healthy replica, and for clients that wrote within
+    ``DB_READ_YOUR_WRITES_SECONDS`` (see ``ReadYourWritesMiddleware``),
+    reads go to the primary.
+    """
+
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._next = 0
+        self.stats: Dict[str, int] = {
+            "replica_reads": 0, "primary_reads": 0, "read_your_writes": 0, "fallbacks": 0,
+        }
+
+    @classmethod
+    def from_urls(cls, urls: str) -> "DatabaseRouter":
+        urls = [url.strip() for url in urls.split(",") if url.strip()]
+        return cls([
+            Replica(f"replica-{index}", create_database_engine(url))
+            for index, url in enumerate(urls, 1)
+        ])
+
+    def pick(self) -> Optional[Replica]:
+        """The next healthy replica, or None when there is none."""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if replica.healthy:
+                return replica
+        return None
+
+    def mark_failed(self, replica: Replica, error: BaseException) -> None:
+        replica.stats["failures"] += 1
+        if replica.healthy:
+            print(f"Read replica {replica.name} failed, using the primary until it recovers: {error}")
+        replica.healthy = False
+
+    async def check_health(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), settings.DB_REPLICA_HEALTH_CHECK_SECONDS)
+            except Exception as e:
+                self.mark_failed(replica, e)
+                continue
+            if not replica.healthy:
+                print(f"Read replica {replica.name} recovered")
+            replica.healthy = True
+
+    async def maintain(self) -> None:
+        """Background task started from the application lifespan."""
+        while True:
+            await asyncio.sleep(settings.DB_REPLICA_HEALTH_CHECK_SECONDS)
+            try:
+                await self.check_health()
+            except Exception as e:
+                print(f"Read replica health check failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "replicas": {
+                replica.name: {"healthy": replica.healthy, **replica.stats, "pool": pool_snapshot(replica.engine)}
+                for replica in self.replicas
+            },
+        }
+
+    async def close(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+database_router = DatabaseRouter.from_urls(settings.DATABASE_REPLICA_URLS)
+
+
+def reads_own_writes(request: Request) -> bool:
+    """
+    Whether this client wrote within ``DB_READ_YOUR_WRITES_SECONDS``, so
+    ``get_read_db`` sends its reads to the primary instead of a replica.
+    """
+    if not database_router.replicas:
+        return False
+    value = request.cookies.get(READ_PRIMARY_COOKIE)
+    try:
+        return value is not None and float(value) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(
+    request: Request,
+    primary: AsyncSession = Depends(get_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only handlers: a replica when one is configured and
+    healthy, otherwise the primary session (which only connects if used).
+    """
+    router = database_router
+    if not router.replicas:
+        yield primary
+        return
+    if reads_own_writes(request):
+        router.stats["read_your_writes"] += 1
+        router.stats["primary_reads"] += 1
+        yield primary
+        return
+
+    session = None
+    replica = router.pick()
+    if replica is not None:
+        session = replica.sessions()
+        try:
+            # Connect now, so a dead replica costs a fallback, not the request
+            await session.connection()
+        except Exception as e:
+            await session.close()
+            router.mark_failed(replica, e)
+            session = None
+    if session is None:
+        router.stats["fallbacks"] += 1
+        router.stats["primary_reads"] += 1
+        yield primary
+        return
+
+    router.stats["replica_reads"] += 1
+    replica.stats["reads"] += 1
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+class ReadYourWritesMiddleware:
+    """
+    Sets ``READ_PRIMARY_COOKIE`` on successful writes (any method but GET,
+    HEAD and OPTIONS) while replicas are configured, so the client's reads
+    for the next ``DB_READ_YOUR_WRITES_SECONDS`` see what it wrote.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not database_router.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        async def marking_send(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.DB_READ_YOUR_WRITES_SECONDS
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{READ_PRIMARY_COOKIE}={time.time() + window:.3f}; Max-Age={window}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, marking_send)
@@ -1,9 +1,88 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import logging
+import logging.handlers
+import queue
+from typing import Any, Dict
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool
+
+SQL_LOG_LEVELS = {"off": logging.WARNING, "info": logging.INFO, "debug": logging.DEBUG}
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # Leave formatting (statement parameters and rows) to the listener thread
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_sql_log_listener = None
+
+
+def configure_sql_logging(level: str) -> None:
+    """
+    Log SQL at ``level`` (see ``SQL_LOG_LEVELS``). Records are queued and
+    formatted and written by a background thread, so requests never wait
+    on log output; ``echo=True`` would do both inline.
+    """
+    global _sql_log_listener
+    if level not in SQL_LOG_LEVELS:
+        raise ValueError(f"Unknown DB_ECHO: {level}")
+    logger = logging.getLogger("sqlalchemy.engine")
+    logger.setLevel(SQL_LOG_LEVELS[level])
+    if level == "off" or _sql_log_listener is not None:
+        return
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    output = logging.StreamHandler()
+    output.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+    _sql_log_listener = logging.handlers.QueueListener(records, output)
+    _sql_log_listener.start()
+    logger.addHandler(_DeferredQueueHandler(records))
+    logger.propagate = False
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """``create_async_engine`` arguments for ``url`` from the DB_* settings."""
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        # SQLite picks its own pool (one connection for :memory:); nothing to size
+        return {}
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+def create_database_engine(url: str) -> AsyncEngine:
+    return create_async_engine(url, **engine_options(url))
+
+
+def bind_name(db: AsyncSession) -> str:
+    """"primary", or the name of the read replica ``db`` reads from."""
+    return db.info.get("replica", "primary")
+
+
+def sibling_session(db: AsyncSession) -> AsyncSession:
+    """
+    A new session on the same database as ``db``. For work shared between
+    requests (``SingleFlight``), which must not run on, or hand out objects
+    of, the session of whichever request started it.
+    """
+    return AsyncSession(db.bind, expire_on_commit=False, info=dict(db.info))
+
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+configure_sql_logging(settings.DB_ECHO)
+engine = create_database_engine(settings.DATABASE_URL)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_db():
@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -6,10 +9,47 @@ from pathlib import Path
 
 from app.core.config import settings
 from app.api.v1.router import api_router
+from app.core.middleware import BodySizeLimitMiddleware, CompressionMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.serialization import FastJSONResponse
+from app.db.routing import ReadYourWritesMiddleware, database_router
+from app.services.image_job_service import run_image_jobs
+from app.services.image_processing_service import image_processing_pool
+from app.services.metadata_cache_service import image_key_filter
+from app.services.response_cache_service import response_cache
+from app.services.storage_service import create_storage_backend
+from app.services.upload_session_service import reap_upload_sessions
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One storage client per worker, shared by all requests
+    storage = create_storage_backend()
+    await storage.start()
+    app.state.storage = storage
+    background_tasks = [asyncio.create_task(reap_upload_sessions(storage))]
+    if settings.IMAGE_JOB_WORKERS > 0:
+        background_tasks.append(asyncio.create_task(run_image_jobs(storage)))
+    if settings.IMAGE_KEY_FILTER_ENABLED:
+        background_tasks.append(asyncio.create_task(image_key_filter.maintain()))
+    if database_router.replicas:
+        background_tasks.append(asyncio.create_task(database_router.maintain()))
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        image_processing_pool.close()
+        await response_cache.close()
+        await database_router.close()
+        await storage.close()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 
@@ -21,8 +61,13 @@ if settings.ALLOWED_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
+app.add_middleware(BodySizeLimitMiddleware, max_body_size=settings.MAX_REQUEST_BODY_BYTES)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
+app.add_middleware(ReadYourWritesMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
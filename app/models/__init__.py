@@ -1,2 +1,7 @@
 from app.models.event import Event
 from app.models.image import Image
+from app.models.image_blob import ImageBlob
+from app.models.image_job import ImageJob
+from app.models.image_month import ImageMonth
+from app.models.image_variant import ImageVariant
+from app.models.upload_session import UploadSession
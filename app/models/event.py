@@ -1,11 +1,13 @@
 import uuid
-from sqlalchemy import Column, String, Text, Date, Time, DateTime, func
+from sqlalchemy import Column, Index, String, Text, Date, Time, DateTime, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.db.base import Base
 
 class Event(Base):
     __tablename__ = "events"
+    # Keyset pagination, newest first (see EventService.get_events_page)
+    __table_args__ = (Index("ix_events_created_at_id", "created_at", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False, index=True)
@@ -1,20 +1,43 @@
 import uuid
-from sqlalchemy import Column, String, Text, Integer, DateTime, func
+from sqlalchemy import Column, Index, String, Text, Integer, DateTime, func
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
 class Image(Base):
     __tablename__ = "images"
+    # Keyset pagination, newest first (see ImageService.get_images_page)
+    __table_args__ = (Index("ix_images_upload_date_id", "upload_date", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     description = Column(Text, nullable=False)
     upload_date = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     image_url = Column(String, nullable=False)
-    uploadthing_key = Column(String, nullable=False, unique=True)
+    # Not unique: byte-identical uploads share their stored files (see ImageBlob)
+    uploadthing_key = Column(String, nullable=False, index=True)
     file_size = Column(Integer)
     mime_type = Column(String)
     width = Column(Integer)
     height = Column(Integer)
+    # SHA-256 of the uploaded bytes and a 64-bit perceptual hash (hex)
+    content_hash = Column(String, index=True)
+    perceptual_hash = Column(String, index=True)
+    # Inline data: URI of a tiny blurred preview and "#rrggbb", for painting
+    # the gallery before images load
+    placeholder = Column(Text)
+    dominant_color = Column(String(7))
+    # "ready" once processed and stored; uploads accepted for background
+    # processing are "pending"/"processing" until then, or "failed"
+    status = Column(String, nullable=False, default="ready", server_default="ready", index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Loaded eagerly so async code never triggers a lazy load
+    variants = relationship(
+        "ImageVariant",
+        lazy="selectin",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="ImageVariant.width",
+    )
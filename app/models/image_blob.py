@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+
+from app.db.base import Base
+
+class ImageBlob(Base):
+    """
+    Stored files (an original and its variants) shared by every ``Image``
+    uploaded with the same content. The files are deleted from storage when
+    the last image referencing them is deleted.
+    """
+    __tablename__ = "image_blobs"
+
+    storage_key = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False, index=True)
+    ref_count = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,25 @@
+import uuid
+from sqlalchemy import Column, ForeignKey, Index, String, Text, Integer, DateTime, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+class ImageJob(Base):
+    """
+    Background processing of an upload accepted with status "pending".
+    The raw upload waits in storage under ``source_key``; the row is deleted
+    once the image is ready and kept (status "failed") when it never will be.
+    """
+    __tablename__ = "image_jobs"
+    __table_args__ = (Index("ix_image_jobs_status_run_after", "status", "run_after"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    image_id = Column(UUID(as_uuid=True), ForeignKey("images.id", ondelete="CASCADE"), nullable=False, unique=True)
+    source_key = Column(String, nullable=False)
+    # "pending", "processing" or "failed"
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, DateTime, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+class ImageMonth(Base):
+    """
+    Number of ready images per calendar month (UTC), with the newest as
+    cover. Kept up to date by ``ImageService`` as images are created and
+    deleted; ``python -m app.commands.rebuild_image_months`` recomputes it.
+    """
+    __tablename__ = "image_months"
+
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    image_count = Column(Integer, nullable=False, default=0)
+    cover_image_id = Column(UUID(as_uuid=True))
+    cover_upload_date = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,20 @@
+import uuid
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+class ImageVariant(Base):
+    """A resized copy of an uploaded image, stored next to the original."""
+    __tablename__ = "image_variants"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    image_id = Column(UUID(as_uuid=True), ForeignKey("images.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    storage_key = Column(String, nullable=False, index=True)
+    image_url = Column(String, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    file_size = Column(Integer)
+    mime_type = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
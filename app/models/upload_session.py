@@ -0,0 +1,21 @@
+import uuid
+from sqlalchemy import Column, String, Text, Integer, DateTime, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+class UploadSession(Base):
+    """A direct-to-storage upload that has been authorized but not yet finalized."""
+    __tablename__ = "upload_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Staging key the client uploads to; finalize copies it to the image's own key
+    storage_key = Column(String, nullable=False, unique=True)
+    description = Column(Text, nullable=False)
+    content_type = Column(String, nullable=False)
+    max_bytes = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Kept until it expires, so files sent to the upload link after
+    # finalizing are reaped with it
+    finalized_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,8 +1,24 @@
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field, RootModel
+from pydantic import BaseModel, ConfigDict, Field, RootModel, computed_field
+
+def build_srcset(
+    image_url: str,
+    width: Optional[int],
+    mime_type: Optional[str],
+    variants: Iterable[Tuple[str, int, Optional[str]]],
+) -> str:
+    """``Image.srcset`` from the image and its ``(image_url, width, mime_type)`` variants."""
+    candidates = [
+        f"{variant_url} {variant_width}w"
+        for variant_url, variant_width, variant_type in variants
+        if variant_type == mime_type and variant_width != width
+    ]
+    if width:
+        candidates.append(f"{image_url} {width}w")
+    return ", ".join(candidates)
 
 class ImageBase(BaseModel):
     description: str
@@ -13,6 +29,17 @@ class ImageCreate(ImageBase):
 class ImageUpdate(BaseModel):
     description: Optional[str] = None
 
+class ImageVariant(BaseModel):
+    name: str
+    width: int
+    height: int
+    image_url: str
+    storage_key: str
+    file_size: Optional[int] = None
+    mime_type: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 class ImageInDBBase(ImageBase):
     id: UUID
     upload_date: datetime
@@ -22,19 +49,87 @@ class ImageInDBBase(ImageBase):
     mime_type: Optional[str] = None
     width: Optional[int] = None
     height: Optional[int] = None
+    content_hash: Optional[str] = None
+    perceptual_hash: Optional[str] = None
+    placeholder: Optional[str] = Field(None, description="data: URI of a tiny WebP preview; scale it up with a blur")
+    dominant_color: Optional[str] = Field(None, description="Background colour to show before the image loads, #rrggbb")
+    status: str = Field("ready", description="pending, processing, ready or failed; only ready images are listed and served")
     created_at: datetime
     updated_at: Optional[datetime] = None
+    variants: List[ImageVariant] = Field(default_factory=list, description="Resized and re-encoded copies, narrowest first")
 
     model_config = ConfigDict(from_attributes=True)
 
 class Image(ImageInDBBase):
-    pass
+    @computed_field
+    @property
+    def srcset(self) -> str:
+        """
+        Value for an <img srcset> attribute covering the original and its
+        resized variants in the original format. Modern-format copies are
+        listed in ``variants`` for use in <picture> sources.
+        """
+        return build_srcset(
+            self.image_url,
+            self.width,
+            self.mime_type,
+            ((v.image_url, v.width, v.mime_type) for v in self.variants),
+        )
+
+class ImageStatus(BaseModel):
+    id: UUID
+    status: str = Field(..., description="pending, processing, ready or failed")
+    attempts: int = 0
+    error: Optional[str] = Field(None, description="Why the last processing attempt failed")
+
+class BatchUploadItem(BaseModel):
+    index: int = Field(..., description="Position of the file in the request")
+    filename: Optional[str] = None
+    status_code: int = Field(..., description="201 when created, otherwise the error status a single upload would get")
+    image: Optional[Image] = None
+    error: Optional[str] = None
+
+class BatchUploadResponse(BaseModel):
+    created: int
+    failed: int
+    items: List[BatchUploadItem]
 
 class MonthImages(BaseModel):
     images: List[Image] = Field(..., description="List of images for this month")
+    total: Optional[int] = Field(None, description="Number of images in this month")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to load more images of this month")
 
 class YearData(RootModel):
     root: Dict[str, MonthImages] = Field(..., description="Months with their images")
 
 class GroupedImagesResponse(BaseModel):
     year: Dict[str, Dict[str, MonthImages]] = Field(..., description="Images grouped by year and month")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to load older months")
+
+class TimelineMonth(BaseModel):
+    month: int = Field(..., description="1-12")
+    name: str = Field(..., description="Lower-case month name, as used by /images/grouped")
+    image_count: int
+    cover_image_id: Optional[UUID] = Field(None, description="The newest image of the month")
+    updated_at: Optional[datetime] = Field(None, description="When an image of this month was last added or removed")
+
+class TimelineYear(BaseModel):
+    year: int
+    image_count: int
+    months: List[TimelineMonth] = Field(..., description="Newest first")
+
+class TimelineResponse(BaseModel):
+    years: List[TimelineYear] = Field(..., description="Years with images, newest first")
+
+class UploadSessionCreate(ImageBase):
+    filename: str
+    content_type: str = Field(..., description="image/jpeg, image/png or image/webp")
+
+class UploadSession(BaseModel):
+    id: UUID
+    storage_key: str
+    upload_url: str = Field(..., description="Send the file bytes here, straight to storage")
+    upload_method: str
+    upload_headers: Dict[str, str] = Field(default_factory=dict, description="Headers to send with the upload, as given")
+    max_bytes: int
+    expires_at: datetime
@@ -0,0 +1,309 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.storage_service import (
+    DownloadLink,
+    StorageBackend,
+    StoredObject,
+    UploadLink,
+    guess_content_type,
+    iter_file,
+)
+
+# Temp files older than this are leftovers of crashed writers
+STALE_TMP_SECONDS = 60 * 60
+
+
+class CacheWriter:
+    """
+    Writes one cache entry to a private temp file. Nothing is visible to
+    readers until ``commit`` atomically renames it into place.
+    """
+
+    def __init__(self, cache: "DiskCache", name: str):
+        self.cache = cache
+        self.name = name
+        self.tmp_path = cache.root / f".{name}.{uuid.uuid4().hex}.tmp"
+        self.size = 0
+        self._file: Optional[BinaryIO] = open(self.tmp_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        if self._file is None:
+            return
+        self.size += len(chunk)
+        if self.size > self.cache.max_bytes:
+            # Larger than the whole budget, not worth caching
+            self.abort()
+            return
+        self._file.write(chunk)
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def commit(self) -> bool:
+        """Publish the entry; returns False if it was aborted."""
+        if self._file is None:
+            return False
+        self._file.close()
+        self._file = None
+        os.replace(self.tmp_path, self.cache.root / self.name)
+        self.cache._add(self.name, self.size)
+        return True
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class DiskCache:
+    """
+    Size-bounded LRU cache of object bytes on local disk.
+
+    Entries are files named by the SHA-256 of their key, written atomically
+    (temp file + rename) so concurrent workers sharing the directory never
+    read partial files. Each worker keeps its own LRU index; files written by
+    other workers are picked up on first read. All methods are blocking and
+    are called from a thread by ``CachedStorageBackend``.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "writes": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def load(self) -> None:
+        """Index existing entries (oldest first) and drop stale temp files."""
+        now = time.time()
+        files = []
+        for path in self.root.iterdir():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.startswith("."):
+                if now - st.st_mtime > STALE_TMP_SECONDS:
+                    path.unlink(missing_ok=True)
+                continue
+            files.append((st.st_mtime, path.name, st.st_size))
+
+        for _, name, size in sorted(files):
+            self._add(name, size, count_write=False)
+
+    def _add(self, name: str, size: int, count_write: bool = True) -> None:
+        with self._lock:
+            self.size -= self._entries.pop(name, 0)
+            self._entries[name] = size
+            self.size += size
+            if count_write:
+                self.stats["writes"] += 1
+            evicted = []
+            while self.size > self.max_bytes and self._entries:
+                old_name, old_size = self._entries.popitem(last=False)
+                self.size -= old_size
+                self.stats["evictions"] += 1
+                evicted.append(old_name)
+        for old_name in evicted:
+            (self.root / old_name).unlink(missing_ok=True)
+
+    def open(self, key: str, count: bool = True) -> Optional[BinaryIO]:
+        """
+        Return an open file for ``key`` on a hit, ``None`` on a miss.
+        ``count=False`` re-opens an entry without touching the hit/miss counters.
+        """
+        name = self._name(key)
+        path = self.root / name
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            with self._lock:
+                self.size -= self._entries.pop(name, 0)
+                if count:
+                    self.stats["misses"] += 1
+            return None
+
+        # Bump mtime so recency survives restarts and is visible to other workers
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            if count:
+                self.stats["hits"] += 1
+            if name in self._entries:
+                self._entries.move_to_end(name)
+                return f
+        self._add(name, os.fstat(f.fileno()).st_size, count_write=False)
+        return f
+
+    def writer(self, key: str) -> CacheWriter:
+        return CacheWriter(self, self._name(key))
+
+    def put(self, key: str, file: BinaryIO) -> None:
+        writer = self.writer(key)
+        try:
+            file.seek(0)
+            while chunk := file.read(1024 * 1024):
+                writer.write(chunk)
+            writer.commit()
+        except Exception:
+            writer.abort()
+            raise
+
+    def invalidate(self, key: str) -> None:
+        name = self._name(key)
+        with self._lock:
+            self.size -= self._entries.pop(name, 0)
+            self.stats["invalidations"] += 1
+        (self.root / name).unlink(missing_ok=True)
+
+
+class CachedStorageBackend(StorageBackend):
+    """
+    Read-through ``DiskCache`` in front of another storage backend.
+
+    Keys are immutable, so entries only go away on delete or eviction.
+    A full read of an uncached object first copies it into the cache (one
+    fetch shared by all concurrent readers) and is then served from disk;
+    ranged reads of uncached objects go straight to the backend.
+    """
+
+    def __init__(self, backend: StorageBackend, cache: DiskCache):
+        self.backend = backend
+        self.cache = cache
+        self._fills = SingleFlight("storage_cache_fill")
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.cache.load)
+        await self.backend.start()
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self.backend.stats)
+        stats.update({f"cache_{name}": value for name, value in self.cache.stats.items()})
+        stats["cache_bytes"] = self.cache.size
+        return stats
+
+    def public_url(self, file_key: str) -> str:
+        return self.backend.public_url(file_key)
+
+    async def download_link(self, file_key: str, signed: bool = False) -> Optional[DownloadLink]:
+        return await self.backend.download_link(file_key, signed)
+
+    async def upload_link(self, file_key: str, content_type: str, expires_in: int) -> Optional[UploadLink]:
+        return await self.backend.upload_link(file_key, content_type, expires_in)
+
+    def verify_upload(self, file_key: str, content_type: str, expires: int, signature: str) -> bool:
+        return self.backend.verify_upload(file_key, content_type, expires, signature)
+
+    async def upload(self, file: BinaryIO, file_key: str, content_type: str) -> str:
+        url = await self.backend.upload(file, file_key, content_type)
+        if settings.IMAGE_CACHE_WARM_ON_UPLOAD:
+            await asyncio.to_thread(self.cache.put, file_key, file)
+        return url
+
+    async def copy(self, source_key: str, file_key: str) -> None:
+        await self.backend.copy(source_key, file_key)
+
+    @property
+    def min_part_size(self) -> int:
+        return self.backend.min_part_size
+
+    async def start_large_file(self, file_key: str, content_type: str) -> str:
+        return await self.backend.start_large_file(file_key, content_type)
+
+    async def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        return await self.backend.upload_part(upload_id, part_number, data)
+
+    async def finish_large_file(self, upload_id: str, part_tokens: List[str]) -> None:
+        await self.backend.finish_large_file(upload_id, part_tokens)
+
+    async def cancel_large_file(self, upload_id: str) -> None:
+        await self.backend.cancel_large_file(upload_id)
+
+    async def _fill(self, file_key: str) -> bool:
+        """
+        Copy an object from the backend into the cache.
+        Returns False when it could not be cached (larger than the budget).
+        """
+        chunks = await self.backend.open_stream(file_key)
+        writer = await asyncio.to_thread(self.cache.writer, file_key)
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(writer.write, chunk)
+                if not writer.active:
+                    break
+        except BaseException:
+            # Never publish a partial entry
+            writer.abort()
+            raise
+        finally:
+            await chunks.aclose()
+        return await asyncio.to_thread(writer.commit)
+
+    async def _open_cached(self, file_key: str) -> Optional[BinaryIO]:
+        """
+        Open the cached copy of an object, filling the cache on a miss.
+        Concurrent misses for one key share a single backend fetch.
+        """
+        f = await asyncio.to_thread(self.cache.open, file_key)
+        if f is not None:
+            return f
+        if not await self._fills.do(file_key, lambda: self._fill(file_key)):
+            return None
+        return await asyncio.to_thread(self.cache.open, file_key, count=False)
+
+    async def download(self, file_key: str) -> Tuple[bytes, str]:
+        f = await self._open_cached(file_key)
+        if f is None:
+            return await self.backend.download(file_key)
+        with f:
+            content = await asyncio.to_thread(f.read)
+        return content, guess_content_type(file_key)
+
+    async def open_stream(
+        self, file_key: str, byte_range: Optional[Tuple[int, int]] = None
+    ) -> AsyncIterator[bytes]:
+        if byte_range is None:
+            f = await self._open_cached(file_key)
+        else:
+            # Ranged reads only use entries that are already cached
+            f = await asyncio.to_thread(self.cache.open, file_key)
+        if f is not None:
+            return iter_file(f, byte_range)
+        return await self.backend.open_stream(file_key, byte_range)
+
+    async def delete(self, file_key: str) -> bool:
+        await asyncio.to_thread(self.cache.invalidate, file_key)
+        return await self.backend.delete(file_key)
+
+    async def stat(self, file_key: str) -> Optional[StoredObject]:
+        return await self.backend.stat(file_key)
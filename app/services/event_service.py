@@ -1,11 +1,31 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, tuple_, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import decode_position, encode_position
+from app.core.serialization import schema_columns
+from app.core.singleflight import SingleFlight
+from app.db.session import bind_name, sibling_session
 from app.models.event import Event
-from app.schemas.event import EventCreate, EventUpdate
+from app.schemas.event import Event as EventSchema, EventCreate, EventUpdate
+from app.services.response_cache_service import response_cache
+
+# Coalesce identical concurrent list queries across requests in this worker
+_events_flight = SingleFlight("events")
+
+# Listings select just the columns of the response schema and return plain
+# dicts, which are serialized without building models
+_EVENT_COLUMNS = schema_columns(Event, EventSchema)
+
+# Response cache tags: the event listing, and a single event
+EVENTS_TAG = "events"
+
+
+def event_tag(event_id: UUID) -> str:
+    return f"event:{event_id}"
+
 
 class EventService:
     def __init__(self, db: AsyncSession):
@@ -16,15 +36,53 @@ class EventService:
         self.db.add(db_event)
         await self.db.commit()
         await self.db.refresh(db_event)
+        await response_cache.invalidate(EVENTS_TAG)
         return db_event
 
     async def get_event(self, event_id: UUID) -> Optional[Event]:
         result = await self.db.execute(select(Event).filter(Event.id == event_id))
         return result.scalars().first()
 
-    async def get_events(self, skip: int = 0, limit: int = 20) -> List[Event]:
-        result = await self.db.execute(select(Event).offset(skip).limit(limit))
-        return result.scalars().all()
+    async def get_events(self, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """Deprecated offset pagination; use ``get_events_page``."""
+        key = (bind_name(self.db), "offset", skip, limit)
+        return await _events_flight.do(key, lambda: self._coalesced(EventService._get_events, skip, limit))
+
+    async def _get_events(self, skip: int, limit: int) -> List[Dict[str, Any]]:
+        result = await self.db.execute(
+            select(*_EVENT_COLUMNS)
+            .order_by(Event.created_at.desc(), Event.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return [row._asdict() for row in result]
+
+    async def get_events_page(
+        self, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Events newest first, ``limit`` at a time, as dicts shaped like the
+        ``Event`` schema, and the cursor of the next page (None on the last).
+        Raises ValueError for a malformed cursor.
+        """
+        position = decode_position(cursor) if cursor else None
+        key = (bind_name(self.db), "keyset", limit, position)
+        return await _events_flight.do(key, lambda: self._coalesced(EventService._get_events_page, limit, position))
+
+    async def _coalesced(self, query, *args):
+        # Shared with other requests' callers, so it gets a session of its own
+        async with sibling_session(self.db) as db:
+            return await query(EventService(db), *args)
+
+    async def _get_events_page(self, limit: int, position) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        stmt = select(*_EVENT_COLUMNS).order_by(Event.created_at.desc(), Event.id.desc()).limit(limit + 1)
+        if position is not None:
+            stmt = stmt.filter(tuple_(Event.created_at, Event.id) < position)
+        events = [row._asdict() for row in await self.db.execute(stmt)]
+        if len(events) <= limit:
+            return events, None
+        events = events[:limit]
+        return events, encode_position(events[-1]["created_at"], events[-1]["id"])
 
     async def update_event(self, event_id: UUID, event_in: EventUpdate) -> Optional[Event]:
         db_event = await self.get_event(event_id)
@@ -37,6 +95,7 @@ class EventService:
             
         await self.db.commit()
         await self.db.refresh(db_event)
+        await response_cache.invalidate(EVENTS_TAG, event_tag(event_id))
         return db_event
 
     async def delete_event(self, event_id: UUID) -> bool:
@@ -46,4 +105,5 @@ class EventService:
             
         await self.db.delete(db_event)
         await self.db.commit()
+        await response_cache.invalidate(EVENTS_TAG, event_tag(event_id))
         return True
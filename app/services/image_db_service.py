@@ -1,23 +1,348 @@
-from typing import Dict, List, Optional, Tuple
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Integer, case, cast, delete, extract, func, insert, literal, or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.pagination import decode_cursor, decode_position, encode_cursor, encode_position
+from app.core.serialization import schema_columns
+from app.core.singleflight import SingleFlight
+from app.db.functions import utc_month_start
+from app.db.session import bind_name, sibling_session
 from app.models.image import Image
-from app.schemas.image import ImageCreate, ImageUpdate
+from app.models.image_blob import ImageBlob
+from app.models.image_job import ImageJob
+from app.models.image_month import ImageMonth
+from app.models.image_variant import ImageVariant
+from app.schemas.image import (
+    Image as ImageSchema, ImageCreate, ImageUpdate, ImageVariant as ImageVariantSchema, build_srcset,
+)
+from app.services.metadata_cache_service import ImageMetadata, image_key_filter, image_metadata_cache
+from app.services.response_cache_service import response_cache
+from app.services.storage_service import derived_storage_key
+
+# Coalesce identical concurrent reads across requests in this worker
+_image_by_key_flight = SingleFlight("image_by_key")
+_grouped_images_flight = SingleFlight("images_grouped")
+
+READY = "ready"
+
+# Response cache tag of the image listings
+IMAGES_TAG = "images"
+
+# Listings select just the columns of the response schemas and return plain
+# dicts, which are serialized without building models
+_IMAGE_COLUMNS = schema_columns(Image, ImageSchema, exclude={"variants"})
+_VARIANT_COLUMNS = schema_columns(ImageVariant, ImageVariantSchema)
+
+# Images whose variants are loaded per query (as ``selectin`` loading does)
+_VARIANTS_BATCH = 500
+
+MONTH_NAMES = [
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'
+]
+
+
+def upload_source_key(file_key: str) -> str:
+    """Where the raw upload of an image still being processed is kept."""
+    return derived_storage_key(file_key, "source")
+
+
+def image_storage_keys(image: Image) -> List[str]:
+    """Keys an image can be served by: its original's and its variants'."""
+    return [image.uploadthing_key] + [variant.storage_key for variant in image.variants]
+
+
+def make_servable(image: Image) -> None:
+    """Let this worker serve an image that just became ready by any of its keys."""
+    for key in image_storage_keys(image):
+        image_key_filter.add(key)
+        # Drop a cached "does not exist" for this key
+        image_metadata_cache.invalidate(key)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # Month boundaries are computed naive (UTC); compare them as UTC
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _next_month(start: datetime) -> datetime:
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+def _year_and_month(upload_date):
+    """SQL (year, month) integers of the UTC month of a timestamp column."""
+    start = utc_month_start(upload_date)
+    return cast(extract("year", start), Integer), cast(extract("month", start), Integer)
+
 
 class ImageService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_image(self, image_data: dict) -> Image:
+    async def create_image(self, image_data: dict, variants: Optional[List[dict]] = None, claimed: bool = False) -> Image:
+        """
+        ``claimed``: the stored files are shared with existing images and were
+        claimed with ``claim_stored_image``. Otherwise newly stored files with a
+        ``content_hash`` are registered for sharing.
+        """
         db_image = Image(**image_data)
+        db_image.variants = [ImageVariant(**variant) for variant in variants or []]
         self.db.add(db_image)
+        if not claimed:
+            self._register_blobs([image_data])
+        await self.db.flush()
+        await self._add_to_months([db_image.id])
         await self.db.commit()
         await self.db.refresh(db_image)
+        make_servable(db_image)
+        await response_cache.invalidate(IMAGES_TAG)
         return db_image
 
+    async def mark_ready(self, image: Image, image_data: dict, variants: List[dict]) -> None:
+        """
+        Complete an image accepted for background processing with what
+        processing stored (as given to ``create_image``) and mark it ready:
+        its files are registered for sharing and it is counted in its month.
+        Runs in the caller's transaction; after committing, call
+        ``make_servable``.
+        """
+        for field in ("image_url", "file_size", "mime_type", "width", "height",
+                      "perceptual_hash", "placeholder", "dominant_color"):
+            setattr(image, field, image_data[field])
+        image.variants = [ImageVariant(**variant) for variant in variants]
+        image.status = READY
+        self._register_blobs([image_data])
+        await self._add_to_months([image.id])
+
+    async def create_images(self, items: List[Tuple[dict, List[dict], bool]]) -> List[Image]:
+        """
+        Create many images from ``(image_data, variants, claimed)`` triples
+        (see ``create_image``) in one transaction, with a single bulk
+        INSERT ... RETURNING per table. Images are returned in the order
+        given, with their variants loaded.
+        """
+        if not items:
+            return []
+        image_rows = [{"id": uuid.uuid4(), **image_data} for image_data, _, _ in items]
+        variant_rows = [
+            {"image_id": row["id"], **variant}
+            for row, (_, variants, _) in zip(image_rows, items)
+            for variant in variants
+        ]
+        self._register_blobs([image_data for image_data, _, claimed in items if not claimed])
+        result = await self.db.scalars(
+            insert(Image).returning(Image, sort_by_parameter_order=True), image_rows
+        )
+        db_images = result.all()
+        by_image = defaultdict(list)
+        if variant_rows:
+            result = await self.db.scalars(insert(ImageVariant).returning(ImageVariant), variant_rows)
+            for variant in result.all():
+                by_image[variant.image_id].append(variant)
+        for db_image in db_images:
+            set_committed_value(db_image, "variants", sorted(by_image[db_image.id], key=lambda v: v.width))
+        await self._add_to_months([db_image.id for db_image in db_images])
+        await self.db.commit()
+
+        for db_image in db_images:
+            make_servable(db_image)
+        await response_cache.invalidate(IMAGES_TAG)
+        return db_images
+
+    def _register_blobs(self, images_data: List[dict]) -> None:
+        for image_data in images_data:
+            if image_data.get("content_hash"):
+                self.db.add(ImageBlob(
+                    storage_key=image_data["uploadthing_key"],
+                    content_hash=image_data["content_hash"],
+                    ref_count=1,
+                ))
+
+    def _upsert(self):
+        dialect = postgresql if self.db.get_bind().dialect.name == "postgresql" else sqlite
+        return dialect.insert(ImageMonth)
+
+    async def _add_to_months(self, image_ids: List[UUID]) -> None:
+        """
+        Count images that just became ready in the ``ImageMonth`` summary,
+        making each the cover of its month when it is the newest there.
+        Runs in the caller's transaction, after the rows are flushed.
+        """
+        year, month = _year_and_month(Image.upload_date)
+        for image_id in image_ids:
+            stmt = self._upsert().from_select(
+                ["year", "month", "image_count", "cover_image_id", "cover_upload_date"],
+                select(year, month, literal(1), Image.id, Image.upload_date)
+                .filter(Image.id == image_id, Image.status == READY),
+            )
+            newer = or_(
+                ImageMonth.cover_upload_date.is_(None),
+                stmt.excluded.cover_upload_date >= ImageMonth.cover_upload_date,
+            )
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=["year", "month"],
+                set_={
+                    "image_count": ImageMonth.image_count + stmt.excluded.image_count,
+                    "cover_image_id": case((newer, stmt.excluded.cover_image_id), else_=ImageMonth.cover_image_id),
+                    "cover_upload_date": case((newer, stmt.excluded.cover_upload_date), else_=ImageMonth.cover_upload_date),
+                    "updated_at": func.now(),
+                },
+            ))
+
+    async def _remove_from_month(self, image: Image) -> None:
+        """Uncount a ready image that is being deleted, finding a new cover if needed."""
+        upload_date = _as_utc(image.upload_date).astimezone(timezone.utc)
+        in_month = (ImageMonth.year == upload_date.year, ImageMonth.month == upload_date.month)
+        result = await self.db.execute(
+            update(ImageMonth)
+            .where(*in_month)
+            .values(image_count=ImageMonth.image_count - 1, updated_at=func.now())
+            .returning(ImageMonth.image_count, ImageMonth.cover_image_id)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        if row is None or (row.image_count > 0 and row.cover_image_id != image.id):
+            return
+        if row.image_count <= 0:
+            await self.db.execute(delete(ImageMonth).where(*in_month).execution_options(synchronize_session=False))
+            return
+
+        month_start = datetime(upload_date.year, upload_date.month, 1, tzinfo=timezone.utc)
+        result = await self.db.execute(
+            select(Image.id, Image.upload_date)
+            .filter(
+                Image.status == READY,
+                Image.id != image.id,
+                Image.upload_date >= month_start,
+                Image.upload_date < _next_month(month_start),
+            )
+            .order_by(Image.upload_date.desc(), Image.id.desc())
+            .limit(1)
+        )
+        cover = result.first()
+        await self.db.execute(
+            update(ImageMonth)
+            .where(*in_month)
+            .values(
+                cover_image_id=cover.id if cover else None,
+                cover_upload_date=cover.upload_date if cover else None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def rebuild_months(self) -> int:
+        """
+        Recompute the ``ImageMonth`` summary from ``images`` in one
+        transaction. Returns the number of months with images.
+        """
+        year, month = _year_and_month(Image.upload_date)
+        month_start = utc_month_start(Image.upload_date)
+        ranked = (
+            select(
+                year.label("year"),
+                month.label("month"),
+                func.count().over(partition_by=month_start).label("image_count"),
+                func.row_number().over(
+                    partition_by=month_start, order_by=(Image.upload_date.desc(), Image.id.desc())
+                ).label("rank"),
+                Image.id,
+                Image.upload_date,
+            )
+            .filter(Image.status == READY)
+            .subquery()
+        )
+        await self.db.execute(delete(ImageMonth))
+        result = await self.db.execute(
+            insert(ImageMonth).from_select(
+                ["year", "month", "image_count", "cover_image_id", "cover_upload_date"],
+                select(ranked.c.year, ranked.c.month, ranked.c.image_count, ranked.c.id, ranked.c.upload_date)
+                .filter(ranked.c.rank == 1),
+            )
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def get_timeline(self) -> List[ImageMonth]:
+        """Months with ready images, newest first, from the summary table."""
+        result = await self.db.execute(
+            select(ImageMonth)
+            .filter(ImageMonth.image_count > 0)
+            .order_by(ImageMonth.year.desc(), ImageMonth.month.desc())
+        )
+        return result.scalars().all()
+
+    async def claim_stored_image(self, content_hash: str) -> Optional[Image]:
+        """
+        Take a reference to the stored files of an existing image with this
+        content, so they outlive its deletion, and return that image (to copy
+        its keys and metadata from). Commits immediately. Returns None when
+        there is nothing to share. Hand the reference to ``create_image``
+        with ``claimed=True``, or give it back with ``release_stored_image``.
+        """
+        shared_key = (
+            select(ImageBlob.storage_key)
+            .filter(ImageBlob.content_hash == content_hash)
+            .limit(1)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            update(ImageBlob)
+            .where(ImageBlob.storage_key == shared_key)
+            .values(ref_count=ImageBlob.ref_count + 1)
+            .returning(ImageBlob.storage_key)
+            .execution_options(synchronize_session=False)
+        )
+        key = result.scalar_one_or_none()
+        await self.db.commit()
+        if key is None:
+            return None
+
+        image = await self.get_image_by_key(key)
+        if image is None:
+            # Its images were deleted since; start afresh
+            await self.release_stored_image(key)
+            return None
+        return image
+
+    async def _release(self, key: str) -> bool:
+        """
+        Drop one reference to stored files; True when none are left and the
+        files should be deleted from storage.
+        """
+        result = await self.db.execute(
+            update(ImageBlob)
+            .where(ImageBlob.storage_key == key)
+            .values(ref_count=ImageBlob.ref_count - 1)
+            .returning(ImageBlob.ref_count)
+            .execution_options(synchronize_session=False)
+        )
+        remaining = result.scalar_one_or_none()
+        if remaining is None:
+            # Uploaded before deduplication (or directly); never shared
+            return True
+        if remaining > 0:
+            return False
+        # The row lock taken above keeps claims out until this commits
+        result = await self.db.execute(
+            delete(ImageBlob)
+            .where(ImageBlob.storage_key == key, ImageBlob.ref_count <= 0)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    async def release_stored_image(self, key: str) -> bool:
+        """Give back a reference taken by ``claim_stored_image``."""
+        orphaned = await self._release(key)
+        await self.db.commit()
+        return orphaned
+
     async def get_image(self, image_id: UUID) -> Optional[Image]:
         result = await self.db.execute(select(Image).filter(Image.id == image_id))
         return result.scalars().first()
@@ -25,81 +350,259 @@ class ImageService:
     async def get_image_by_key(self, file_key: str) -> Optional[Image]:
         """Get an image by its file key (uploadthing_key in the database)."""
         result = await self.db.execute(
-            select(Image).filter(Image.uploadthing_key == file_key)
+            select(Image)
+            .filter(Image.uploadthing_key == file_key, Image.status == READY)
+            .order_by(Image.upload_date)
         )
         return result.scalars().first()
 
-    async def get_images(self, skip: int = 0, limit: int = 20) -> List[Image]:
+    async def get_image_metadata_by_key(self, file_key: str) -> Optional[ImageMetadata]:
+        """
+        Cached existence/metadata check for serving an image by key, that of
+        its original or of one of its variants. Unknown keys are usually
+        answered from the key filter or the negative cache without touching
+        the database. Concurrent lookups of the same key on the same
+        database share one query.
+        """
+        found, metadata = image_metadata_cache.get(file_key)
+        if found:
+            return metadata
+        if not image_key_filter.might_contain(file_key):
+            return None
+
+        metadata, processing = await _image_by_key_flight.do(
+            (bind_name(self.db), file_key),
+            lambda: self._coalesced(ImageService._get_metadata_by_key, file_key),
+        )
+        # Do not remember that an image is not ready yet (the worker that
+        # finishes it only clears its own cache), nor that a replica does
+        # not have a just-uploaded image yet
+        if metadata is not None or (not processing and bind_name(self.db) == "primary"):
+            image_metadata_cache.set(file_key, metadata)
+        return metadata
+
+    async def _get_metadata_by_key(self, file_key: str) -> Tuple[Optional[ImageMetadata], bool]:
+        """
+        The metadata of the ready image served by ``file_key``, and whether
+        an image with that key exists but is not ready (it may become so).
+        """
+        image = await self.get_image_by_key(file_key)
+        if image is None:
+            # A variant's own URL, as listed in ``srcset``
+            result = await self.db.execute(
+                select(Image)
+                .join(Image.variants)
+                .filter(ImageVariant.storage_key == file_key, Image.status == READY)
+                .order_by(Image.upload_date)
+            )
+            image = result.scalars().first()
+        if image is not None:
+            return ImageMetadata.from_image(image), False
         result = await self.db.execute(
-            select(Image)
-            .order_by(Image.upload_date.desc())
+            select(Image.id).filter(Image.uploadthing_key == file_key, Image.status != READY).limit(1)
+        )
+        return None, result.first() is not None
+
+    async def _coalesced(self, query, *args):
+        # Shared with other requests' callers, so it gets a session of its own
+        async with sibling_session(self.db) as db:
+            return await query(ImageService(db), *args)
+
+    async def _with_variants(self, images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add ``variants`` and ``srcset`` to image dicts, completing the ``Image`` schema."""
+        by_image: Dict[UUID, List[Dict[str, Any]]] = {image["id"]: [] for image in images}
+        ids = list(by_image)
+        for start in range(0, len(ids), _VARIANTS_BATCH):
+            result = await self.db.execute(
+                select(ImageVariant.image_id, *_VARIANT_COLUMNS)
+                .filter(ImageVariant.image_id.in_(ids[start:start + _VARIANTS_BATCH]))
+                .order_by(ImageVariant.width)
+            )
+            for row in result:
+                variant = row._asdict()
+                by_image[variant.pop("image_id")].append(variant)
+        for image in images:
+            variants = image["variants"] = by_image[image["id"]]
+            image["srcset"] = build_srcset(
+                image["image_url"],
+                image["width"],
+                image["mime_type"],
+                ((v["image_url"], v["width"], v["mime_type"]) for v in variants),
+            )
+        return images
+
+    async def get_images(self, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """Deprecated offset pagination; use ``get_images_page``."""
+        result = await self.db.execute(
+            select(*_IMAGE_COLUMNS)
+            .filter(Image.status == READY)
+            .order_by(Image.upload_date.desc(), Image.id.desc())
             .offset(skip)
             .limit(limit)
         )
-        return result.scalars().all()
+        return await self._with_variants([row._asdict() for row in result])
+
+    async def get_images_page(
+        self, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Ready images newest first, ``limit`` at a time, as dicts shaped like
+        the ``Image`` schema, and the cursor of the next page (None on the
+        last). Pages stay consistent while images are added or deleted.
+        Raises ValueError for a malformed cursor.
+        """
+        stmt = (
+            select(*_IMAGE_COLUMNS)
+            .filter(Image.status == READY)
+            .order_by(Image.upload_date.desc(), Image.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            stmt = stmt.filter(tuple_(Image.upload_date, Image.id) < decode_position(cursor))
+        images = [row._asdict() for row in await self.db.execute(stmt)]
+        next_cursor = None
+        if len(images) > limit:
+            images = images[:limit]
+            next_cursor = encode_position(images[-1]["upload_date"], images[-1]["id"])
+        return await self._with_variants(images), next_cursor
         
-    async def get_images_grouped_by_year_month(self) -> Dict[str, Dict]:
+    async def get_images_grouped_by_year_month(
+        self,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        months: Optional[int] = None,
+        per_month: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Images grouped by year and month (see ``_get_images_grouped_by_year_month``).
+        Concurrent callers share one query and one result; do not mutate it.
         """
-        Retrieve all images grouped by year and month in the format:
+        args = (year, month, months, per_month, cursor)
+        return await _grouped_images_flight.do(
+            (bind_name(self.db), *args),
+            lambda: self._coalesced(ImageService._get_images_grouped_by_year_month, *args),
+        )
+
+    async def _get_images_grouped_by_year_month(
+        self,
+        year: Optional[int],
+        month: Optional[int],
+        months: Optional[int],
+        per_month: Optional[int],
+        cursor: Optional[str],
+    ) -> Dict[str, Any]:
+        """
+        Retrieve images grouped by year and month, newest first, shaped like
+        ``GroupedImagesResponse``:
         {
             "year": {
-                "2024": {
-                    "april": { "images": [...] },
-                    "june": { "images": [...] }
-                },
                 "2025": {
-                    "april": { "images": [...] },
-                    "june": { "images": [...] }
+                    "june": { "images": [...], "total": 12, "next_cursor": null },
+                    "april": { "images": [...], "total": 3, "next_cursor": null }
                 }
-            }
+            },
+            "next_cursor": null
         }
+
+        Months are counted, and images ranked within their month, in SQL so
+        only the images returned are loaded. ``year``/``month`` narrow the
+        range, ``months`` pages through months (``next_cursor`` continues
+        with older ones) and ``per_month`` caps the images of each month (the
+        month's ``next_cursor`` loads more of it). Raises ValueError for a
+        malformed cursor.
         """
-        from datetime import datetime
-        from collections import defaultdict
-        
-        # Get all images ordered by upload date (newest first)
-        result = await self.db.execute(
-            select(Image)
-            .order_by(Image.upload_date.desc())
+        lo = hi = after = None
+        if year is not None:
+            lo = datetime(year, month or 1, 1)
+            hi = _next_month(lo) if month else lo.replace(year=year + 1)
+        if cursor is not None:
+            position = decode_cursor(cursor)
+            try:
+                start = datetime.strptime(position["month"], "%Y-%m")
+                if "after" in position:
+                    # More images of one month
+                    lo, hi, months = start, _next_month(start), 1
+                    after_date = datetime.fromisoformat(position["after"][0])
+                    after = (_as_utc(after_date), UUID(position["after"][1]))
+                else:
+                    # Months older than this one
+                    hi = start if hi is None else min(hi, start)
+            except (KeyError, IndexError, TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+
+        month_start = utc_month_start(Image.upload_date)
+        filters = [Image.status == READY]
+        if lo is not None:
+            filters.append(Image.upload_date >= _as_utc(lo))
+        if hi is not None:
+            filters.append(Image.upload_date < _as_utc(hi))
+
+        # Months with images, newest first, and how many each has
+        stmt = (
+            select(month_start.label("month"), func.count().label("total"))
+            .filter(*filters)
+            .group_by(month_start)
+            .order_by(month_start.desc())
         )
-        images = result.scalars().all()
-        
-        # Group images by year and month
-        grouped = defaultdict(lambda: defaultdict(dict))
-        month_names = [
-            'january', 'february', 'march', 'april', 'may', 'june',
-            'july', 'august', 'september', 'october', 'november', 'december'
-        ]
-        
-        for image in images:
-            year = str(image.upload_date.year)
-            month_num = image.upload_date.month
-            month_name = month_names[month_num - 1].lower()
-            
-            # Convert SQLAlchemy model to dict to make it JSON serializable
-            image_dict = {
-                "id": str(image.id),
-                "description": image.description,
-                "upload_date": image.upload_date.isoformat(),
-                "image_url": image.image_url,
-                "uploadthing_key": image.uploadthing_key,
-                "file_size": image.file_size,
-                "mime_type": image.mime_type,
-                "width": image.width,
-                "height": image.height,
-                "created_at": image.created_at.isoformat(),
-                "updated_at": image.updated_at.isoformat() if image.updated_at else None
+        if months:
+            stmt = stmt.limit(months + 1)
+        month_rows = (await self.db.execute(stmt)).all()
+        next_cursor = None
+        if months and len(month_rows) > months:
+            month_rows = month_rows[:months]
+            next_cursor = encode_cursor({"month": month_rows[-1].month.strftime("%Y-%m")})
+        if not month_rows:
+            return {"year": {}, "next_cursor": None}
+
+        # Images of those months only, at most per_month (+1 to detect more) each
+        filters.append(Image.upload_date >= _as_utc(month_rows[-1].month))
+        filters.append(Image.upload_date < _as_utc(_next_month(month_rows[0].month)))
+        if after is not None:
+            filters.append(tuple_(Image.upload_date, Image.id) < after)
+        ordering = (Image.upload_date.desc(), Image.id.desc())
+        if per_month:
+            ranked = (
+                select(
+                    Image.id,
+                    month_start.label("month"),
+                    func.row_number().over(partition_by=month_start, order_by=ordering).label("rank"),
+                )
+                .filter(*filters)
+                .subquery()
+            )
+            stmt = (
+                select(*_IMAGE_COLUMNS, ranked.c.month)
+                .join(ranked, ranked.c.id == Image.id)
+                .filter(ranked.c.rank <= per_month + 1)
+            )
+        else:
+            stmt = select(*_IMAGE_COLUMNS, month_start.label("month")).filter(*filters)
+        result = await self.db.execute(stmt.order_by(*ordering))
+
+        by_month: Dict[datetime, List[Dict[str, Any]]] = {row.month: [] for row in month_rows}
+        for row in result:
+            image = row._asdict()
+            by_month[image.pop("month")].append(image)
+
+        grouped: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for row in month_rows:
+            images = by_month[row.month]
+            month_cursor = None
+            if per_month and len(images) > per_month:
+                images = by_month[row.month] = images[:per_month]
+                last = images[-1]
+                month_cursor = encode_cursor({
+                    "month": row.month.strftime("%Y-%m"),
+                    "after": [last["upload_date"].isoformat(), str(last["id"])],
+                })
+            grouped.setdefault(str(row.month.year), {})[MONTH_NAMES[row.month.month - 1]] = {
+                "images": images,
+                "total": row.total,
+                "next_cursor": month_cursor,
             }
-            
-            if month_name not in grouped[year]:
-                grouped[year][month_name] = {"images": []}
-                
-            # Add the image if it's not already in the list
-            if not any(img["id"] == str(image.id) for img in grouped[year][month_name]["images"]):
-                grouped[year][month_name]["images"].append(image_dict)
-        
-        # Convert defaultdict to regular dict for JSON serialization
-        return {"year": {year: dict(months) for year, months in grouped.items()}}
+        await self._with_variants([image for images in by_month.values() for image in images])
+        return {"year": grouped, "next_cursor": next_cursor}
 
     async def update_image(self, image_id: UUID, image_in: ImageUpdate) -> Optional[Image]:
         db_image = await self.get_image(image_id)
@@ -112,17 +615,31 @@ class ImageService:
             
         await self.db.commit()
         await self.db.refresh(db_image)
+        await response_cache.invalidate(IMAGES_TAG)
         return db_image
 
-    async def delete_image(self, image_id: UUID) -> Optional[str]:
+    async def delete_image(self, image_id: UUID) -> Optional[List[str]]:
         """
-        Deletes image from DB and returns the uploadthing_key for external deletion.
+        Deletes image from DB and returns the storage keys to delete externally:
+        its original and variants, or nothing while other images share them.
+        Images still being processed also leave their raw upload behind.
         """
         db_image = await self.get_image(image_id)
         if not db_image:
             return None
             
         key = db_image.uploadthing_key
+        served_keys = image_storage_keys(db_image)
+        keys = list(served_keys)
+        if db_image.status == READY:
+            await self._remove_from_month(db_image)
+        else:
+            keys.append(upload_source_key(key))
+            await self.db.execute(delete(ImageJob).where(ImageJob.image_id == image_id))
         await self.db.delete(db_image)
+        orphaned = await self._release(key)
         await self.db.commit()
-        return key
+        for served_key in served_keys:
+            image_metadata_cache.invalidate(served_key)
+        await response_cache.invalidate(IMAGES_TAG)
+        return keys if orphaned else []
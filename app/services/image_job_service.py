@@ -0,0 +1,284 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi import UploadFile
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.spool import PayloadTooLarge, SpooledContent, spool_stream
+from app.models.image import Image
+from app.models.image_job import ImageJob
+from app.services.image_db_service import IMAGES_TAG, ImageService, make_servable, upload_source_key
+from app.services.image_processing_service import ImageProcessingBusy
+from app.services.image_service import UPLOAD_IMAGE_FORMATS, ImageProcessor
+from app.services.image_upload_service import ImageStorageError, ImageUploadService
+from app.services.response_cache_service import response_cache
+from app.services.storage_service import StorageBackend, new_storage_key
+
+PENDING = "pending"
+PROCESSING = "processing"
+FAILED = "failed"
+
+# Bytes read from the start of an upload to validate it before accepting it
+INSPECT_HEADER_BYTES = 256 * 1024
+
+# Failed attempts are retried after 30s, 60s, 120s, ...
+RETRY_BACKOFF = timedelta(seconds=30)
+
+image_job_stats: Dict[str, int] = {
+    "enqueued": 0, "completed": 0, "retried": 0, "failed": 0,
+}
+
+
+class ImageJobService:
+    """
+    Background processing of uploads. ``enqueue_upload`` validates an upload
+    from its header, stores it raw and creates its ``Image`` with status
+    "pending" plus an ``ImageJob``; workers (``run_image_jobs``) claim jobs
+    with ``run_next``, which processes and stores the image and its variants
+    exactly as a synchronous upload would and marks it "ready".
+
+    Jobs live in the database, so they survive restarts and are shared by
+    every worker process. A job whose worker died is taken over once it has
+    been locked for ``IMAGE_JOB_TIMEOUT_SECONDS``.
+    """
+
+    def __init__(self, db: AsyncSession, storage: StorageBackend):
+        self.db = db
+        self.storage = storage
+        self.images = ImageService(db)
+
+    async def enqueue_upload(self, file: UploadFile, description: str) -> Image:
+        """
+        Raises ``PayloadTooLarge``, ``ValueError`` (not a valid image) or
+        ``ImageStorageError``.
+        Duplicates of stored content are created ready straight away.
+        """
+        uploads = ImageUploadService(self.storage, self.db)
+        upload = await uploads.spool(file)
+        try:
+            stored = await uploads.reuse_duplicate(upload, description)
+            if stored is not None:
+                try:
+                    return await self.images.create_image(stored.image_data, stored.variants, claimed=True)
+                except Exception:
+                    await self.db.rollback()
+                    await uploads.discard(stored)
+                    raise
+
+            with upload.open() as f:
+                header = f.read(INSPECT_HEADER_BYTES)
+            fmt, width, height = ImageProcessor.inspect(header, settings.IMAGE_MAX_PIXELS)
+            mime_type = UPLOAD_IMAGE_FORMATS[fmt]
+            key = new_storage_key(f"{(file.filename or 'image').split('.')[0]}.{fmt.lower()}")
+            source_key = upload_source_key(key)
+            try:
+                with upload.open() as f:
+                    await self.storage.upload(f, source_key, mime_type)
+            except Exception as e:
+                raise ImageStorageError(f"Failed to upload image: {e}") from e
+        finally:
+            upload.discard()
+
+        image = Image(
+            description=description,
+            image_url=self.storage.public_url(key),
+            uploadthing_key=key,
+            file_size=upload.size,
+            mime_type=mime_type,
+            width=width,
+            height=height,
+            content_hash=upload.sha256,
+            status=PENDING,
+        )
+        self.db.add(image)
+        try:
+            await self.db.flush()
+            self.db.add(ImageJob(image_id=image.id, source_key=source_key, status=PENDING))
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            await self.storage.delete(source_key)
+            raise
+        await self.db.refresh(image)
+        image_job_stats["enqueued"] += 1
+        return image
+
+    async def get_status(self, image_id: UUID) -> Optional[Tuple[Image, Optional[ImageJob]]]:
+        image = await self.images.get_image(image_id)
+        if image is None:
+            return None
+        result = await self.db.execute(select(ImageJob).filter(ImageJob.image_id == image_id))
+        return image, result.scalars().first()
+
+    async def _claim(self):
+        """
+        Lock the next due job (or one abandoned by a dead worker) and mark it
+        and its image "processing". Concurrent workers skip each other's rows
+        (``SKIP LOCKED``; SQLite serializes the UPDATE instead).
+        """
+        now = datetime.now(timezone.utc)
+        next_job = (
+            select(ImageJob.id)
+            .filter(or_(
+                and_(ImageJob.status == PENDING, ImageJob.run_after <= now),
+                and_(
+                    ImageJob.status == PROCESSING,
+                    ImageJob.locked_at < now - timedelta(seconds=settings.IMAGE_JOB_TIMEOUT_SECONDS),
+                ),
+            ))
+            .order_by(ImageJob.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            update(ImageJob)
+            .where(ImageJob.id == next_job)
+            .values(status=PROCESSING, locked_at=now, attempts=ImageJob.attempts + 1)
+            .returning(ImageJob.id, ImageJob.image_id, ImageJob.source_key, ImageJob.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        job = result.first()
+        if job is not None:
+            await self.db.execute(
+                update(Image)
+                .where(Image.id == job.image_id)
+                .values(status=PROCESSING)
+                .execution_options(synchronize_session=False)
+            )
+        await self.db.commit()
+        return job
+
+    async def run_next(self) -> bool:
+        """Run one due job; False when there was none."""
+        job = await self._claim()
+        if job is None:
+            return False
+
+        image = await self.db.get(Image, job.image_id, populate_existing=True)
+        if image is None:
+            # Deleted while queued
+            await self.db.execute(delete(ImageJob).where(ImageJob.id == job.id))
+            await self.db.commit()
+            await self.storage.delete(job.source_key)
+            return True
+        if job.attempts > settings.IMAGE_JOB_MAX_ATTEMPTS:
+            await self._fail(job, f"Gave up after {job.attempts - 1} attempts")
+            return True
+
+        uploads = ImageUploadService(self.storage, self.db)
+        try:
+            upload = await self._download(job.source_key)
+            try:
+                stored = await uploads.process_and_store(upload, image.description, key=image.uploadthing_key)
+            finally:
+                upload.discard()
+        except (ValueError, PayloadTooLarge) as e:
+            await self._fail(job, str(e))
+            return True
+        except ImageProcessingBusy:
+            # Not the image's fault; try again shortly without using up an attempt
+            await self._reschedule(job, None, timedelta(seconds=settings.IMAGE_JOB_POLL_SECONDS), job.attempts - 1)
+            return True
+        except Exception as e:
+            await self._retry(job, str(e))
+            return True
+
+        await self.images.mark_ready(image, stored.image_data, stored.variants)
+        await self.db.execute(delete(ImageJob).where(ImageJob.id == job.id))
+        try:
+            await self.db.commit()
+        except Exception as e:
+            # Most likely deleted while processing
+            await self.db.rollback()
+            await uploads.discard(stored)
+            print(f"Failed to complete image job {job.id}: {e}")
+            return True
+
+        make_servable(image)
+        await response_cache.invalidate(IMAGES_TAG)
+        await self.storage.delete(job.source_key)
+        image_job_stats["completed"] += 1
+        return True
+
+    async def _download(self, key: str) -> SpooledContent:
+        chunks = await self.storage.open_stream(key)
+        return await spool_stream(
+            lambda size: anext(chunks, b""),
+            max_bytes=settings.IMAGE_UPLOAD_MAX_BYTES,
+            memory_limit=settings.IMAGE_UPLOAD_SPOOL_BYTES,
+            spool_dir=settings.UPLOAD_SPOOL_PATH,
+        )
+
+    async def _reschedule(self, job, error: Optional[str], delay: timedelta, attempts: int) -> None:
+        await self.db.execute(
+            update(ImageJob)
+            .where(ImageJob.id == job.id)
+            .values(
+                status=PENDING,
+                attempts=attempts,
+                last_error=error,
+                locked_at=None,
+                run_after=datetime.now(timezone.utc) + delay,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            update(Image)
+            .where(Image.id == job.image_id)
+            .values(status=PENDING)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+    async def _retry(self, job, error: str) -> None:
+        if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+            await self._fail(job, error)
+            return
+        print(f"Image job {job.id} failed (attempt {job.attempts}), retrying: {error}")
+        image_job_stats["retried"] += 1
+        await self._reschedule(job, error, RETRY_BACKOFF * 2 ** (job.attempts - 1), job.attempts)
+
+    async def _fail(self, job, error: str) -> None:
+        """Give up on a job; the image stays "failed" until deleted."""
+        await self.db.execute(
+            update(ImageJob)
+            .where(ImageJob.id == job.id)
+            .values(status=FAILED, last_error=error, locked_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            update(Image)
+            .where(Image.id == job.image_id)
+            .values(status=FAILED)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        await self.storage.delete(job.source_key)
+        image_job_stats["failed"] += 1
+
+
+async def _work(storage: StorageBackend) -> None:
+    from app.db.session import AsyncSessionLocal
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                service = ImageJobService(db, storage)
+                while await service.run_next():
+                    pass
+        except Exception as e:
+            print(f"Image job worker failed: {e}")
+        await asyncio.sleep(settings.IMAGE_JOB_POLL_SECONDS)
+
+
+async def run_image_jobs(storage: StorageBackend) -> None:
+    """
+    Background task started from the application lifespan: runs
+    ``IMAGE_JOB_WORKERS`` workers until cancelled.
+    """
+    await asyncio.gather(*(_work(storage) for _ in range(settings.IMAGE_JOB_WORKERS)))
@@ -0,0 +1,173 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, TypeVar, Union
+
+from app.core.config import settings
+from app.services.image_service import ImageProcessor, ProcessedImage
+
+T = TypeVar("T")
+
+
+class ImageProcessingBusy(Exception):
+    """Raised when the processing queue is full; the upload should be retried later."""
+
+
+class ImageProcessingPool:
+    """
+    Runs ``ImageProcessor`` work (PIL decode/resize/encode) off the event loop.
+
+    Jobs execute in a ``ProcessPoolExecutor`` of ``IMAGE_PROCESS_WORKERS``
+    processes (0 runs them on a thread instead, for tests and development).
+    Small uploads are handed to the worker as a single ``bytes`` object and
+    their encoded outputs come back the same way; large uploads travel as the
+    path of a spooled file and their outputs are written to files too. No
+    PIL objects cross processes.
+
+    At most ``IMAGE_PROCESS_MAX_CONCURRENCY`` jobs run at once; further jobs
+    wait in a FIFO queue of at most ``IMAGE_PROCESS_MAX_QUEUE`` entries, beyond
+    which ``ImageProcessingBusy`` is raised so a burst of uploads cannot
+    exhaust memory.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, max_queue: int):
+        self.workers = workers
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.queue_depth = 0
+        self.running = 0
+        self.stats: Dict[str, float] = {
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "max_queue_depth": 0,
+            "total_wait_ms": 0.0,
+            "total_run_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "max_run_ms": 0.0,
+            "last_wait_ms": 0.0,
+            "last_run_ms": 0.0,
+            "last_peak_memory_bytes": 0,
+            "max_peak_memory_bytes": 0,
+        }
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.workers > 0:
+                # spawn: forking a process that runs an event loop and threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="image-processing",
+                )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.queue_depth >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise ImageProcessingBusy("Image processing queue is full")
+
+        queued_at = time.perf_counter()
+        self.queue_depth += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queue_depth)
+        try:
+            await semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        started_at = time.perf_counter()
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_executor(), func, *args)
+        except BaseException:
+            self._finished(None, semaphore, queued_at, started_at)
+            raise
+        # The slot is held until the job itself ends: a cancelled caller (e.g.
+        # a client disconnect) leaves it running in the executor
+        future.add_done_callback(lambda f: self._finished(f, semaphore, queued_at, started_at))
+        return await asyncio.shield(future)
+
+    def _finished(
+        self,
+        future: Optional[asyncio.Future],
+        semaphore: asyncio.Semaphore,
+        queued_at: float,
+        started_at: float,
+    ) -> None:
+        self.running -= 1
+        semaphore.release()
+        # Also marks the exception retrieved when the caller went away
+        if future is None or future.cancelled() or future.exception() is not None:
+            self.stats["failed"] += 1
+        else:
+            self.stats["completed"] += 1
+        self._record(
+            wait_ms=(started_at - queued_at) * 1000,
+            run_ms=(time.perf_counter() - started_at) * 1000,
+        )
+
+    def _record(self, wait_ms: float, run_ms: float) -> None:
+        self.stats["last_wait_ms"] = round(wait_ms, 2)
+        self.stats["last_run_ms"] = round(run_ms, 2)
+        self.stats["total_wait_ms"] += wait_ms
+        self.stats["total_run_ms"] += run_ms
+        self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], round(wait_ms, 2))
+        self.stats["max_run_ms"] = max(self.stats["max_run_ms"], round(run_ms, 2))
+
+    def snapshot(self) -> Dict[str, Any]:
+        jobs = self.stats["completed"] + self.stats["failed"]
+        return {
+            **self.stats,
+            "queue_depth": self.queue_depth,
+            "running": self.running,
+            "avg_wait_ms": round(self.stats["total_wait_ms"] / jobs, 2) if jobs else 0.0,
+            "avg_run_ms": round(self.stats["total_run_ms"] / jobs, 2) if jobs else 0.0,
+        }
+
+    async def process_upload(
+        self,
+        source: Union[bytes, str],
+        variant_widths: Dict[str, int],
+        modern_formats: Sequence[str] = (),
+        max_pixels: Optional[int] = None,
+        spool_dir: Optional[str] = None,
+    ) -> ProcessedImage:
+        processed = await self.run(
+            ImageProcessor.process_upload,
+            source,
+            dict(variant_widths),
+            list(modern_formats),
+            max_pixels,
+            spool_dir,
+        )
+        self.stats["last_peak_memory_bytes"] = processed.peak_memory_bytes
+        self.stats["max_peak_memory_bytes"] = max(
+            self.stats["max_peak_memory_bytes"], processed.peak_memory_bytes
+        )
+        return processed
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_processing_pool = ImageProcessingPool(
+    workers=settings.IMAGE_PROCESS_WORKERS,
+    max_concurrency=settings.IMAGE_PROCESS_MAX_CONCURRENCY,
+    max_queue=settings.IMAGE_PROCESS_MAX_QUEUE,
+)
@@ -1,32 +1,285 @@
+import base64
+from dataclasses import dataclass, field
 from io import BytesIO
-from typing import Tuple, Optional
+from typing import Dict, List, Sequence, Tuple, Optional, Union
 from PIL import Image as PILImage
 
+from app.core.spool import SpooledContent, spool_file
+
+# Formats accepted for upload
+UPLOAD_IMAGE_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+# Modern formats we can deliver in place of JPEG/PNG, in order of preference
+MODERN_IMAGE_FORMATS = {"AVIF": "image/avif", "WEBP": "image/webp"}
+
+# Encoder settings per output format
+ENCODE_OPTIONS = {
+    "WEBP": {"quality": 85, "method": 4},
+    "AVIF": {"quality": 60},
+}
+
+# Width of the inline WebP placeholder painted while an image loads
+PLACEHOLDER_WIDTH = 16
+
+def negotiate_image_types(accept: Optional[str]) -> List[str]:
+    """
+    Modern image MIME types explicitly accepted by the client (q > 0),
+    in server preference order. Wildcards are ignored so clients that send
+    only ``*/*`` keep getting the original format.
+    """
+    if not accept:
+        return []
+    accepted = set()
+    for part in accept.split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(media_type.lower())
+    return [mime for mime in MODERN_IMAGE_FORMATS.values() if mime in accepted]
+
+@dataclass
+class ProcessedVariant:
+    name: str
+    width: int
+    height: int
+    content: SpooledContent
+    format: str
+
+@dataclass
+class ImageSummary:
+    """Tiny per-image values stored on ``Image`` so pages can paint without fetching it."""
+    # 64-bit difference hash (hex); near-identical pictures differ in few bits
+    perceptual_hash: str
+    # data: URI of a PLACEHOLDER_WIDTH px wide WebP, to be shown blurred
+    placeholder: str
+    # "#rrggbb"
+    dominant_color: str
+
+@dataclass
+class ProcessedImage:
+    content: SpooledContent
+    width: int
+    height: int
+    format: str
+    variants: List[ProcessedVariant] = field(default_factory=list)
+    summary: Optional[ImageSummary] = None
+    # Estimated high-water mark of the job: input and outputs held in memory
+    # plus every decoded bitmap
+    peak_memory_bytes: int = 0
+
+    def discard(self) -> None:
+        """Remove any outputs spooled to disk."""
+        self.content.discard()
+        for variant in self.variants:
+            variant.content.discard()
+
+def difference_hash(img: PILImage.Image) -> str:
+    """dHash: whether each pixel of a 9x8 grayscale thumbnail is brighter than its right neighbour."""
+    pixels = img.resize((9, 8), PILImage.Resampling.BILINEAR).convert("L").tobytes()
+    bits = 0
+    for y in range(8):
+        for x in range(8):
+            bits = bits << 1 | (pixels[y * 9 + x] > pixels[y * 9 + x + 1])
+    return f"{bits:016x}"
+
+def _flatten(img: PILImage.Image) -> PILImage.Image:
+    """RGB copy of ``img`` with any transparency composited onto white."""
+    if img.mode == "P":
+        img = img.convert("RGBA")
+    if "A" in img.getbands():
+        background = PILImage.new("RGB", img.size, (255, 255, 255))
+        background.paste(img.convert("RGBA"), mask=img.convert("RGBA").getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+def placeholder_data_uri(img: PILImage.Image) -> str:
+    height = max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))
+    small = _flatten(img.resize((PLACEHOLDER_WIDTH, height), PILImage.Resampling.BILINEAR))
+    output = BytesIO()
+    small.save(output, format="WEBP", quality=40)
+    return "data:image/webp;base64," + base64.b64encode(output.getvalue()).decode()
+
+def dominant_color(img: PILImage.Image) -> str:
+    """The most common colour of a coarse palette, as "#rrggbb"."""
+    small = _flatten(img.resize((64, 64), PILImage.Resampling.BILINEAR))
+    quantized = small.quantize(colors=5)
+    _, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+def summarize(img: PILImage.Image) -> ImageSummary:
+    return ImageSummary(
+        perceptual_hash=difference_hash(img),
+        placeholder=placeholder_data_uri(img),
+        dominant_color=dominant_color(img),
+    )
+
+def _bitmap_bytes(img: PILImage.Image) -> int:
+    # Pillow stores multi-band pixels in 4 bytes
+    return img.width * img.height * (1 if img.mode in ("1", "L", "P") else 4)
+
 class ImageProcessor:
+    @staticmethod
+    def _open(source: Union[bytes, str], max_pixels: Optional[int] = None) -> PILImage.Image:
+        # Only the header is read here; pixels are decoded on first use
+        img = PILImage.open(BytesIO(source) if isinstance(source, bytes) else source)
+
+        # Validate format
+        if img.format not in UPLOAD_IMAGE_FORMATS:
+            img.close()
+            raise ValueError("Unsupported image format. Use JPEG, PNG, or WEBP.")
+        if max_pixels and img.width * img.height > max_pixels:
+            img.close()
+            raise ValueError(
+                f"Image is {img.width}x{img.height}, more than the {max_pixels} pixel limit."
+            )
+        return img
+
+    @staticmethod
+    def inspect(header: bytes, max_pixels: Optional[int] = None) -> Tuple[str, int, int]:
+        """
+        Validate an image from its first bytes only, without decoding it.
+        Returns: (format, width, height)
+        """
+        try:
+            img = ImageProcessor._open(header, max_pixels)
+        except Exception as e:
+            raise ValueError(f"Invalid image file: {e}")
+        with img:
+            return img.format, img.width, img.height
+
+    @staticmethod
+    def summarize(source: Union[bytes, str], max_pixels: Optional[int] = None) -> ImageSummary:
+        """Decode an image and compute its ``ImageSummary`` (used for backfills)."""
+        try:
+            with ImageProcessor._open(source, max_pixels) as img:
+                # Decode at reduced size where the format allows it (JPEG)
+                img.draft("RGB", (PLACEHOLDER_WIDTH * 8, PLACEHOLDER_WIDTH * 8))
+                return summarize(img)
+        except Exception as e:
+            raise ValueError(f"Invalid image file: {e}")
+
+    @staticmethod
+    def _encode(img: PILImage.Image, fmt: str, spool_dir: Optional[str] = None) -> SpooledContent:
+        output = BytesIO() if spool_dir is None else spool_file(spool_dir, f".{fmt.lower()}")
+        try:
+            if fmt in ENCODE_OPTIONS:
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+                img.save(output, format=fmt, **ENCODE_OPTIONS[fmt])
+            else:
+                img.save(output, format=fmt, optimize=True, quality=85)
+        except Exception:
+            if spool_dir is not None:
+                output.close()
+                SpooledContent(size=0, path=output.name).discard()
+            raise
+        size = output.tell()
+        if spool_dir is None:
+            return SpooledContent(size=size, data=output.getvalue())
+        output.close()
+        return SpooledContent(size=size, path=output.name)
+
+    @staticmethod
+    def _resize(img: PILImage.Image, width: int) -> PILImage.Image:
+        height = max(1, round(img.height * width / img.width))
+        if img.mode == "P":
+            # Palette images can only be resampled with NEAREST; convert for quality
+            img = img.convert("RGBA")
+        return img.resize((width, height), PILImage.Resampling.LANCZOS)
+
     @staticmethod
     def process_image(file_content: bytes) -> Tuple[BytesIO, int, int, str]:
         """
-        Process image: validate, resize (if needed), and return metadata.
+        Process image: validate, re-encode, and return metadata.
         Returns: (processed_file_io, width, height, format)
         """
+        processed = ImageProcessor.process_upload(file_content, {})
+        return processed.content.open(), processed.width, processed.height, processed.format
+
+    @staticmethod
+    def process_upload(
+        source: Union[bytes, str],
+        variant_widths: Dict[str, int],
+        modern_formats: Sequence[str] = (),
+        max_pixels: Optional[int] = None,
+        spool_dir: Optional[str] = None,
+    ) -> ProcessedImage:
+        """
+        Validate and re-encode an upload, and produce a resized variant for
+        every entry of ``variant_widths`` ({name: width}) narrower than the
+        original. Each rendition (original and resized) is additionally
+        encoded in every format of ``modern_formats`` (e.g. WEBP, AVIF) that
+        differs from the original's. The image is decoded once for all outputs.
+
+        ``source`` is the upload's bytes or the path of a file holding them.
+        Images over ``max_pixels`` are rejected from their header, before any
+        decoding. With ``spool_dir`` the outputs are written to files there
+        instead of being returned in memory; the caller removes them.
+        """
+        img = None
+        processed = None
         try:
-            img = PILImage.open(BytesIO(file_content))
-            
-            # Validate format
-            if img.format not in ['JPEG', 'PNG', 'WEBP']:
-                raise ValueError("Unsupported image format. Use JPEG, PNG, or WEBP.")
-            
+            img = ImageProcessor._open(source, max_pixels)
+            fmt = img.format
+
             # Extract dimensions
             width, height = img.size
-            
-            # Optimize/Resize logic can go here (Phase 2)
-            # For MVP, we just validate and return original
-            
-            output = BytesIO()
-            img.save(output, format=img.format, optimize=True, quality=85)
-            output.seek(0)
-            
-            return output, width, height, img.format
-            
+
+            processed = ProcessedImage(
+                content=ImageProcessor._encode(img, fmt, spool_dir),
+                width=width,
+                height=height,
+                format=fmt,
+            )
+            renditions = [("original", img)]
+            for name, variant_width in sorted(variant_widths.items(), key=lambda item: item[1]):
+                if variant_width >= width:
+                    continue
+                resized = ImageProcessor._resize(img, variant_width)
+                renditions.append((name, resized))
+                processed.variants.append(ProcessedVariant(
+                    name=name,
+                    width=resized.width,
+                    height=resized.height,
+                    content=ImageProcessor._encode(resized, fmt, spool_dir),
+                    format=fmt,
+                ))
+
+            for modern_fmt in modern_formats:
+                if modern_fmt == fmt:
+                    continue
+                for name, rendition in renditions:
+                    processed.variants.append(ProcessedVariant(
+                        name=name,
+                        width=rendition.width,
+                        height=rendition.height,
+                        content=ImageProcessor._encode(rendition, modern_fmt, spool_dir),
+                        format=modern_fmt,
+                    ))
+
+            # The narrowest rendition is the cheapest to shrink further
+            processed.summary = summarize(min((r for _, r in renditions), key=lambda r: r.width))
+
+            outputs = [processed.content] + [variant.content for variant in processed.variants]
+            processed.peak_memory_bytes = (
+                (len(source) if isinstance(source, bytes) else 0)
+                + sum(_bitmap_bytes(rendition) for _, rendition in renditions)
+                + sum(output.size for output in outputs if output.path is None)
+            )
+            return processed
+
         except Exception as e:
+            if processed is not None:
+                processed.discard()
             raise ValueError(f"Invalid image file: {e}")
+        finally:
+            if img is not None:
+                img.close()
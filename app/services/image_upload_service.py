@@ -0,0 +1,210 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.spool import SpooledContent, spool_stream
+from app.models.image import Image
+from app.services.image_db_service import ImageService
+from app.services.image_processing_service import image_processing_pool
+from app.services.storage_service import StorageBackend, derived_storage_key, new_storage_key
+
+
+upload_stats: Dict[str, int] = {"stored": 0, "deduplicated": 0}
+
+
+class ImageStorageError(Exception):
+    """Raised when processed images could not be written to storage."""
+
+
+@dataclass
+class StoredImage:
+    """An upload whose files are in storage, with the rows still to be inserted."""
+    image_data: Dict[str, Any]
+    variants: List[Dict[str, Any]] = field(default_factory=list)
+    # The files belong to an earlier upload of the same bytes and a reference
+    # to them has been claimed (see ``ImageService.claim_stored_image``)
+    claimed: bool = False
+
+    @classmethod
+    def reusing(cls, image: Image, description: str) -> "StoredImage":
+        image_data = {
+            "description": description,
+            "image_url": image.image_url,
+            "uploadthing_key": image.uploadthing_key,
+            "file_size": image.file_size,
+            "mime_type": image.mime_type,
+            "width": image.width,
+            "height": image.height,
+            "content_hash": image.content_hash,
+            "perceptual_hash": image.perceptual_hash,
+            "placeholder": image.placeholder,
+            "dominant_color": image.dominant_color,
+        }
+        variants = [
+            {
+                "name": variant.name,
+                "storage_key": variant.storage_key,
+                "image_url": variant.image_url,
+                "width": variant.width,
+                "height": variant.height,
+                "file_size": variant.file_size,
+                "mime_type": variant.mime_type,
+            }
+            for variant in image.variants
+        ]
+        return cls(image_data, variants, claimed=True)
+
+    @property
+    def storage_keys(self) -> List[str]:
+        return [self.image_data["uploadthing_key"]] + [v["storage_key"] for v in self.variants]
+
+
+class ImageUploadService:
+    """
+    The upload pipeline shared by single and batch uploads: read the file
+    within its size limit, process it in the process pool and write the
+    original and its variants to storage. Creating the database rows is left
+    to ``ImageService`` so batches can insert them together.
+
+    Byte-identical re-uploads skip processing and storage and share the
+    files of the earlier upload.
+    """
+
+    def __init__(self, storage: StorageBackend, db: AsyncSession):
+        self.storage = storage
+        self.images = ImageService(db)
+        # Concurrent stores (batches) share one session
+        self._db_lock = asyncio.Lock()
+
+    async def _put(self, content: SpooledContent, key: str, content_type: str) -> str:
+        """Upload processed output, streaming it from disk when it was spooled."""
+        with content.open() as f:
+            return await self.storage.upload(f, key, content_type)
+
+    async def spool(self, file: UploadFile) -> SpooledContent:
+        """Read the upload within its size limit, spooling large files to disk."""
+        return await spool_stream(
+            file.read,
+            max_bytes=settings.IMAGE_UPLOAD_MAX_BYTES,
+            memory_limit=settings.IMAGE_UPLOAD_SPOOL_BYTES,
+            spool_dir=settings.UPLOAD_SPOOL_PATH,
+        )
+
+    async def reuse_duplicate(self, upload: SpooledContent, description: str) -> Optional[StoredImage]:
+        """The files of an earlier upload of the same bytes, if there is one."""
+        async with self._db_lock:
+            existing = await self.images.claim_stored_image(upload.sha256)
+        if existing is None:
+            return None
+        upload_stats["deduplicated"] += 1
+        return StoredImage.reusing(existing, description)
+
+    async def store(self, file: UploadFile, description: str) -> StoredImage:
+        """
+        Raises ``PayloadTooLarge``, ``ValueError`` (not a valid image),
+        ``ImageProcessingBusy`` or ``ImageStorageError``.
+        """
+        # 1. Read the upload
+        upload = await self.spool(file)
+        try:
+            # 2. Reuse the files of an earlier upload of the same bytes
+            stored = await self.reuse_duplicate(upload, description)
+            if stored is not None:
+                return stored
+            # 3. Process and store it
+            filename = file.filename or "image"
+            return await self.process_and_store(upload, description, filename=filename)
+        finally:
+            upload.discard()
+
+    async def process_and_store(
+        self,
+        upload: SpooledContent,
+        description: str,
+        filename: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> StoredImage:
+        """
+        Process a spooled upload and store the results, under ``key`` or a
+        fresh key derived from ``filename``. The upload itself is left alone.
+        """
+        # Process Image (original plus resized variants) in the process pool;
+        # outputs of spooled uploads are spooled as well
+        processed = await image_processing_pool.process_upload(
+            upload.source,
+            settings.IMAGE_VARIANT_WIDTHS,
+            settings.IMAGE_MODERN_FORMATS,
+            max_pixels=settings.IMAGE_MAX_PIXELS,
+            spool_dir=None if upload.path is None else os.path.dirname(upload.path),
+        )
+
+        try:
+            fmt = processed.format.lower()
+            mime_type = f"image/{fmt}"
+
+            # Upload to B2, variants under keys derived from the original's
+            if key is None:
+                key = new_storage_key(f"{(filename or 'image').split('.')[0]}.{fmt}")
+            variant_keys = [
+                derived_storage_key(key, f"w{v.width}", f".{v.format.lower()}")
+                for v in processed.variants
+            ]
+            results = await asyncio.gather(
+                self._put(processed.content, key, mime_type),
+                *(
+                    self._put(variant.content, variant_key, f"image/{variant.format.lower()}")
+                    for variant, variant_key in zip(processed.variants, variant_keys)
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            processed.discard()
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # Do not leave a partial set of files behind
+            stored = [k for k, result in zip([key] + variant_keys, results) if not isinstance(result, BaseException)]
+            await asyncio.gather(*(self.storage.delete(k) for k in stored), return_exceptions=True)
+            raise ImageStorageError(f"Failed to upload image: {errors[0]}") from errors[0]
+
+        image_data = {
+            "description": description,
+            "image_url": results[0],
+            "uploadthing_key": key, # We keep the column name for now, but it stores B2 key
+            "file_size": processed.content.size,
+            "mime_type": mime_type,
+            "width": processed.width,
+            "height": processed.height,
+            "content_hash": upload.sha256,
+            "perceptual_hash": processed.summary.perceptual_hash,
+            "placeholder": processed.summary.placeholder,
+            "dominant_color": processed.summary.dominant_color,
+        }
+        variants = [
+            {
+                "name": variant.name,
+                "storage_key": variant_key,
+                "image_url": url,
+                "width": variant.width,
+                "height": variant.height,
+                "file_size": variant.content.size,
+                "mime_type": f"image/{variant.format.lower()}",
+            }
+            for variant, variant_key, url in zip(processed.variants, variant_keys, results[1:])
+        ]
+        upload_stats["stored"] += 1
+        return StoredImage(image_data, variants)
+
+    async def discard(self, stored: StoredImage) -> None:
+        """Give up an upload whose rows could not be created."""
+        if stored.claimed:
+            async with self._db_lock:
+                orphaned = await self.images.release_stored_image(stored.image_data["uploadthing_key"])
+            if not orphaned:
+                return
+        await asyncio.gather(*(self.storage.delete(key) for key in stored.storage_keys), return_exceptions=True)
@@ -0,0 +1,236 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.models.image import Image
+from app.models.image_variant import ImageVariant
+from app.services.storage_service import storage_key_minted_at
+
+# Keys uploaded shortly before a sync may commit after it; re-read this much history
+KEY_FILTER_SYNC_OVERLAP = timedelta(minutes=1)
+
+
+@dataclass(frozen=True)
+class ImageFile:
+    """One stored rendition of an image: the original or a resized variant."""
+    key: str
+    width: Optional[int]
+    file_size: Optional[int]
+    mime_type: Optional[str]
+
+
+@dataclass(frozen=True)
+class ImageMetadata:
+    """The subset of an ``Image`` row needed to serve its bytes."""
+    id: UUID
+    key: str
+    file_size: Optional[int]
+    mime_type: Optional[str]
+    upload_date: Optional[datetime]
+    width: Optional[int] = None
+    # Narrowest first
+    variants: Tuple[ImageFile, ...] = ()
+
+    @classmethod
+    def from_image(cls, image: Image) -> "ImageMetadata":
+        return cls(
+            id=image.id,
+            key=image.uploadthing_key,
+            file_size=image.file_size,
+            mime_type=image.mime_type,
+            upload_date=image.upload_date,
+            width=image.width,
+            variants=tuple(
+                ImageFile(v.storage_key, v.width, v.file_size, v.mime_type)
+                for v in sorted(image.variants, key=lambda v: v.width)
+            ),
+        )
+
+    @property
+    def original(self) -> ImageFile:
+        return ImageFile(self.key, self.width, self.file_size, self.mime_type)
+
+    def rendition(self, key: str) -> Optional[ImageFile]:
+        """The original or variant stored under ``key``."""
+        for rendition in (self.original, *self.variants):
+            if rendition.key == key:
+                return rendition
+        return None
+
+    def pick(self, width: Optional[int] = None, accepted_types: Sequence[str] = ()) -> ImageFile:
+        """
+        The narrowest rendition at least ``width`` px wide (else the original),
+        re-encoded in the first of ``accepted_types`` that is available.
+        """
+        selected = self.original
+        if width is not None:
+            for variant in self.variants:
+                if variant.mime_type == self.mime_type and variant.width >= width:
+                    selected = variant
+                    break
+        for mime_type in accepted_types:
+            for variant in self.variants:
+                if variant.mime_type == mime_type and variant.width == selected.width:
+                    return variant
+        return selected
+
+
+class ImageMetadataCache:
+    """
+    Per-worker TTL + LRU cache of key -> ``ImageMetadata`` lookups, including
+    negative results (``None``) for keys that do not exist.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Optional[ImageMetadata]]]" = OrderedDict()
+        self.stats: Dict[str, int] = {"hits": 0, "negative_hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key: str) -> Tuple[bool, Optional[ImageMetadata]]:
+        """Return ``(found, metadata)``; ``(True, None)`` is a cached "does not exist"."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        if entry[1] is None:
+            self.stats["negative_hits"] += 1
+        else:
+            self.stats["hits"] += 1
+        return True, entry[1]
+
+    def set(self, key: str, metadata: Optional[ImageMetadata]) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, metadata)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        self.stats["invalidations"] += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class ImageKeyFilter:
+    """
+    Bloom filter of every key images are served by (``uploadthing_key`` and
+    the variants' ``storage_key``), used to reject unknown keys (e.g. bots
+    probing random URLs) without a DB query.
+
+    Built from the table at startup, topped up with recently uploaded keys
+    every ``IMAGE_KEY_FILTER_SYNC_SECONDS`` (so uploads handled by other
+    workers become visible) and rebuilt from scratch every
+    ``IMAGE_KEY_FILTER_REBUILD_SECONDS`` to shed deleted keys. Until the first
+    build finishes every key is let through to the database, and so are
+    keys minted too recently for the last sync to be sure to have seen
+    them (``might_be_unsynced``): another worker may have just uploaded them.
+    """
+
+    def __init__(self):
+        self.bloom: Optional[BloomFilter] = None
+        self._synced_at: Optional[datetime] = None
+        self.stats: Dict[str, int] = {
+            "rejected": 0, "passed": 0, "passed_unsynced": 0, "rebuilds": 0, "syncs": 0, "keys": 0,
+        }
+
+    def might_contain(self, key: str) -> bool:
+        if self.bloom is None or key in self.bloom:
+            self.stats["passed"] += 1
+            return True
+        if self.might_be_unsynced(key):
+            self.stats["passed_unsynced"] += 1
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def might_be_unsynced(self, key: str) -> bool:
+        """
+        Whether an image with ``key`` could exist without the last sync
+        having read it. A sync reads every image uploaded since shortly
+        before the previous one, and an image is created at most
+        ``UPLOAD_SESSION_TTL_SECONDS`` after its key is minted (direct
+        uploads), so only younger keys can be missing.
+        """
+        minted_at = storage_key_minted_at(key)
+        if minted_at is None or self._synced_at is None:
+            # Keys without a time predate time-ordered keys, and so the last build
+            return False
+        horizon = KEY_FILTER_SYNC_OVERLAP + timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+        return minted_at >= self._synced_at - horizon
+
+    def add(self, key: str) -> None:
+        if self.bloom is not None:
+            self.bloom.add(key)
+            self.stats["keys"] = self.bloom.count
+
+    async def rebuild(self, db) -> None:
+        started_at = datetime.now(timezone.utc)
+        result = await db.stream_scalars(
+            select(Image.uploadthing_key).union_all(select(ImageVariant.storage_key))
+        )
+        keys = [key async for key in result]
+        # Leave room for growth until the next rebuild
+        self.bloom = BloomFilter.from_items(keys, capacity=max(len(keys) * 2, 10_000))
+        self._synced_at = started_at
+        self.stats["rebuilds"] += 1
+        self.stats["keys"] = self.bloom.count
+
+    async def sync(self, db) -> None:
+        if self.bloom is None or self._synced_at is None:
+            await self.rebuild(db)
+            return
+        started_at = datetime.now(timezone.utc)
+        since = self._synced_at - KEY_FILTER_SYNC_OVERLAP
+        result = await db.execute(
+            select(Image.uploadthing_key)
+            .filter(Image.upload_date >= since)
+            # Variants of background-processed images are added when they are ready
+            .union_all(select(ImageVariant.storage_key).filter(ImageVariant.created_at >= since))
+        )
+        for key in result.scalars():
+            self.bloom.add(key)
+        self._synced_at = started_at
+        self.stats["syncs"] += 1
+        self.stats["keys"] = self.bloom.count
+
+    async def maintain(self) -> None:
+        """
+        Background task started from the application lifespan.
+        Runs until cancelled.
+        """
+        from app.db.session import AsyncSessionLocal
+
+        last_rebuild = 0.0
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    if time.monotonic() - last_rebuild >= settings.IMAGE_KEY_FILTER_REBUILD_SECONDS:
+                        await self.rebuild(db)
+                        last_rebuild = time.monotonic()
+                    else:
+                        await self.sync(db)
+            except Exception as e:
+                print(f"Failed to refresh image key filter: {e}")
+            await asyncio.sleep(settings.IMAGE_KEY_FILTER_SYNC_SECONDS)
+
+
+image_metadata_cache = ImageMetadataCache(
+    max_size=settings.IMAGE_METADATA_CACHE_SIZE,
+    ttl_seconds=settings.IMAGE_METADATA_CACHE_TTL_SECONDS,
+)
+image_key_filter = ImageKeyFilter()
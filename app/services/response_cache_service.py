@@ -0,0 +1,323 @@
+import asyncio
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+
+from app.core.compression import compress, negotiate_encoding, supported_encodings
+from app.core.config import settings
+from app.core.http import etag_matches
+from app.db.routing import database_router, reads_own_writes
+
+# Builds a response body on a cache miss: ``(JSON bytes, extra headers)``
+ResponseBuilder = Callable[[], Awaitable[Tuple[bytes, Dict[str, str]]]]
+
+# Clients may keep responses but must revalidate them (cheap: a 304)
+CACHE_CONTROL = "no-cache"
+
+
+@dataclass
+class CachedResponse:
+    """
+    A JSON response body with its ETag, extra headers (e.g. X-Next-Cursor)
+    and compressed copies of the body, added as clients ask for them.
+    """
+    body: bytes
+    etag: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+    # Wall-clock expiry, kept when the entry is stored again with a new encoding
+    expires_at: float = 0.0
+
+    @classmethod
+    def build(cls, body: bytes, headers: Dict[str, str], ttl_seconds: int) -> "CachedResponse":
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        return cls(body, etag, headers, expires_at=time.time() + ttl_seconds)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Each representation (identity, gzip, br) has its own strong ETag."""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    def to_bytes(self) -> bytes:
+        sizes = {"identity": len(self.body), **{coding: len(body) for coding, body in self.encoded.items()}}
+        meta = {"etag": self.etag, "headers": self.headers, "expires_at": self.expires_at, "sizes": sizes}
+        return b"".join([json.dumps(meta).encode(), b"\n", self.body, *self.encoded.values()])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        meta, _, rest = data.partition(b"\n")
+        meta = json.loads(meta)
+        bodies, offset = {}, 0
+        for coding, size in meta["sizes"].items():
+            bodies[coding] = rest[offset:offset + size]
+            offset += size
+        body = bodies.pop("identity")
+        return cls(body, meta["etag"], meta["headers"], bodies, meta["expires_at"])
+
+
+class ResponseCacheBackend(ABC):
+    """
+    Storage for cached responses: byte values with a TTL, plus a counter per
+    tag that is bumped to invalidate every entry cached under the old value.
+    Counters must outlive the entries (never evicted before them).
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        ...
+
+    @abstractmethod
+    async def generations(self, tags: Sequence[str]) -> List[int]:
+        ...
+
+    @abstractmethod
+    async def bump(self, tags: Sequence[str]) -> None:
+        ...
+
+    async def clear(self) -> None:
+        """Drop everything; used by tests."""
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryResponseCacheBackend(ResponseCacheBackend):
+    """
+    Per-worker LRU. The default, and the stand-in for a shared backend in
+    tests: other workers do not see its invalidations, so with several
+    workers their entries are only as fresh as ``RESPONSE_CACHE_TTL_SECONDS``.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        # Kept apart from the LRU so a counter is never evicted before its entries
+        self._generations: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def generations(self, tags: Sequence[str]) -> List[int]:
+        return [self._generations.get(tag, 0) for tag in tags]
+
+    async def bump(self, tags: Sequence[str]) -> None:
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        # Superseded entries would only wait for LRU eviction
+        suffixes = tuple(f"|{tag}=" for tag in tags)
+        for key in [key for key in self._entries if any(suffix in key for suffix in suffixes)]:
+            del self._entries[key]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+
+
+class RedisResponseCacheBackend(ResponseCacheBackend):
+    """
+    Redis, shared by every worker and process (``pip install redis``).
+    Entries expire with their TTL and counters have none, so a
+    ``volatile-*`` maxmemory policy evicts entries only.
+    """
+
+    def __init__(self, url: str, prefix: str = "response-cache:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package") from e
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl_seconds)
+
+    async def generations(self, tags: Sequence[str]) -> List[int]:
+        values = await self.client.mget([f"{self.prefix}gen:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, tags: Sequence[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"{self.prefix}gen:{tag}")
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class ResponseCache:
+    """
+    Read-through cache of JSON GET responses, served with an ETag so
+    clients revalidate with If-None-Match and get an empty 304.
+
+    Each response is cached under tags naming the data it shows (e.g.
+    "events", "event:<id>"). Writes bump the tags they affect, which
+    changes the key of every response cached under them: a stale entry is
+    never read again and simply expires. A backend failure only costs the
+    cache, never the request.
+
+    With read replicas, responses to clients reading their own writes
+    (from the primary) are cached apart from those built from replicas,
+    which may lag behind.
+    """
+
+    def __init__(self, backend: Optional[ResponseCacheBackend], ttl_seconds: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.stats: Dict[str, int] = {
+            "hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0, "errors": 0,
+        }
+        # Delayed re-invalidations (see ``invalidate``)
+        self._pending: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _key(request: Request, tags: Sequence[str], generations: Sequence[int]) -> str:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        versions = "".join(f"|{tag}={generation}" for tag, generation in zip(tags, generations))
+        source = "|primary" if reads_own_writes(request) else ""
+        return f"{request.url.path}?{query}{versions}{source}"
+
+    async def respond(self, request: Request, tags: Sequence[str], build: ResponseBuilder) -> Response:
+        """
+        Serve the cached response for this request, or build, cache and
+        serve it. Errors raised by ``build`` (e.g. HTTPException) are not cached.
+
+        Bodies of at least ``COMPRESSION_MIN_BYTES`` are sent compressed to
+        clients that accept it; each compressed copy is made once and cached
+        with the entry.
+        """
+        key = None
+        cached = None
+        if self.backend is not None:
+            try:
+                # Read the generations before the data, so a write racing with
+                # ``build`` leaves its result under a key that is already stale
+                key = self._key(request, tags, await self.backend.generations(tags))
+                data = await self.backend.get(key)
+                cached = None if data is None else CachedResponse.from_bytes(data)
+            except Exception as e:
+                print(f"Response cache read failed: {e}")
+                self.stats["errors"] += 1
+                key = None
+
+        if cached is not None:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            cached = CachedResponse.build(*await build(), self.ttl_seconds)
+            await self._store(key, cached)
+
+        encoding = None
+        if 0 < settings.COMPRESSION_MIN_BYTES <= len(cached.body):
+            encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        headers = {"ETag": cached.etag_for(encoding), "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+        # Any representation's ETag shows the client has the current data
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and any(
+            etag_matches(if_none_match, cached.etag_for(coding)) for coding in (None, *supported_encodings())
+        ):
+            self.stats["not_modified"] += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        body = cached.body
+        if encoding is not None:
+            body = cached.encoded.get(encoding)
+            if body is None:
+                body = cached.encoded[encoding] = compress(cached.body, encoding)
+                await self._store(key, cached)
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type="application/json", headers={**headers, **cached.headers})
+
+    async def _store(self, key: Optional[str], cached: CachedResponse) -> None:
+        ttl_seconds = int(cached.expires_at - time.time())
+        if key is None or ttl_seconds <= 0:
+            return
+        try:
+            await self.backend.set(key, cached.to_bytes(), ttl_seconds)
+        except Exception as e:
+            print(f"Response cache write failed: {e}")
+            self.stats["errors"] += 1
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop every response cached under any of ``tags``; call after committing."""
+        self.stats["invalidations"] += 1
+        if self.backend is None:
+            return
+        await self._bump(tags)
+        if database_router.replicas:
+            # Read replicas may serve the old data for a moment yet; drop
+            # whatever gets cached from them meanwhile
+            task = asyncio.create_task(self._bump_later(tags))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _bump_later(self, tags: Sequence[str]) -> None:
+        try:
+            await asyncio.sleep(settings.DB_READ_YOUR_WRITES_SECONDS)
+        finally:
+            # Cancelled on shutdown: bump right away rather than not at all
+            await self._bump(tags)
+
+    async def _bump(self, tags: Sequence[str]) -> None:
+        try:
+            await self.backend.bump(tags)
+        except Exception as e:
+            # Entries expire after the TTL regardless
+            print(f"Response cache invalidation failed: {e}")
+            self.stats["errors"] += 1
+
+    async def clear(self) -> None:
+        if self.backend is not None:
+            await self.backend.clear()
+
+    async def close(self) -> None:
+        for task in self._pending:
+            task.cancel()
+        await asyncio.gather(*self._pending, return_exceptions=True)
+        if self.backend is not None:
+            await self.backend.close()
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the cache selected by ``settings.RESPONSE_CACHE_BACKEND``."""
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        backend = MemoryResponseCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+    elif settings.RESPONSE_CACHE_BACKEND == "redis":
+        backend = RedisResponseCacheBackend(settings.RESPONSE_CACHE_REDIS_URL)
+    elif settings.RESPONSE_CACHE_BACKEND == "none":
+        backend = None
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {settings.RESPONSE_CACHE_BACKEND}")
+    return ResponseCache(backend, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = create_response_cache()
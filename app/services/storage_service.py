@@ -1,107 +1,813 @@
+import asyncio
+import hashlib
+import hmac
+import mimetypes
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlencode, urlparse
+import boto3
+from botocore.config import Config
 from b2sdk.v2 import InMemoryAccountInfo, B2Api
-from typing import BinaryIO, Dict, Any
+from b2sdk.v2.exception import FileNotPresent, InvalidAuthToken
+from typing import AsyncIterator, BinaryIO, Callable, Dict, Any, List, Optional, Tuple, TypeVar
 import uuid
 import os
+import shutil
 
 from app.core.config import settings
 
+T = TypeVar("T")
+
+# Retry delay used by the background refresher after a failed authorization
+AUTH_RETRY_DELAY_SECONDS = 60
+
+# Size of the chunks yielded when streaming objects out of storage
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# B2 rejects large-file parts (other than the last) smaller than this
+B2_MIN_PART_SIZE = 5 * 1000 * 1000
+# A failed part is retried after 1s, 2s, 4s, ...
+PART_RETRY_DELAY_SECONDS = 1.0
+
+# Uploads sent in parts, across all backends of this worker process
+large_file_upload_stats: Dict[str, float] = {
+    "uploads": 0,
+    "failed": 0,
+    "parts": 0,
+    "part_retries": 0,
+    "bytes": 0,
+    "seconds": 0.0,
+    "last_bytes_per_second": 0.0,
+}
+
+
+@dataclass
+class StoredObject:
+    """Metadata of an object held by a storage backend."""
+    key: str
+    size: int
+    content_type: str
+    uploaded_at: datetime
+    sha1: Optional[str] = None
+
+
+@dataclass
+class DownloadLink:
+    """A URL clients can fetch an object from directly, bypassing the API."""
+    url: str
+    # Seconds the URL stays valid; None for public URLs that never expire
+    expires_in: Optional[int] = None
+
+
+@dataclass
+class UploadLink:
+    """A URL clients can upload one object to directly, bypassing the API."""
+    url: str
+    expires_in: int
+    method: str = "PUT"
+    # Headers the client must send with the upload, exactly as given
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def _time_ordered_uuid() -> uuid.UUID:
+    """A version 7 UUID: Unix time in milliseconds (48 bits), then random bits."""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+def new_storage_key(filename: str) -> str:
+    """
+    Generate a unique object key that keeps the extension of ``filename``.
+    Keys start with a time-ordered UUID; see ``storage_key_minted_at``.
+    """
+    ext = os.path.splitext(filename)[1]
+    return f"{_time_ordered_uuid()}{ext}"
+
+
+def storage_key_minted_at(file_key: str) -> Optional[datetime]:
+    """
+    When ``new_storage_key`` generated ``file_key`` (or the key it was
+    derived from), or None for keys that do not carry a time (older keys).
+    """
+    try:
+        key_uuid = uuid.UUID(file_key[:36])
+    except ValueError:
+        return None
+    if key_uuid.version != 7:
+        return None
+    return datetime.fromtimestamp((key_uuid.int >> 80) / 1000, timezone.utc)
+
+
+def derived_storage_key(file_key: str, suffix: str, ext: Optional[str] = None) -> str:
+    """
+    Key for an object derived from ``file_key`` (e.g. a resized variant),
+    stored next to it: ``<stem>_<suffix><ext>``.
+    """
+    stem, original_ext = os.path.splitext(file_key)
+    return f"{stem}_{suffix}{ext if ext is not None else original_ext}"
+
+
+def guess_content_type(filename: str) -> str:
+    content_type, _ = mimetypes.guess_type(filename)
+    return content_type or "application/octet-stream"
+
+
+async def iter_file(f: BinaryIO, byte_range: Optional[Tuple[int, int]] = None) -> AsyncIterator[bytes]:
+    """
+    Yield the bytes of an open file (optionally an inclusive byte range) in
+    ``STREAM_CHUNK_SIZE`` chunks without blocking the event loop.
+    The file is closed when iteration ends.
+    """
+    try:
+        remaining = None
+        if byte_range is not None:
+            start, end = byte_range
+            await asyncio.to_thread(f.seek, start)
+            remaining = end - start + 1
+        while remaining is None or remaining > 0:
+            size = STREAM_CHUNK_SIZE if remaining is None else min(STREAM_CHUNK_SIZE, remaining)
+            chunk = await asyncio.to_thread(f.read, size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
 class StorageService:
+    """
+    Process-wide Backblaze B2 client.
+
+    A single instance is created in the application lifespan and shared by all
+    requests (see ``app.api.deps.get_storage``). The account authorization and
+    bucket handle are kept between calls and refreshed in the background before
+    the auth token expires.
+
+    All methods are blocking b2sdk calls; use ``B2StorageBackend`` from async code.
+    """
+
     def __init__(self):
         self.info = InMemoryAccountInfo()
         self.b2_api = B2Api(self.info)
+        self.bucket = None
+        self._s3 = None
+        self.authorized_at: Optional[float] = None
+        self._auth_lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "auth_refreshes": 0,
+            "auth_failures": 0,
+            "auth_expired_retries": 0,
+        }
+
+    def authorize(self) -> None:
+        """
+        Authorize the account and resolve the bucket handle.
+        Safe to call from several threads; callers are serialized.
+        """
+        with self._auth_lock:
+            try:
+                self.b2_api.authorize_account(
+                    "production",
+                    settings.B2_KEY_ID,
+                    settings.B2_APPLICATION_KEY
+                )
+                if self.bucket is None:
+                    self.bucket = self.b2_api.get_bucket_by_name(settings.B2_BUCKET_NAME)
+            except Exception as e:
+                self.stats["auth_failures"] += 1
+                print(f"Failed to authorize B2: {e}")
+                raise e
+
+            self.authorized_at = time.monotonic()
+            self.stats["auth_refreshes"] += 1
+
+    def seconds_until_refresh(self) -> float:
+        if self.authorized_at is None:
+            return 0
+        elapsed = time.monotonic() - self.authorized_at
+        return max(0.0, settings.B2_AUTH_REFRESH_INTERVAL_SECONDS - elapsed)
+
+    async def refresh_periodically(self) -> None:
+        """
+        Background task that re-authorizes shortly before the token expires.
+        Runs until cancelled from the application lifespan.
+        """
+        while True:
+            await asyncio.sleep(self.seconds_until_refresh())
+            try:
+                await asyncio.to_thread(self.authorize)
+            except Exception:
+                await asyncio.sleep(AUTH_RETRY_DELAY_SECONDS)
+
+    def _call(self, operation: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run a B2 operation, authorizing first if needed and retrying once
+        when the auth token turns out to have expired.
+        """
+        if self.bucket is None:
+            self.authorize()
         try:
-            self.b2_api.authorize_account(
-                "production",
-                settings.B2_KEY_ID,
-                settings.B2_APPLICATION_KEY
+            return operation(*args, **kwargs)
+        except InvalidAuthToken:
+            self.stats["auth_expired_retries"] += 1
+            self.authorize()
+            return operation(*args, **kwargs)
+
+    def public_url(self, file_key: str) -> str:
+        # Format: https://f005.backblazeb2.com/file/<bucket_name>/<key>
+        download_url = self.info.get_download_url()
+        return f"{download_url}/file/{settings.B2_BUCKET_NAME}/{file_key}"
+
+    def get_download_authorization(self, valid_seconds: int) -> str:
+        """
+        Return a token that authorizes downloads of any object in the bucket
+        for ``valid_seconds``; append it to a download URL as ``?Authorization=``.
+        """
+        return self._call(lambda: self.bucket.get_download_authorization("", valid_seconds))
+
+    def presign_upload(self, file_key: str, content_type: str, valid_seconds: int) -> str:
+        """
+        Return a presigned S3-compatible URL that accepts PUTs of
+        ``file_key`` with ``content_type`` for ``valid_seconds``: any number
+        of them, each replacing the object. Signing happens locally; B2's
+        native upload tokens are not scoped to a key.
+        """
+        if self._s3 is None:
+            # s3.<region>.backblazeb2.com; SigV4 signatures include the region
+            region = urlparse(settings.B2_ENDPOINT_URL).hostname.split(".")[1]
+            self._s3 = boto3.client(
+                "s3",
+                endpoint_url=settings.B2_ENDPOINT_URL,
+                region_name=region,
+                aws_access_key_id=settings.B2_KEY_ID,
+                aws_secret_access_key=settings.B2_APPLICATION_KEY,
+                config=Config(signature_version="s3v4"),
             )
-            self.bucket = self.b2_api.get_bucket_by_name(settings.B2_BUCKET_NAME)
-        except Exception as e:
-            print(f"Failed to authorize B2: {e}")
-            raise e
+        return self._s3.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": settings.B2_BUCKET_NAME, "Key": file_key, "ContentType": content_type},
+            ExpiresIn=valid_seconds,
+        )
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Dict[str, Any]:
+    def upload_file(self, file: BinaryIO, file_key: str, content_type: str) -> str:
         """
         Upload a file to Backblaze B2 using Native API.
-        Returns a dictionary with 'url' and 'key'.
+        Returns the public URL of the object.
         """
         try:
-            # Generate a unique key
-            ext = os.path.splitext(filename)[1]
-            key = f"{uuid.uuid4()}{ext}"
-            
-            # Determine content type
-            content_type = "application/octet-stream"
-            if filename.lower().endswith(".jpg") or filename.lower().endswith(".jpeg"):
-                content_type = "image/jpeg"
-            elif filename.lower().endswith(".png"):
-                content_type = "image/png"
-
-            # Upload
+            path = getattr(file, "name", None)
+            if isinstance(path, str) and os.path.isfile(path):
+                # b2sdk hashes and streams the file from disk
+                self._call(
+                    lambda: self.bucket.upload_local_file(path, file_key, content_type=content_type)
+                )
+                return self.public_url(file_key)
+
             file.seek(0)
-            content = file.read()
-            
-            uploaded_file = self.bucket.upload_bytes(
-                content,
-                key,
-                content_type=content_type
-            )
+            # A BytesIO wrapping bytes returns them from getvalue() without a copy
+            content = file.getvalue() if isinstance(file, BytesIO) else file.read()
 
-            # Construct URL
-            # Use the download URL from account info
-            download_url = self.info.get_download_url()
-            # Format: https://f005.backblazeb2.com/file/<bucket_name>/<key>
-            url = f"{download_url}/file/{settings.B2_BUCKET_NAME}/{key}"
-            
-            return {"url": url, "key": key}
+            self._call(
+                lambda: self.bucket.upload_bytes(content, file_key, content_type=content_type)
+            )
+            return self.public_url(file_key)
 
         except Exception as e:
             print(f"Error uploading to B2: {e}")
             raise e
 
+    def start_large_file(self, file_key: str, content_type: str) -> str:
+        """Start a B2 large file and return its file ID."""
+        response = self._call(
+            lambda: self.b2_api.session.start_large_file(self.bucket.id_, file_key, content_type, {})
+        )
+        return response["fileId"]
+
+    def upload_part(self, file_id: str, part_number: int, data: bytes) -> str:
+        """Upload one part (numbered from 1) of a large file; returns its SHA-1."""
+        sha1 = hashlib.sha1(data).hexdigest()
+        self._call(
+            lambda: self.b2_api.session.upload_part(file_id, part_number, len(data), sha1, BytesIO(data))
+        )
+        return sha1
+
+    def finish_large_file(self, file_id: str, part_sha1s: List[str]) -> None:
+        self._call(lambda: self.b2_api.session.finish_large_file(file_id, part_sha1s))
+
+    def cancel_large_file(self, file_id: str) -> None:
+        self._call(lambda: self.b2_api.session.cancel_large_file(file_id))
+
+    def copy_file(self, source_key: str, file_key: str) -> None:
+        """Copy a file within the bucket; B2 copies it server-side."""
+        source = self._call(lambda: self.bucket.get_file_info_by_name(source_key))
+        self._call(lambda: self.bucket.copy(source.id_, file_key))
+
     def delete_file(self, file_key: str) -> bool:
         """
         Delete a file from Backblaze B2.
         """
         try:
-            file_version = self.bucket.get_file_info_by_name(file_key)
-            self.bucket.delete_file_version(file_version.id_, file_key)
+            file_version = self._call(lambda: self.bucket.get_file_info_by_name(file_key))
+            self._call(lambda: self.bucket.delete_file_version(file_version.id_, file_key))
             return True
         except Exception as e:
             print(f"Error deleting from B2: {e}")
             return False
-            
+
+    def get_file_info(self, file_key: str) -> Optional[StoredObject]:
+        try:
+            file_version = self._call(lambda: self.bucket.get_file_info_by_name(file_key))
+        except FileNotPresent:
+            return None
+        return StoredObject(
+            key=file_key,
+            size=file_version.size,
+            content_type=file_version.content_type,
+            uploaded_at=datetime.fromtimestamp(file_version.upload_timestamp / 1000, tz=timezone.utc),
+            sha1=file_version.content_sha1,
+        )
+
+    def open_download(self, file_key: str, byte_range: Optional[Tuple[int, int]] = None):
+        """
+        Start a streaming download from Backblaze B2.
+        Returns the b2sdk ``DownloadedFile``; read it via ``response.iter_content``.
+        """
+        try:
+            return self._call(
+                lambda: self.bucket.download_file_by_name(file_key, range_=byte_range)
+            )
+        except Exception as e:
+            print(f"Error downloading from B2: {e}")
+            raise e
+
     def download_file(self, file_key: str) -> tuple[bytes, str]:
         """
         Download a file from Backblaze B2.
         Returns a tuple of (file_content, content_type).
         """
-        import tempfile
-        import os
-
+        downloaded = self.open_download(file_key)
         try:
-            # Get file info to determine content type
-            file_info = self.bucket.get_file_info_by_name(file_key)
-            
-            # Create a temporary file to store the download
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_path = temp_file.name
+            content = b"".join(downloaded.response.iter_content(STREAM_CHUNK_SIZE))
+        finally:
+            downloaded.response.close()
+        return content, downloaded.download_version.content_type
+
+
+class StorageBackend(ABC):
+    """
+    Async object storage interface used by the API.
+
+    Implementations must never block the event loop; the B2 backend runs
+    b2sdk calls on a bounded thread pool, the local backend on the default
+    executor.
+    """
+
+    async def start(self) -> None:
+        """Called once from the application lifespan on startup."""
+
+    async def close(self) -> None:
+        """Called once from the application lifespan on shutdown."""
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+    @abstractmethod
+    def public_url(self, file_key: str) -> str:
+        ...
+
+    async def download_link(self, file_key: str, signed: bool = False) -> Optional[DownloadLink]:
+        """
+        Return a URL that serves the object straight from storage, optionally
+        signed with a time-limited token. ``None`` means the backend cannot
+        serve clients directly and bytes must be proxied through the API.
+        """
+        return None
+
+    async def upload_link(self, file_key: str, content_type: str, expires_in: int) -> Optional[UploadLink]:
+        """
+        Return a URL a client can upload ``file_key`` to directly, valid for
+        ``expires_in`` seconds. ``None`` means direct uploads are unsupported.
+        """
+        return None
+
+    def verify_upload(self, file_key: str, content_type: str, expires: int, signature: str) -> bool:
+        """
+        Check an upload link handed out by this backend that is served by the
+        API itself (see ``LocalStorageBackend``).
+        """
+        return False
+
+    @abstractmethod
+    async def upload(self, file: BinaryIO, file_key: str, content_type: str) -> str:
+        """Store ``file`` under ``file_key`` and return its public URL."""
+
+    @abstractmethod
+    async def copy(self, source_key: str, file_key: str) -> None:
+        """Copy the object at ``source_key`` to ``file_key``, within storage."""
 
+    # Large-file uploads: backends send big objects with ``upload_in_parts``
+    # (see ``multipart_size``) through these four hooks
+    min_part_size = 1
+
+    @abstractmethod
+    async def start_large_file(self, file_key: str, content_type: str) -> str:
+        """Begin a multipart upload and return its ID."""
+
+    @abstractmethod
+    async def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        """Store one part (numbered from 1) and return the token ``finish_large_file`` needs for it."""
+
+    @abstractmethod
+    async def finish_large_file(self, upload_id: str, part_tokens: List[str]) -> None:
+        """Assemble the parts, in order, into the object."""
+
+    @abstractmethod
+    async def cancel_large_file(self, upload_id: str) -> None:
+        """Discard a multipart upload and the parts sent so far."""
+
+    @property
+    def part_size(self) -> int:
+        return max(settings.STORAGE_PART_SIZE_BYTES, self.min_part_size)
+
+    def multipart_size(self, file: BinaryIO) -> Optional[int]:
+        """
+        Size of ``file`` when it should be uploaded in parts: at least
+        ``STORAGE_LARGE_FILE_THRESHOLD_BYTES`` and more than one part.
+        """
+        size = file.seek(0, os.SEEK_END)
+        file.seek(0)
+        if size >= settings.STORAGE_LARGE_FILE_THRESHOLD_BYTES and size > self.part_size:
+            return size
+        return None
+
+    async def _send_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        for attempt in range(1, settings.STORAGE_PART_MAX_ATTEMPTS + 1):
             try:
-                # Download the file to the temporary path
-                self.bucket.download_file_by_name(file_key).save_to(temp_path)
-                
-                # Read the file content
-                with open(temp_path, 'rb') as f:
-                    file_content = f.read()
-                
-                return file_content, file_info.content_type
-                
-            finally:
-                # Clean up the temporary file
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                    
-        except Exception as e:
-            print(f"Error downloading from B2: {e}")
-            raise e
+                return await self.upload_part(upload_id, part_number, data)
+            except Exception as e:
+                if attempt == settings.STORAGE_PART_MAX_ATTEMPTS:
+                    raise
+                print(f"Retrying part {part_number} of upload {upload_id}: {e}")
+                large_file_upload_stats["part_retries"] += 1
+                await asyncio.sleep(PART_RETRY_DELAY_SECONDS * 2 ** (attempt - 1))
+
+    async def upload_in_parts(self, file: BinaryIO, file_key: str, content_type: str, size: int) -> None:
+        """
+        Upload ``size`` bytes of ``file`` as ``part_size`` parts sent
+        ``STORAGE_PART_CONCURRENCY`` at a time, each retried on its own.
+        At most that many parts are held in memory. On failure the upload is
+        cancelled and nothing is stored.
+        """
+        started = time.monotonic()
+        part_size = self.part_size
+        part_count = -(-size // part_size)
+        upload_id = await self.start_large_file(file_key, content_type)
+        semaphore = asyncio.Semaphore(settings.STORAGE_PART_CONCURRENCY)
+        read_lock = asyncio.Lock()
+
+        async def send(part_number: int) -> str:
+            async with semaphore:
+                # Parts are read one at a time; the file has a single position
+                async with read_lock:
+                    await asyncio.to_thread(file.seek, (part_number - 1) * part_size)
+                    data = await asyncio.to_thread(file.read, part_size)
+                token = await self._send_part(upload_id, part_number, data)
+                large_file_upload_stats["parts"] += 1
+                return token
+
+        tasks = [asyncio.create_task(send(number)) for number in range(1, part_count + 1)]
+        try:
+            tokens = await asyncio.gather(*tasks)
+            await self.finish_large_file(upload_id, tokens)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            large_file_upload_stats["failed"] += 1
+            try:
+                await self.cancel_large_file(upload_id)
+            except Exception as e:
+                print(f"Failed to cancel upload {upload_id}: {e}")
+            raise
+
+        elapsed = time.monotonic() - started
+        large_file_upload_stats["uploads"] += 1
+        large_file_upload_stats["bytes"] += size
+        large_file_upload_stats["seconds"] += elapsed
+        large_file_upload_stats["last_bytes_per_second"] = size / elapsed if elapsed > 0 else 0.0
+
+    @abstractmethod
+    async def download(self, file_key: str) -> Tuple[bytes, str]:
+        """Return ``(content, content_type)`` of an object."""
+
+    @abstractmethod
+    async def open_stream(
+        self, file_key: str, byte_range: Optional[Tuple[int, int]] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Open an object for reading and return an iterator over its bytes.
+
+        ``byte_range`` is an inclusive ``(start, end)`` pair as in HTTP Range.
+        The object is opened before this returns, so a missing key raises here
+        instead of halfway through a streamed response.
+        """
+
+    @abstractmethod
+    async def delete(self, file_key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def stat(self, file_key: str) -> Optional[StoredObject]:
+        """Return object metadata, or ``None`` if the key does not exist."""
+
+    async def upload_file(self, file: BinaryIO, filename: str) -> Dict[str, Any]:
+        """
+        Upload a file under a freshly generated key.
+        Returns a dictionary with 'url' and 'key'.
+        """
+        key = new_storage_key(filename)
+        url = await self.upload(file, key, guess_content_type(filename))
+        return {"url": url, "key": key}
+
+
+class B2StorageBackend(StorageBackend):
+    """Backblaze B2 backend running the shared ``StorageService`` on a bounded thread pool."""
+
+    def __init__(self, service: Optional[StorageService] = None, max_workers: Optional[int] = None):
+        self.service = service or StorageService()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.STORAGE_MAX_WORKERS,
+            thread_name_prefix="b2-storage",
+        )
+        self._refresh_task: Optional[asyncio.Task] = None
+        # (token, monotonic expiry) of the cached download authorization
+        self._download_auth: Optional[Tuple[str, float]] = None
+        self._download_auth_refreshes = 0
+
+    async def start(self) -> None:
+        # Authorization happens in the background refresher so a B2 outage
+        # does not prevent the API from starting.
+        self._refresh_task = asyncio.create_task(self.service.refresh_periodically())
+
+    async def close(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self.service.stats)
+        stats["download_auth_refreshes"] = self._download_auth_refreshes
+        return stats
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def public_url(self, file_key: str) -> str:
+        return self.service.public_url(file_key)
+
+    async def download_link(self, file_key: str, signed: bool = False) -> Optional[DownloadLink]:
+        if self.service.bucket is None:
+            await self._run(self.service.authorize)
+        url = self.service.public_url(file_key)
+        if not signed:
+            return DownloadLink(url)
+
+        # One bucket-wide token is shared by all links and renewed once half
+        # its lifetime has passed, so signed URLs stay stable (and cacheable)
+        # for a while instead of changing on every request.
+        ttl = settings.IMAGE_SIGNED_URL_TTL_SECONDS
+        now = time.monotonic()
+        if self._download_auth is None or self._download_auth[1] - now < ttl / 2:
+            token = await self._run(self.service.get_download_authorization, ttl)
+            self._download_auth = (token, now + ttl)
+            self._download_auth_refreshes += 1
+        token, expires_at = self._download_auth
+        return DownloadLink(f"{url}?Authorization={token}", expires_in=int(expires_at - now))
+
+    async def upload_link(self, file_key: str, content_type: str, expires_in: int) -> Optional[UploadLink]:
+        url = await self._run(self.service.presign_upload, file_key, content_type, expires_in)
+        return UploadLink(url, expires_in=expires_in, headers={"Content-Type": content_type})
+
+    min_part_size = B2_MIN_PART_SIZE
+
+    async def upload(self, file: BinaryIO, file_key: str, content_type: str) -> str:
+        size = self.multipart_size(file)
+        if size is not None:
+            await self.upload_in_parts(file, file_key, content_type, size)
+            return self.public_url(file_key)
+        return await self._run(self.service.upload_file, file, file_key, content_type)
+
+    async def copy(self, source_key: str, file_key: str) -> None:
+        await self._run(self.service.copy_file, source_key, file_key)
+
+    async def start_large_file(self, file_key: str, content_type: str) -> str:
+        return await self._run(self.service.start_large_file, file_key, content_type)
+
+    async def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        return await self._run(self.service.upload_part, upload_id, part_number, data)
+
+    async def finish_large_file(self, upload_id: str, part_tokens: List[str]) -> None:
+        await self._run(self.service.finish_large_file, upload_id, part_tokens)
+
+    async def cancel_large_file(self, upload_id: str) -> None:
+        await self._run(self.service.cancel_large_file, upload_id)
+
+    async def download(self, file_key: str) -> Tuple[bytes, str]:
+        return await self._run(self.service.download_file, file_key)
+
+    async def open_stream(
+        self, file_key: str, byte_range: Optional[Tuple[int, int]] = None
+    ) -> AsyncIterator[bytes]:
+        downloaded = await self._run(self.service.open_download, file_key, byte_range)
+        return self._iter_response(downloaded.response)
+
+    async def _iter_response(self, response) -> AsyncIterator[bytes]:
+        chunks = response.iter_content(STREAM_CHUNK_SIZE)
+        try:
+            while True:
+                chunk = await self._run(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            response.close()
+
+    async def delete(self, file_key: str) -> bool:
+        return await self._run(self.service.delete_file, file_key)
+
+    async def stat(self, file_key: str) -> Optional[StoredObject]:
+        return await self._run(self.service.get_file_info, file_key)
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Filesystem backend that stands in for B2 in tests, benchmarks and local development.
+    Objects are stored as plain files named by their key under ``root``.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.LOCAL_STORAGE_PATH)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, file_key: str) -> Path:
+        path = (self.root / file_key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid storage key: {file_key}")
+        return path
+
+    def public_url(self, file_key: str) -> str:
+        return f"{settings.API_V1_STR}/images/serve/{file_key}"
+
+    @staticmethod
+    def _upload_signature(file_key: str, content_type: str, expires: int) -> str:
+        message = f"PUT\n{file_key}\n{content_type}\n{expires}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    async def upload_link(self, file_key: str, content_type: str, expires_in: int) -> Optional[UploadLink]:
+        # Emulates a presigned URL with an HMAC-signed link to the API itself
+        self._path(file_key)
+        expires = int(time.time()) + expires_in
+        query = urlencode({
+            "content_type": content_type,
+            "expires": expires,
+            "signature": self._upload_signature(file_key, content_type, expires),
+        })
+        return UploadLink(
+            f"{settings.API_V1_STR}/images/uploads/local/{file_key}?{query}",
+            expires_in=expires_in,
+            headers={"Content-Type": content_type},
+        )
+
+    def verify_upload(self, file_key: str, content_type: str, expires: int, signature: str) -> bool:
+        expected = self._upload_signature(file_key, content_type, expires)
+        return expires >= time.time() and hmac.compare_digest(expected, signature)
+
+    def _write(self, file: BinaryIO, file_key: str) -> None:
+        path = self._path(file_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        file.seek(0)
+        with open(tmp_path, "wb") as f:
+            while chunk := file.read(1024 * 1024):
+                f.write(chunk)
+        os.replace(tmp_path, path)
+
+    async def upload(self, file: BinaryIO, file_key: str, content_type: str) -> str:
+        size = self.multipart_size(file)
+        if size is not None:
+            await self.upload_in_parts(file, file_key, content_type, size)
+        else:
+            await asyncio.to_thread(self._write, file, file_key)
+        return self.public_url(file_key)
+
+    def _copy(self, source_key: str, file_key: str) -> None:
+        with open(self._path(source_key), "rb") as f:
+            self._write(f, file_key)
+
+    async def copy(self, source_key: str, file_key: str) -> None:
+        await asyncio.to_thread(self._copy, source_key, file_key)
+
+    # Multipart uploads keep their parts in .uploads/<id>/ until finished
+    def _parts_dir(self, upload_id: str) -> Path:
+        return self._path(f".uploads/{upload_id}")
+
+    def _start_large_file(self, file_key: str) -> str:
+        self._path(file_key)
+        upload_id = uuid.uuid4().hex
+        parts_dir = self._parts_dir(upload_id)
+        parts_dir.mkdir(parents=True)
+        (parts_dir / "key").write_text(file_key)
+        return upload_id
+
+    def _write_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        (self._parts_dir(upload_id) / f"{part_number}.part").write_bytes(data)
+        return hashlib.sha1(data).hexdigest()
+
+    def _finish_large_file(self, upload_id: str, part_tokens: List[str]) -> None:
+        parts_dir = self._parts_dir(upload_id)
+        path = self._path((parts_dir / "key").read_text())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{upload_id}.tmp")
+        with open(tmp_path, "wb") as f:
+            for part_number, token in enumerate(part_tokens, start=1):
+                data = (parts_dir / f"{part_number}.part").read_bytes()
+                if hashlib.sha1(data).hexdigest() != token:
+                    tmp_path.unlink()
+                    raise ValueError(f"Part {part_number} of upload {upload_id} does not match")
+                f.write(data)
+        os.replace(tmp_path, path)
+        shutil.rmtree(parts_dir)
+
+    async def start_large_file(self, file_key: str, content_type: str) -> str:
+        return await asyncio.to_thread(self._start_large_file, file_key)
+
+    async def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        return await asyncio.to_thread(self._write_part, upload_id, part_number, data)
+
+    async def finish_large_file(self, upload_id: str, part_tokens: List[str]) -> None:
+        await asyncio.to_thread(self._finish_large_file, upload_id, part_tokens)
+
+    async def cancel_large_file(self, upload_id: str) -> None:
+        await asyncio.to_thread(shutil.rmtree, self._parts_dir(upload_id), True)
+
+    async def download(self, file_key: str) -> Tuple[bytes, str]:
+        content = await asyncio.to_thread(self._path(file_key).read_bytes)
+        return content, guess_content_type(file_key)
+
+    async def open_stream(
+        self, file_key: str, byte_range: Optional[Tuple[int, int]] = None
+    ) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self._path(file_key), "rb")
+        return iter_file(f, byte_range)
+
+    async def delete(self, file_key: str) -> bool:
+        try:
+            await asyncio.to_thread(self._path(file_key).unlink)
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def stat(self, file_key: str) -> Optional[StoredObject]:
+        try:
+            st = await asyncio.to_thread(self._path(file_key).stat)
+        except FileNotFoundError:
+            return None
+        return StoredObject(
+            key=file_key,
+            size=st.st_size,
+            content_type=guess_content_type(file_key),
+            uploaded_at=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+        )
+
+
+def create_storage_backend() -> StorageBackend:
+    """
+    Build the storage backend selected by ``settings.STORAGE_BACKEND``,
+    fronted by the local disk cache unless ``IMAGE_CACHE_MAX_BYTES`` is 0.
+    """
+    from app.services.disk_cache_service import CachedStorageBackend, DiskCache
+
+    if settings.STORAGE_BACKEND == "local":
+        backend: StorageBackend = LocalStorageBackend()
+    elif settings.STORAGE_BACKEND == "b2":
+        backend = B2StorageBackend()
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+    if settings.IMAGE_CACHE_MAX_BYTES > 0:
+        cache = DiskCache(settings.IMAGE_CACHE_PATH, settings.IMAGE_CACHE_MAX_BYTES)
+        backend = CachedStorageBackend(backend, cache)
+    return backend
@@ -0,0 +1,182 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.image import Image
+from app.models.upload_session import UploadSession
+from app.schemas.image import UploadSessionCreate
+from app.services.image_db_service import ImageService
+from app.services.image_service import UPLOAD_IMAGE_FORMATS, ImageProcessor
+from app.services.storage_service import StorageBackend, UploadLink, derived_storage_key, new_storage_key
+
+# Bytes read from the start of an uploaded object to validate it
+FINALIZE_HEADER_BYTES = 256 * 1024
+
+# Expired sessions are reaped this much later, so a finalize that started
+# just before the deadline never has its object deleted underneath it
+REAP_GRACE = timedelta(minutes=5)
+REAP_BATCH_SIZE = 500
+
+upload_session_stats: Dict[str, int] = {"created": 0, "finalized": 0, "rejected": 0, "reaped": 0}
+
+
+class UploadSessionService:
+    """
+    Direct-to-storage uploads: the client gets a short-lived upload link for
+    a fresh staging key, sends the bytes straight to storage, then finalizes
+    the session, which copies the object to a key of its own, validates the
+    copy and creates its ``Image`` row. Upload links accept any number of
+    uploads until they expire, so only the copy is ever validated or served.
+    Images uploaded this way are stored as sent, without resized variants.
+    """
+
+    def __init__(self, db: AsyncSession, storage: StorageBackend):
+        self.db = db
+        self.storage = storage
+
+    async def create_session(self, session_in: UploadSessionCreate) -> Optional[Tuple[UploadSession, UploadLink]]:
+        """
+        Authorize one upload. Returns None when the storage backend does not
+        support direct uploads.
+        """
+        if session_in.content_type not in UPLOAD_IMAGE_FORMATS.values():
+            raise ValueError("Unsupported image format. Use JPEG, PNG, or WEBP.")
+
+        key = derived_storage_key(new_storage_key(session_in.filename), "staging")
+        ttl = settings.UPLOAD_SESSION_TTL_SECONDS
+        link = await self.storage.upload_link(key, session_in.content_type, ttl)
+        if link is None:
+            return None
+
+        session = UploadSession(
+            storage_key=key,
+            description=session_in.description,
+            content_type=session_in.content_type,
+            max_bytes=settings.IMAGE_UPLOAD_MAX_BYTES,
+            expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl),
+        )
+        self.db.add(session)
+        await self.db.commit()
+        upload_session_stats["created"] += 1
+        return session, link
+
+    async def get_active_session(self, session_id: UUID) -> Optional[UploadSession]:
+        return await self._active_session(UploadSession.id == session_id)
+
+    async def get_active_session_by_key(self, storage_key: str) -> Optional[UploadSession]:
+        """The session still waiting for an upload to ``storage_key``, if any."""
+        return await self._active_session(UploadSession.storage_key == storage_key)
+
+    async def _active_session(self, criterion) -> Optional[UploadSession]:
+        result = await self.db.execute(
+            select(UploadSession).filter(
+                criterion,
+                UploadSession.finalized_at.is_(None),
+                UploadSession.expires_at > datetime.now(timezone.utc),
+            )
+        )
+        return result.scalars().first()
+
+    async def finalize(self, session_id: UUID) -> Optional[Image]:
+        """
+        Copy the uploaded object to the image's own key, validate the copy
+        (size, then type and dimensions from a ranged read of its header)
+        and create the ``Image``. Returns None for
+        unknown or expired sessions; raises ValueError for a missing or
+        invalid object, which is deleted so the client can upload again.
+        """
+        session = await self.get_active_session(session_id)
+        if session is None:
+            return None
+
+        staging_key = session.storage_key
+        staged = await self.storage.stat(staging_key)
+        if staged is None:
+            raise ValueError("No file has been uploaded for this session")
+        # The upload link still accepts uploads, so the file is validated and
+        # kept as a copy under a key of its own, which nothing can overwrite
+        key = None
+        try:
+            self._check_size(staged.size, session)
+            key = new_storage_key(staging_key)
+            await self.storage.copy(staging_key, key)
+            await self.storage.delete(staging_key)
+            info = await self.storage.stat(key)
+            self._check_size(info.size if info else 0, session)
+            chunks = await self.storage.open_stream(key, (0, min(info.size, FINALIZE_HEADER_BYTES) - 1))
+            header = b"".join([chunk async for chunk in chunks])
+            fmt, width, height = ImageProcessor.inspect(header, settings.IMAGE_MAX_PIXELS)
+            if UPLOAD_IMAGE_FORMATS[fmt] != session.content_type:
+                raise ValueError(f"Uploaded file is {fmt}, not {session.content_type}")
+        except ValueError:
+            upload_session_stats["rejected"] += 1
+            await self.storage.delete(key or staging_key)
+            raise
+
+        image_data = {
+            "description": session.description,
+            "image_url": self.storage.public_url(key),
+            "uploadthing_key": key,
+            "file_size": info.size,
+            "mime_type": session.content_type,
+            "width": width,
+            "height": height,
+        }
+        # Committed together with the new image
+        session.finalized_at = datetime.now(timezone.utc)
+        try:
+            image = await ImageService(self.db).create_image(image_data)
+        except Exception:
+            await self.db.rollback()
+            await self.storage.delete(key)
+            raise
+        upload_session_stats["finalized"] += 1
+        return image
+
+    @staticmethod
+    def _check_size(size: int, session: UploadSession) -> None:
+        if not 0 < size <= session.max_bytes:
+            raise ValueError(f"Uploaded file must be between 1 and {session.max_bytes} bytes")
+
+    async def reap_expired(self) -> int:
+        """
+        Delete expired sessions, finalized or not, and any object last
+        uploaded to their staging key.
+        """
+        result = await self.db.execute(
+            select(UploadSession)
+            .filter(UploadSession.expires_at < datetime.now(timezone.utc) - REAP_GRACE)
+            .limit(REAP_BATCH_SIZE)
+        )
+        sessions = result.scalars().all()
+        if not sessions:
+            return 0
+        await asyncio.gather(*(self.storage.delete(session.storage_key) for session in sessions))
+        await self.db.execute(
+            delete(UploadSession).where(UploadSession.id.in_([session.id for session in sessions]))
+        )
+        await self.db.commit()
+        upload_session_stats["reaped"] += len(sessions)
+        return len(sessions)
+
+
+async def reap_upload_sessions(storage: StorageBackend) -> None:
+    """
+    Background task started from the application lifespan.
+    Runs until cancelled.
+    """
+    from app.db.session import AsyncSessionLocal
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                while await UploadSessionService(db, storage).reap_expired() == REAP_BATCH_SIZE:
+                    pass
+        except Exception as e:
+            print(f"Failed to reap upload sessions: {e}")
+        await asyncio.sleep(settings.UPLOAD_SESSION_REAP_SECONDS)
@@ -0,0 +1,151 @@
+"""
+Per-item cost of the image and event listings, before and after the row
+path: "models" loads ORM objects, validates them into the response models
+and encodes with the stdlib encoder (what FastAPI does for a
+``response_model``); "rows" selects the schema's columns, builds plain dicts
+and encodes them with pydantic-core (what the endpoints do now).
+
+    python -m benchmarks.list_serialization [--items 200] [--rounds 30]
+
+Needs the usual settings (.env); the data lives in an in-memory SQLite
+database, so query costs are lower than against Postgres.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.serialization import dump_json
+from app.db.base import Base
+from app.models.event import Event
+from app.models.image import Image
+from app.models.image_variant import ImageVariant
+from app.schemas.event import Event as EventSchema
+from app.schemas.image import Image as ImageSchema
+from app.services.event_service import EventService
+from app.services.image_db_service import READY, ImageService
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _stdlib_json(content) -> bytes:
+    # starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def _models_json(adapter: TypeAdapter, objects) -> bytes:
+    return _stdlib_json(adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json"))
+
+
+async def _populate(db: AsyncSession, items: int) -> None:
+    for index in range(items):
+        key = f"{index:08x}-6a1f-4c1e-9d0b-2f3e4a5b6c7d"
+        db.add(Image(
+            description=f"Sunday service, week {index}",
+            image_url=f"https://f005.backblazeb2.com/file/church-images/{key}.jpg",
+            uploadthing_key=f"{key}.jpg",
+            file_size=1_500_000,
+            mime_type="image/jpeg",
+            width=2400,
+            height=1600,
+            content_hash="ab" * 32,
+            perceptual_hash="c3" * 8,
+            placeholder="data:image/webp;base64," + "A" * 120,
+            dominant_color="#6b5a4c",
+            upload_date=START + timedelta(hours=index),
+            variants=[
+                ImageVariant(
+                    name=f"w{width}",
+                    storage_key=f"{key}-w{width}.{fmt}",
+                    image_url=f"https://f005.backblazeb2.com/file/church-images/{key}-w{width}.{fmt}",
+                    width=width,
+                    height=width * 2 // 3,
+                    file_size=width * 100,
+                    mime_type=f"image/{mime}",
+                )
+                for width in (320, 800)
+                for fmt, mime in (("jpg", "jpeg"), ("webp", "webp"))
+            ],
+        ))
+        db.add(Event(
+            name=f"Event {index}",
+            description="Weekly Sunday service with communion",
+            day="Sunday",
+            time="10:00",
+            location="Main Sanctuary",
+            created_at=START + timedelta(hours=index),
+        ))
+    await db.commit()
+
+
+async def _measure(
+    sessions: async_sessionmaker, rounds: int, load: Callable[[AsyncSession], Awaitable], serialize: Callable
+) -> Tuple[float, float]:
+    """Median seconds to load and to serialize one listing, each in a fresh session."""
+    load_times: List[float] = []
+    serialize_times: List[float] = []
+    for _ in range(rounds):
+        async with sessions() as db:
+            started = time.perf_counter()
+            loaded = await load(db)
+            loaded_at = time.perf_counter()
+            serialize(loaded)
+            load_times.append(loaded_at - started)
+            serialize_times.append(time.perf_counter() - loaded_at)
+    return statistics.median(load_times), statistics.median(serialize_times)
+
+
+async def main(items: int, rounds: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        await _populate(db, items)
+
+    images = TypeAdapter(List[ImageSchema])
+    events = TypeAdapter(List[EventSchema])
+
+    async def image_models(db):
+        stmt = select(Image).filter(Image.status == READY).order_by(Image.upload_date.desc(), Image.id.desc())
+        return (await db.execute(stmt.limit(items))).scalars().all()
+
+    async def image_rows(db):
+        return (await ImageService(db).get_images_page(limit=items))[0]
+
+    async def event_models(db):
+        stmt = select(Event).order_by(Event.created_at.desc(), Event.id.desc())
+        return (await db.execute(stmt.limit(items))).scalars().all()
+
+    async def event_rows(db):
+        return (await EventService(db).get_events_page(limit=items))[0]
+
+    cases = [
+        ("images", "models", image_models, lambda loaded: _models_json(images, loaded)),
+        ("images", "rows", image_rows, dump_json),
+        ("events", "models", event_models, lambda loaded: _models_json(events, loaded)),
+        ("events", "rows", event_rows, dump_json),
+    ]
+    print(f"{items} items per listing, median of {rounds} rounds, microseconds per item")
+    print(f"{'listing':<8} {'path':<7} {'load':>8} {'serialize':>10} {'total':>8}")
+    for listing, path, load, serialize in cases:
+        load_seconds, serialize_seconds = await _measure(sessions, rounds, load, serialize)
+        load_us, serialize_us = (seconds / items * 1e6 for seconds in (load_seconds, serialize_seconds))
+        print(f"{listing:<8} {path:<7} {load_us:>8.1f} {serialize_us:>10.1f} {load_us + serialize_us:>8.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.rounds))
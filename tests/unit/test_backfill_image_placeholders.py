@@ -0,0 +1,50 @@
+import base64
+from io import BytesIO
+from uuid import UUID
+
+from httpx import AsyncClient
+from PIL import Image as PILImage
+from sqlalchemy import update
+
+from app.commands.backfill_image_placeholders import backfill_image_placeholders
+from app.models.image import Image
+
+
+def make_png(width: int = 1000, height: int = 500) -> bytes:
+    output = BytesIO()
+    image = PILImage.new("RGB", (width, height), (200, 120, 40))
+    image.paste((20, 60, 160), (0, 0, width // 4, height))
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+async def test_upload_stores_placeholder_and_dominant_color(client: AsyncClient, db, storage):
+    response = await client.post(
+        "/api/v1/images/",
+        files={"file": ("photo.png", make_png(), "image/png")},
+        data={"description": "Harvest"},
+    )
+    body = response.json()
+    assert body["dominant_color"] == "#c87828"
+    assert body["placeholder"].startswith("data:image/webp;base64,")
+    assert len(body["placeholder"]) < 1000
+    preview = PILImage.open(BytesIO(base64.b64decode(body["placeholder"].split(",", 1)[1])))
+    assert preview.size == (16, 8)
+
+
+async def test_backfill_fills_missing_placeholders(client: AsyncClient, db, storage):
+    response = await client.post(
+        "/api/v1/images/",
+        files={"file": ("photo.png", make_png(), "image/png")},
+        data={"description": "Harvest"},
+    )
+    uploaded = response.json()
+    await db.execute(update(Image).values(placeholder=None, dominant_color=None, perceptual_hash=None))
+    await db.commit()
+
+    assert await backfill_image_placeholders(db, storage) == 1
+    image = await db.get(Image, UUID(uploaded["id"]), populate_existing=True)
+    assert image.placeholder == uploaded["placeholder"]
+    assert image.dominant_color == uploaded["dominant_color"]
+    assert image.perceptual_hash == uploaded["perceptual_hash"]
+    assert await backfill_image_placeholders(db, storage) == 0
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+from httpx import AsyncClient
+
+from app.core.compression import compression_stats, negotiate_encoding
+from app.services.image_db_service import ImageService
+
+CONTENT = bytes(range(256)) * 16
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+async def add_images(db, count: int) -> None:
+    service = ImageService(db)
+    for index in range(count):
+        await service.create_image({
+            "description": f"Photo {index}",
+            "image_url": f"https://f005.backblazeb2.com/file/church-images/photo-{index}.png",
+            "uploadthing_key": f"photo-{index}.png",
+            "upload_date": datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(days=index),
+        })
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("*") in ("br", "gzip")
+    assert negotiate_encoding(None) is None
+
+
+async def test_cached_listings_are_compressed_once(client: AsyncClient, db, storage):
+    await add_images(db, 20)
+    plain = await client.get("/api/v1/images/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    compressed = await client.get("/api/v1/images/", headers=GZIP)
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert int(compressed.headers["content-length"]) < len(plain.content) / 3
+    assert compressed.json() == plain.json()
+    assert compressed.headers["etag"] != plain.headers["etag"]
+
+    # Later hits reuse the cached gzip body
+    responses = compression_stats["responses"]
+    again = await client.get("/api/v1/images/", headers=GZIP)
+    assert again.content == compressed.content
+    assert compression_stats["responses"] == responses
+    revalidated = await client.get("/api/v1/images/", headers={**GZIP, "If-None-Match": compressed.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+async def test_only_large_text_responses_are_compressed(client: AsyncClient, db, storage):
+    # Not cached: compressed by the middleware
+    response = await client.get("/api/v1/openapi.json", headers=GZIP)
+    assert response.headers["content-encoding"] == "gzip"
+
+    small = await client.get("/api/v1/images/", headers=GZIP)
+    assert "content-encoding" not in small.headers
+
+    res = await storage.upload_file(BytesIO(CONTENT), "photo.png")
+    await ImageService(db).create_image({
+        "description": "Sunday service",
+        "image_url": res["url"],
+        "uploadthing_key": res["key"],
+        "file_size": len(CONTENT),
+        "mime_type": "image/png",
+    })
+    served = await client.get(f"/api/v1/images/serve/{res['key']}", headers=GZIP)
+    assert "content-encoding" not in served.headers
+    assert served.content == CONTENT
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool, pool_snapshot
+from app.db.session import engine_options
+
+
+def test_engine_options_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", 0)
+    options = engine_options("postgresql+asyncpg://user:secret@db/church_db")
+    assert options["poolclass"] is InstrumentedAsyncQueuePool
+    assert options["pool_size"] == 7
+    assert options["connect_args"] == {"prepared_statement_cache_size": 0}
+    assert engine_options("sqlite+aiosqlite://") == {}
+
+
+async def test_pool_snapshot_counts_checkouts_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            snapshot = pool_snapshot(engine)
+            assert (snapshot["in_use"], snapshot["idle"], snapshot["size"]) == (1, 0, 1)
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+
+        snapshot = pool_snapshot(engine)
+        assert (snapshot["in_use"], snapshot["idle"]) == (0, 1)
+        assert (snapshot["checkouts"], snapshot["timeouts"]) == (1, 1)
+        assert sum(snapshot["wait_histogram"].values()) == 1
+    finally:
+        await engine.dispose()
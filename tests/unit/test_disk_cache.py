@@ -0,0 +1,77 @@
+import asyncio
+from io import BytesIO
+
+from app.services.disk_cache_service import CachedStorageBackend, DiskCache
+
+
+async def _read(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_lru_eviction_respects_budget(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    cache.put("a", BytesIO(b"aaaa"))
+    cache.put("b", BytesIO(b"bbbb"))
+    cache.open("a").close()  # "a" is now most recently used
+    cache.put("c", BytesIO(b"cccc"))
+
+    assert cache.size == 8
+    assert cache.stats["evictions"] == 1
+    assert cache.open("b") is None
+    with cache.open("a") as f:
+        assert f.read() == b"aaaa"
+
+
+def test_oversized_entries_are_not_cached(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=4)
+    cache.put("big", BytesIO(b"too large"))
+    assert cache.open("big") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_load_indexes_existing_entries(tmp_path):
+    DiskCache(str(tmp_path), max_bytes=100).put("a", BytesIO(b"aaaa"))
+    cache = DiskCache(str(tmp_path), max_bytes=100)
+    cache.load()
+    assert cache.size == 4
+
+
+async def test_read_through_and_invalidate(tmp_path, storage):
+    cached = CachedStorageBackend(storage, DiskCache(str(tmp_path / "cache"), 1024))
+    key = "photo.png"
+    await storage.upload(BytesIO(b"image-bytes"), key, "image/png")
+
+    assert await _read(await cached.open_stream(key)) == b"image-bytes"
+    assert cached.stats["cache_misses"] == 1
+    assert await _read(await cached.open_stream(key, (0, 4))) == b"image"
+    assert cached.stats["cache_hits"] == 1
+
+    await cached.delete(key)
+    assert cached.cache.open(key) is None
+
+
+async def test_upload_warms_cache(tmp_path, storage):
+    cached = CachedStorageBackend(storage, DiskCache(str(tmp_path / "cache"), 1024))
+    res = await cached.upload_file(BytesIO(b"fresh"), "photo.png")
+    content, _ = await cached.download(res["key"])
+    assert content == b"fresh"
+    assert cached.stats["cache_hits"] == 1
+    assert cached.stats["cache_misses"] == 0
+
+
+async def test_concurrent_misses_share_one_fetch(tmp_path, storage):
+    cached = CachedStorageBackend(storage, DiskCache(str(tmp_path / "cache"), 1024))
+    await storage.upload(BytesIO(b"hero-image"), "hero.png", "image/png")
+
+    fetches = 0
+    open_stream = storage.open_stream
+
+    async def counting_open_stream(*args, **kwargs):
+        nonlocal fetches
+        fetches += 1
+        return await open_stream(*args, **kwargs)
+
+    storage.open_stream = counting_open_stream
+    streams = await asyncio.gather(*(cached.open_stream("hero.png") for _ in range(5)))
+    assert [await _read(s) for s in streams] == [b"hero-image"] * 5
+    assert fetches == 1
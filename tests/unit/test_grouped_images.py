@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from httpx import AsyncClient
+
+from app.services.image_db_service import ImageService
+
+
+async def add_images(db, *dates: datetime) -> None:
+    service = ImageService(db)
+    for index, upload_date in enumerate(dates):
+        await service.create_image({
+            "description": f"Photo {index}",
+            "image_url": f"/images/{index}.png",
+            "uploadthing_key": f"{index}.png",
+            "upload_date": upload_date,
+        })
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+async def test_grouped_images_by_month(client: AsyncClient, db, storage):
+    await add_images(
+        db,
+        utc(2024, 12, 31, 23, 0), utc(2025, 1, 5), utc(2025, 1, 20), utc(2025, 3, 1, 0, 30),
+    )
+    body = (await client.get("/api/v1/images/grouped")).json()
+    assert list(body["year"]) == ["2025", "2024"]
+    assert list(body["year"]["2025"]) == ["march", "january"]
+    january = body["year"]["2025"]["january"]
+    assert [image["description"] for image in january["images"]] == ["Photo 2", "Photo 1"]
+    assert (january["total"], january["next_cursor"], body["next_cursor"]) == (2, None, None)
+
+    body = (await client.get("/api/v1/images/grouped", params={"year": 2025, "month": 1})).json()
+    assert {year: list(months) for year, months in body["year"].items()} == {"2025": ["january"]}
+
+
+async def test_grouped_images_lazy_loading(client: AsyncClient, db, storage):
+    await add_images(
+        db,
+        utc(2025, 1, 5), utc(2025, 1, 6), utc(2025, 1, 7), utc(2025, 2, 1), utc(2025, 3, 1),
+    )
+    body = (await client.get("/api/v1/images/grouped", params={"months": 2, "per_month": 2})).json()
+    assert list(body["year"]["2025"]) == ["march", "february"]
+
+    body = (await client.get(
+        "/api/v1/images/grouped", params={"months": 2, "per_month": 2, "cursor": body["next_cursor"]}
+    )).json()
+    assert body["next_cursor"] is None
+    january = body["year"]["2025"]["january"]
+    assert [image["description"] for image in january["images"]] == ["Photo 2", "Photo 1"]
+    assert january["total"] == 3
+
+    body = (await client.get(
+        "/api/v1/images/grouped", params={"per_month": 2, "cursor": january["next_cursor"]}
+    )).json()
+    january = body["year"]["2025"]["january"]
+    assert [image["description"] for image in january["images"]] == ["Photo 0"]
+    assert january["next_cursor"] is None
+
+    assert (await client.get("/api/v1/images/grouped", params={"cursor": "nope"})).status_code == 400
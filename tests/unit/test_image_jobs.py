@@ -0,0 +1,90 @@
+import os
+from io import BytesIO
+
+from httpx import AsyncClient
+from PIL import Image as PILImage
+
+from app.services.image_db_service import upload_source_key
+from app.services.image_job_service import ImageJobService
+from app.services.metadata_cache_service import image_metadata_cache
+
+
+def make_png(width: int = 1000, height: int = 500) -> bytes:
+    output = BytesIO()
+    PILImage.new("RGB", (width, height), (90, 140, 60)).save(output, format="PNG")
+    return output.getvalue()
+
+
+async def upload_async(client: AsyncClient, content: bytes):
+    return await client.post(
+        "/api/v1/images/",
+        params={"async": "true"},
+        files={"file": ("garden.png", content, "image/png")},
+        data={"description": "Garden party"},
+    )
+
+
+async def test_async_upload_is_processed_in_the_background(client: AsyncClient, db, storage):
+    response = await upload_async(client, make_png())
+    assert response.status_code == 202
+    image = response.json()
+    assert (image["status"], image["width"], image["height"], image["variants"]) == ("pending", 1000, 500, [])
+    assert await storage.stat(upload_source_key(image["uploadthing_key"])) is not None
+
+    # Not listed, counted or served until ready
+    assert (await client.get("/api/v1/images/")).json() == []
+    assert (await client.get("/api/v1/images/timeline")).json() == {"years": []}
+    assert (await client.get(f"/api/v1/images/serve/{image['uploadthing_key']}")).status_code == 404
+    # Other workers must not keep answering 404 once it is ready
+    assert image_metadata_cache.get(image["uploadthing_key"]) == (False, None)
+    status = (await client.get(f"/api/v1/images/{image['id']}/status")).json()
+    assert status == {"id": image["id"], "status": "pending", "attempts": 0, "error": None}
+
+    jobs = ImageJobService(db, storage)
+    assert await jobs.run_next()
+    assert not await jobs.run_next()
+
+    status = (await client.get(f"/api/v1/images/{image['id']}/status")).json()
+    assert status["status"] == "ready"
+    [listed] = (await client.get("/api/v1/images/")).json()
+    assert listed["id"] == image["id"]
+    assert listed["placeholder"] is not None
+    [year] = (await client.get("/api/v1/images/timeline")).json()["years"]
+    assert year["image_count"] == 1
+    assert {v["width"] for v in listed["variants"] if v["mime_type"] == "image/png"} == {320, 800}
+    assert await storage.stat(upload_source_key(image["uploadthing_key"])) is None
+    served = await client.get(f"/api/v1/images/serve/{image['uploadthing_key']}", params={"w": 300})
+    assert PILImage.open(BytesIO(served.content)).size == (320, 160)
+
+
+async def test_async_upload_that_cannot_be_processed_fails(client: AsyncClient, db, storage):
+    # The header is valid, the pixel data is cut short
+    output = BytesIO()
+    PILImage.frombytes("RGB", (400, 300), os.urandom(400 * 300 * 3)).save(output, format="PNG")
+    response = await upload_async(client, output.getvalue()[: output.tell() // 2])
+    assert response.status_code == 202
+    image = response.json()
+
+    assert await ImageJobService(db, storage).run_next()
+    status = (await client.get(f"/api/v1/images/{image['id']}/status")).json()
+    assert status["status"] == "failed"
+    assert status["error"].startswith("Invalid image file")
+    assert await storage.stat(upload_source_key(image["uploadthing_key"])) is None
+
+    assert (await client.delete(f"/api/v1/images/{image['id']}")).status_code == 204
+    assert (await client.get(f"/api/v1/images/{image['id']}/status")).status_code == 404
+
+
+async def test_async_upload_rejects_invalid_headers_up_front(client: AsyncClient, db, storage):
+    response = await upload_async(client, b"not an image")
+    assert response.status_code == 400
+
+
+async def test_storage_failures_are_reported(client: AsyncClient, db, storage, monkeypatch):
+    async def failing_upload(file, file_key, content_type):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage, "upload", failing_upload)
+    response = await upload_async(client, make_png())
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Failed to upload image: disk full"
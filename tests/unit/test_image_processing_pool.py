@@ -0,0 +1,70 @@
+import asyncio
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image as PILImage
+
+from app.services.image_processing_service import ImageProcessingBusy, ImageProcessingPool
+
+
+def make_png(width: int = 1000, height: int = 500) -> bytes:
+    output = BytesIO()
+    PILImage.new("RGB", (width, height), (200, 120, 40)).save(output, format="PNG")
+    return output.getvalue()
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+async def test_process_pool_runs_image_jobs():
+    pool = ImageProcessingPool(workers=1, max_concurrency=1, max_queue=4)
+    try:
+        processed = await pool.process_upload(make_png(), {"thumbnail": 320}, ["WEBP"])
+    finally:
+        pool.close()
+    assert (processed.width, processed.height) == (1000, 500)
+    assert [(v.width, v.format) for v in processed.variants] == [(320, "PNG"), (1000, "WEBP"), (320, "WEBP")]
+    assert processed.peak_memory_bytes >= 1000 * 500 * 4
+    snapshot = pool.snapshot()
+    assert snapshot["completed"] == 1
+    assert snapshot["max_peak_memory_bytes"] == processed.peak_memory_bytes
+
+
+async def test_invalid_images_raise_value_error():
+    pool = ImageProcessingPool(workers=0, max_concurrency=1, max_queue=1)
+    with pytest.raises(ValueError):
+        await pool.process_upload(b"not an image", {})
+    assert pool.snapshot()["failed"] == 1
+
+
+async def test_queue_limit_rejects_bursts():
+    pool = ImageProcessingPool(workers=0, max_concurrency=1, max_queue=1)
+    results = await asyncio.gather(
+        *(pool.run(_sleep, 0.05) for _ in range(3)), return_exceptions=True
+    )
+    pool.close()
+    assert sum(isinstance(r, ImageProcessingBusy) for r in results) == 1
+    snapshot = pool.snapshot()
+    assert snapshot["completed"] == 2
+    assert snapshot["max_queue_depth"] == 1
+    assert snapshot["queue_depth"] == 0
+
+
+async def test_cancelled_callers_keep_their_slot_until_the_job_ends():
+    pool = ImageProcessingPool(workers=0, max_concurrency=1, max_queue=1)
+    caller = asyncio.ensure_future(pool.run(_sleep, 0.1))
+    await asyncio.sleep(0.02)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    assert pool.snapshot()["running"] == 1
+
+    # The next job only starts once the abandoned one has finished
+    await pool.run(_sleep, 0)
+    pool.close()
+    snapshot = pool.snapshot()
+    assert snapshot["completed"] == 2
+    assert snapshot["max_wait_ms"] >= 50
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+from httpx import AsyncClient
+from sqlalchemy import delete
+
+from app.models.image_month import ImageMonth
+from app.services.image_db_service import ImageService
+
+
+async def add_images(db, *dates: datetime) -> None:
+    service = ImageService(db)
+    for index, upload_date in enumerate(dates):
+        await service.create_image({
+            "description": f"Photo {index}",
+            "image_url": f"/images/{index}.png",
+            "uploadthing_key": f"{index}.png",
+            "upload_date": upload_date,
+        })
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+async def timeline(client: AsyncClient) -> list:
+    return [
+        (year["year"], month["name"], month["image_count"], month["cover_image_id"])
+        for year in (await client.get("/api/v1/images/timeline")).json()["years"]
+        for month in year["months"]
+    ]
+
+
+async def test_timeline_follows_creates_and_deletes(client: AsyncClient, db, storage):
+    await add_images(db, utc(2024, 12, 31, 23), utc(2025, 1, 5), utc(2025, 1, 20))
+    images = {image["description"]: image["id"] for image in (await client.get("/api/v1/images/")).json()}
+
+    assert await timeline(client) == [
+        (2025, "january", 2, images["Photo 2"]),
+        (2024, "december", 1, images["Photo 0"]),
+    ]
+    body = (await client.get("/api/v1/images/timeline")).json()
+    assert [(year["year"], year["image_count"]) for year in body["years"]] == [(2025, 2), (2024, 1)]
+
+    # Deleting the cover picks the next newest; deleting the last image drops the month
+    await client.delete(f"/api/v1/images/{images['Photo 2']}")
+    await client.delete(f"/api/v1/images/{images['Photo 0']}")
+    assert await timeline(client) == [(2025, "january", 1, images["Photo 1"])]
+
+
+async def test_rebuild_restores_the_summary(client: AsyncClient, db, storage):
+    await add_images(db, utc(2025, 1, 5), utc(2025, 3, 1), utc(2025, 3, 2))
+    expected = await timeline(client)
+    await db.execute(delete(ImageMonth))
+    await db.commit()
+    assert await timeline(client) == []
+
+    assert await ImageService(db).rebuild_months() == 2
+    assert await timeline(client) == expected
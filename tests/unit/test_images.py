@@ -0,0 +1,202 @@
+from io import BytesIO
+
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+from PIL import Image as PILImage
+
+from app.core.config import settings
+from app.core.middleware import BodySizeLimitMiddleware
+from app.services.metadata_cache_service import image_key_filter
+
+
+def make_png(width: int = 1000, height: int = 500) -> bytes:
+    output = BytesIO()
+    PILImage.new("RGB", (width, height), (200, 120, 40)).save(output, format="PNG")
+    return output.getvalue()
+
+
+async def upload(client: AsyncClient, content: bytes, description: str = "Sunday service"):
+    return await client.post(
+        "/api/v1/images/",
+        files={"file": ("photo.png", content, "image/png")},
+        data={"description": description},
+    )
+
+
+async def test_upload_creates_variants(client: AsyncClient, db, storage):
+    response = await upload(client, make_png())
+    assert response.status_code == 201
+    body = response.json()
+
+    # 1600px "large" is wider than the original and is skipped
+    assert [(v["name"], v["width"], v["height"]) for v in body["variants"] if v["mime_type"] == "image/png"] == [
+        ("thumbnail", 320, 160),
+        ("medium", 800, 400),
+    ]
+    assert body["srcset"].endswith(f"{body['image_url']} 1000w")
+    for variant in body["variants"]:
+        assert await storage.stat(variant["storage_key"]) is not None
+
+
+async def test_serve_picks_variant_by_width(client: AsyncClient, db, storage):
+    body = (await upload(client, make_png())).json()
+    key = body["uploadthing_key"]
+
+    response = await client.get(f"/api/v1/images/serve/{key}", params={"w": 300})
+    assert response.status_code == 200
+    assert PILImage.open(BytesIO(response.content)).size == (320, 160)
+
+    response = await client.get(f"/api/v1/images/serve/{key}", params={"w": 900})
+    assert PILImage.open(BytesIO(response.content)).size == (1000, 500)
+
+
+async def test_serve_variant_urls(client: AsyncClient, db, storage):
+    body = (await upload(client, make_png())).json()
+    # Unknown keys are rejected by the key filter; variant keys are known to it
+    await image_key_filter.rebuild(db)
+
+    for candidate in body["srcset"].split(", "):
+        url, width = candidate.split(" ")
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert PILImage.open(BytesIO(response.content)).width == int(width[:-1])
+
+    webp = next(v for v in body["variants"] if v["mime_type"] == "image/webp" and v["width"] == 320)
+    response = await client.get(webp["image_url"], headers={"Accept": "image/png"})
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["etag"] == f'"{webp["storage_key"]}"'
+
+
+async def test_serve_negotiates_modern_formats(client: AsyncClient, db, storage):
+    body = (await upload(client, make_png())).json()
+    key = body["uploadthing_key"]
+    assert {v["width"] for v in body["variants"] if v["mime_type"] == "image/webp"} == {320, 800, 1000}
+
+    response = await client.get(
+        f"/api/v1/images/serve/{key}",
+        params={"w": 300},
+        headers={"Accept": "image/avif;q=0,image/webp,*/*"},
+    )
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["vary"] == "Accept"
+    assert PILImage.open(BytesIO(response.content)).size == (320, 160)
+
+    response = await client.get(f"/api/v1/images/serve/{key}", headers={"Accept": "*/*"})
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["vary"] == "Accept"
+
+
+async def test_delete_removes_variants(client: AsyncClient, db, storage):
+    body = (await upload(client, make_png())).json()
+    response = await client.delete(f"/api/v1/images/{body['id']}")
+    assert response.status_code == 204
+    assert await storage.stat(body["uploadthing_key"]) is None
+    for variant in body["variants"]:
+        assert await storage.stat(variant["storage_key"]) is None
+
+
+async def test_upload_rejects_non_images(client: AsyncClient, db, storage):
+    response = await upload(client, b"not an image")
+    assert response.status_code == 400
+
+
+async def test_upload_over_size_limit_is_rejected(client: AsyncClient, db, storage, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_UPLOAD_MAX_BYTES", 1000)
+    response = await upload(client, make_png(2000, 2000) + b"\0" * 2000)
+    assert response.status_code == 413
+
+
+async def test_upload_over_pixel_budget_is_rejected(client: AsyncClient, db, storage, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_MAX_PIXELS", 100 * 100)
+    response = await upload(client, make_png(200, 100))
+    assert response.status_code == 400
+    assert "pixel limit" in response.json()["detail"]
+
+
+async def test_large_uploads_are_spooled_to_disk(client: AsyncClient, db, storage, monkeypatch, tmp_path):
+    spool = tmp_path / "spool"
+    monkeypatch.setattr(settings, "IMAGE_UPLOAD_SPOOL_BYTES", 1)
+    monkeypatch.setattr(settings, "UPLOAD_SPOOL_PATH", str(spool))
+
+    response = await upload(client, make_png())
+    assert response.status_code == 201
+    body = response.json()
+    assert body["file_size"] == (await storage.stat(body["uploadthing_key"])).size
+    # The spooled upload and the spooled outputs are removed afterwards
+    assert list(spool.iterdir()) == []
+
+
+async def test_request_body_limit_is_enforced_while_streaming():
+    echo = FastAPI()
+
+    @echo.post("/echo")
+    async def read_body(request: Request):
+        return {"size": len(await request.body())}
+
+    async def body():
+        for _ in range(4):
+            yield b"\0" * 512
+
+    transport = ASGITransport(app=BodySizeLimitMiddleware(echo, max_body_size=1024))
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        assert (await c.post("/echo", content=b"\0" * 1024)).json() == {"size": 1024}
+        # Declared too large: refused before reading
+        assert (await c.post("/echo", content=b"\0" * 2048)).status_code == 413
+        # Chunked, no Content-Length: refused once the limit is passed
+        assert (await c.post("/echo", content=body())).status_code == 413
+
+
+async def test_batch_upload_reports_each_file(client: AsyncClient, db, storage):
+    response = await client.post(
+        "/api/v1/images/batch",
+        files=[
+            ("files", ("one.png", make_png(400, 300), "image/png")),
+            ("files", ("broken.png", b"not an image", "image/png")),
+            ("files", ("two.png", make_png(800, 600), "image/png")),
+        ],
+        data={"descriptions": ["Choir", "Broken", "Youth"]},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [item["status_code"] for item in body["items"]] == [201, 400, 201]
+
+    first, _, third = body["items"]
+    assert first["image"]["description"] == "Choir"
+    assert (third["image"]["width"], third["image"]["height"]) == (800, 600)
+    assert [v["width"] for v in third["image"]["variants"] if v["mime_type"] == "image/png"] == [320]
+
+    listed = (await client.get("/api/v1/images/")).json()
+    assert {image["id"] for image in listed} == {first["image"]["id"], third["image"]["id"]}
+    assert {len(image["variants"]) for image in listed} == {len(first["image"]["variants"]), len(third["image"]["variants"])}
+
+
+async def test_batch_upload_needs_matching_descriptions(client: AsyncClient, db, storage):
+    response = await client.post(
+        "/api/v1/images/batch",
+        files=[("files", ("one.png", make_png(), "image/png"))] * 3,
+        data={"descriptions": ["One", "Two"]},
+    )
+    assert response.status_code == 400
+
+
+async def test_identical_uploads_share_files_until_last_delete(client: AsyncClient, db, storage):
+    content = make_png()
+    first = (await upload(client, content, "First")).json()
+    second = (await upload(client, content, "Second")).json()
+
+    assert first["id"] != second["id"]
+    assert second["description"] == "Second"
+    assert second["uploadthing_key"] == first["uploadthing_key"]
+    assert second["content_hash"] == first["content_hash"] and len(first["content_hash"]) == 64
+    assert second["perceptual_hash"] == first["perceptual_hash"]
+    assert [v["storage_key"] for v in second["variants"]] == [v["storage_key"] for v in first["variants"]]
+    keys = [first["uploadthing_key"]] + [v["storage_key"] for v in first["variants"]]
+
+    assert (await client.delete(f"/api/v1/images/{first['id']}")).status_code == 204
+    assert all([await storage.stat(key) is not None for key in keys])
+    served = await client.get(f"/api/v1/images/serve/{second['uploadthing_key']}")
+    assert served.status_code == 200
+
+    assert (await client.delete(f"/api/v1/images/{second['id']}")).status_code == 204
+    assert all([await storage.stat(key) is None for key in keys])
@@ -0,0 +1,91 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from app.core.config import settings
+from app.services import storage_service
+from app.services.storage_service import LocalStorageBackend, large_file_upload_stats
+
+
+async def test_upload_download_stat_delete(storage: LocalStorageBackend):
+    res = await storage.upload_file(BytesIO(b"image-bytes"), "photo.png")
+    assert res["key"].endswith(".png")
+    assert res["url"].endswith(res["key"])
+
+    content, content_type = await storage.download(res["key"])
+    assert content == b"image-bytes"
+    assert content_type == "image/png"
+
+    info = await storage.stat(res["key"])
+    assert info.size == len(b"image-bytes")
+    assert info.content_type == "image/png"
+
+    assert await storage.delete(res["key"]) is True
+    assert await storage.stat(res["key"]) is None
+    assert await storage.delete(res["key"]) is False
+
+
+async def test_rejects_keys_outside_root(storage: LocalStorageBackend):
+    with pytest.raises(ValueError):
+        await storage.stat("../outside.png")
+
+
+@pytest.fixture
+def small_parts(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_LARGE_FILE_THRESHOLD_BYTES", 100_000)
+    monkeypatch.setattr(settings, "STORAGE_PART_SIZE_BYTES", 64 * 1024)
+    monkeypatch.setattr(settings, "STORAGE_PART_CONCURRENCY", 3)
+    monkeypatch.setattr(storage_service, "PART_RETRY_DELAY_SECONDS", 0)
+
+
+async def test_large_files_are_uploaded_in_parts(storage: LocalStorageBackend, small_parts, monkeypatch):
+    content = os.urandom(300_000)
+    sent = []
+    flaky = {2}
+    upload_part = storage.upload_part
+
+    async def failing_once(upload_id, part_number, data):
+        if part_number in flaky:
+            flaky.discard(part_number)
+            raise ConnectionError("connection reset")
+        sent.append(part_number)
+        return await upload_part(upload_id, part_number, data)
+
+    monkeypatch.setattr(storage, "upload_part", failing_once)
+    stats = dict(large_file_upload_stats)
+    await storage.upload(BytesIO(content), "scan.png", "image/png")
+
+    assert sorted(sent) == [1, 2, 3, 4, 5]
+    assert (await storage.download("scan.png"))[0] == content
+    assert not any((storage.root / ".uploads").iterdir())
+    assert large_file_upload_stats["uploads"] == stats["uploads"] + 1
+    assert large_file_upload_stats["part_retries"] == stats["part_retries"] + 1
+    assert large_file_upload_stats["bytes"] == stats["bytes"] + len(content)
+
+
+async def test_failed_large_upload_stores_nothing(storage: LocalStorageBackend, small_parts, monkeypatch):
+    upload_part = storage.upload_part
+
+    async def failing(upload_id, part_number, data):
+        if part_number == 3:
+            raise ConnectionError("connection reset")
+        return await upload_part(upload_id, part_number, data)
+
+    monkeypatch.setattr(storage, "upload_part", failing)
+    with pytest.raises(ConnectionError):
+        await storage.upload(BytesIO(os.urandom(300_000)), "scan.png", "image/png")
+    assert await storage.stat("scan.png") is None
+    assert not any((storage.root / ".uploads").iterdir())
+
+
+def test_backends_must_implement_large_file_hooks():
+    class Incomplete(storage_service.StorageBackend):
+        def public_url(self, file_key):
+            return file_key
+
+        async def upload(self, file, file_key, content_type):
+            return file_key
+
+    with pytest.raises(TypeError, match="start_large_file"):
+        Incomplete()
@@ -0,0 +1,128 @@
+import asyncio
+import uuid
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bloom import BloomFilter
+from app.core.singleflight import singleflight_stats
+from app.services import image_db_service
+from app.services.image_db_service import ImageService
+from app.services.metadata_cache_service import (
+    ImageKeyFilter, ImageMetadataCache, image_key_filter, image_metadata_cache,
+)
+from app.services.storage_service import new_storage_key
+
+
+def test_bloom_filter_has_no_false_negatives():
+    keys = [f"{uuid.uuid4()}.png" for _ in range(1000)]
+    bloom = BloomFilter.from_items(keys, capacity=1000)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"{uuid.uuid4()}.png" in bloom for _ in range(1000))
+    assert false_positives < 50
+
+
+def test_metadata_cache_negative_entries_and_ttl():
+    cache = ImageMetadataCache(max_size=2, ttl_seconds=60)
+    cache.set("missing.png", None)
+    assert cache.get("missing.png") == (True, None)
+    assert cache.stats["negative_hits"] == 1
+
+    expired = ImageMetadataCache(max_size=2, ttl_seconds=-1)
+    expired.set("missing.png", None)
+    assert expired.get("missing.png") == (False, None)
+
+
+async def _create(db, key: str):
+    return await ImageService(db).create_image({
+        "description": "test",
+        "image_url": f"/serve/{key}",
+        "uploadthing_key": key,
+        "file_size": 3,
+        "mime_type": "image/png",
+    })
+
+
+async def test_unknown_keys_skip_the_database(db, monkeypatch):
+    await _create(db, "known.png")
+    await image_key_filter.rebuild(db)
+    service = ImageService(db)
+
+    queries = []
+    original = ImageService.get_image_by_key
+
+    async def counting_get_image_by_key(self, key):
+        queries.append(key)
+        return await original(self, key)
+
+    monkeypatch.setattr(ImageService, "get_image_by_key", counting_get_image_by_key)
+
+    assert await service.get_image_metadata_by_key("probe.png") is None
+    assert queries == []
+
+    meta = await service.get_image_metadata_by_key("known.png")
+    assert meta.key == "known.png"
+    await service.get_image_metadata_by_key("known.png")
+    assert queries == ["known.png"]
+
+
+async def test_keys_uploaded_through_other_workers_are_served(db, monkeypatch):
+    # Another worker's filter, built before this worker's upload
+    other_worker = ImageKeyFilter()
+    await other_worker.rebuild(db)
+    key = new_storage_key("fresh.png")
+    image = await _create(db, key)
+    assert key not in other_worker.bloom
+
+    monkeypatch.setattr(image_db_service, "image_key_filter", other_worker)
+    assert (await ImageService(db).get_image_metadata_by_key(key)).id == image.id
+    assert other_worker.stats["passed_unsynced"] == 1
+
+    # Random keys, and keys minted well before the last sync, are still rejected
+    assert not other_worker.might_contain(f"{uuid.uuid4()}.png")
+    other_worker._synced_at += timedelta(hours=1)
+    assert not other_worker.might_contain(key)
+
+
+async def test_create_and_delete_invalidate(db):
+    await image_key_filter.rebuild(db)
+    service = ImageService(db)
+    assert await service.get_image_metadata_by_key("new.png") is None
+
+    image = await _create(db, "new.png")
+    assert (await service.get_image_metadata_by_key("new.png")).id == image.id
+
+    await service.delete_image(image.id)
+    assert await service.get_image_metadata_by_key("new.png") is None
+
+
+async def test_coalesced_lookups_outlive_the_leading_request(db, monkeypatch):
+    image = await _create(db, "shared.png")
+    original = ImageService.get_image_by_key
+
+    async def slow_get_image_by_key(self, key):
+        await asyncio.sleep(0.02)
+        return await original(self, key)
+
+    monkeypatch.setattr(ImageService, "get_image_by_key", slow_get_image_by_key)
+    before = singleflight_stats()["image_by_key"]["executions"]
+
+    leader_db = AsyncSession(db.bind)
+    leader = asyncio.ensure_future(ImageService(leader_db).get_image_metadata_by_key("shared.png"))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(ImageService(db).get_image_metadata_by_key("shared.png"))
+    await asyncio.sleep(0)
+    # The leading request goes away, closing its session mid-query
+    leader.cancel()
+    await leader_db.close()
+    assert (await follower).id == image.id
+
+    # Sessions on different databases do not share results
+    replica = AsyncSession(db.bind, info={"replica": "replica-1"})
+    image_metadata_cache.clear()
+    await asyncio.gather(
+        ImageService(db).get_image_metadata_by_key("shared.png"),
+        ImageService(replica).get_image_metadata_by_key("shared.png"),
+    )
+    await replica.close()
+    assert singleflight_stats()["image_by_key"]["executions"] - before == 3
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+from httpx import AsyncClient
+
+from app.models.event import Event
+from app.services.image_db_service import ImageService
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+async def add_events(db, count: int, offset: int = 0) -> None:
+    # Pairs share a timestamp, so the id decides their order
+    db.add_all([
+        Event(
+            name=f"Event {offset + index}",
+            description="Weekly service",
+            day="Sunday",
+            time="10:00",
+            location="Main Sanctuary",
+            created_at=START + timedelta(minutes=(offset + index) // 2),
+        )
+        for index in range(count)
+    ])
+    await db.commit()
+
+
+async def read_all(client: AsyncClient, url: str, limit: int, on_page=None) -> list:
+    names, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(url, params=params)
+        assert response.status_code == 200
+        names += [item.get("name") or item.get("description") for item in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return names
+        if on_page:
+            await on_page()
+
+
+async def test_events_are_paged_by_cursor(client: AsyncClient, db):
+    await add_events(db, 7)
+    inserted = []
+
+    async def insert_newer():
+        # New events must not shift later pages
+        if not inserted:
+            inserted.append(1)
+            await add_events(db, 2, offset=100)
+
+    names = await read_all(client, "/api/v1/events/", 3, on_page=insert_newer)
+    assert len(names) == len(set(names)) == 7
+    assert set(names) == {f"Event {index}" for index in range(7)}
+    minutes = [int(name.split()[1]) // 2 for name in names]
+    assert minutes == sorted(minutes, reverse=True)
+
+
+async def test_offset_paging_is_deprecated_but_kept(client: AsyncClient, db):
+    await add_events(db, 3)
+    response = await client.get("/api/v1/events/", params={"skip": 1, "limit": 1})
+    assert response.headers["deprecation"] == "true"
+    assert [event["name"] for event in response.json()] in (["Event 0"], ["Event 1"])
+    assert (await client.get("/api/v1/events/", params={"cursor": "bogus"})).status_code == 400
+
+
+async def test_images_are_paged_by_cursor(client: AsyncClient, db, storage):
+    service = ImageService(db)
+    for index in range(5):
+        await service.create_image({
+            "description": f"Photo {index}",
+            "image_url": f"/images/{index}.png",
+            "uploadthing_key": f"{index}.png",
+            "upload_date": START + timedelta(days=index),
+        })
+    names = await read_all(client, "/api/v1/images/", 2)
+    assert names == [f"Photo {index}" for index in reversed(range(5))]
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.routing import READ_PRIMARY_COOKIE, DatabaseRouter, Replica, database_router
+from app.models.event import Event
+from app.services.response_cache_service import response_cache
+
+EVENT = {
+    "description": "Weekly service",
+    "day": "Sunday",
+    "time": "10:00",
+    "location": "Main Sanctuary",
+}
+
+
+async def make_replica(path, name: str, *event_names: str) -> Replica:
+    """A SQLite file standing in for a replica, with its own events."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    replica = Replica(name, engine)
+    async with replica.sessions() as session:
+        session.add_all([Event(name=event_name, **EVENT) for event_name in event_names])
+        await session.commit()
+    return replica
+
+
+@pytest.fixture
+async def replicas(tmp_path, monkeypatch):
+    created = [
+        await make_replica(tmp_path / "one.db", "replica-1", "From replica 1"),
+        await make_replica(tmp_path / "two.db", "replica-2", "From replica 2"),
+    ]
+    monkeypatch.setattr(database_router, "replicas", created)
+    yield created
+    # As on shutdown: delayed invalidations run now
+    await response_cache.close()
+    for replica in created:
+        await replica.engine.dispose()
+
+
+async def event_names(client: AsyncClient, **params) -> list:
+    return [event["name"] for event in (await client.get("/api/v1/events/", params=params)).json()]
+
+
+async def test_reads_go_round_robin_to_replicas(client: AsyncClient, db, replicas):
+    # Distinct queries, so neither is answered from the response cache
+    first, second = await event_names(client, limit=10), await event_names(client, limit=11)
+    assert sorted(first + second) == ["From replica 1", "From replica 2"]
+
+
+async def test_writers_read_their_writes_past_cached_replica_reads(
+    client: AsyncClient, db, replicas, monkeypatch
+):
+    monkeypatch.setattr(settings, "DB_READ_YOUR_WRITES_SECONDS", 1)
+    response = await client.post("/api/v1/events/", json={"name": "New event", **EVENT})
+    assert READ_PRIMARY_COOKIE in response.cookies
+    writer_cookies = dict(client.cookies)
+
+    # Another client caches the listing from a replica that has not caught up
+    client.cookies.clear()
+    lagging = await event_names(client)
+    assert lagging in (["From replica 1"], ["From replica 2"])
+    assert await event_names(client) == lagging
+    hits = response_cache.stats["hits"]
+
+    client.cookies.update(writer_cookies)
+    assert await event_names(client) == ["New event"]
+    assert await event_names(client) == ["New event"]
+    assert response_cache.stats["hits"] == hits + 1
+
+    # Once the replicas have had time to catch up, their cached reads are dropped
+    client.cookies.clear()
+    misses = response_cache.stats["misses"]
+    await asyncio.sleep(1.1)
+    await event_names(client)
+    assert response_cache.stats["misses"] == misses + 1
+
+
+async def test_failed_replicas_fall_back_to_the_primary(client: AsyncClient, db, replicas, tmp_path, monkeypatch):
+    # Every read must reach a database to show where it was routed
+    monkeypatch.setattr(response_cache, "backend", None)
+    await client.post("/api/v1/events/", json={"name": "On the primary", **EVENT})
+    client.cookies.clear()
+
+    # One replica unreachable: taken out on first use, the other one serves
+    broken = Replica("replica-2", create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'x.db'}"))
+    replicas[1] = broken
+    names = [await event_names(client) for _ in range(4)]
+    assert not broken.healthy
+    assert names.count(["On the primary"]) <= 1
+    assert names.count(["From replica 1"]) >= 3
+
+    replicas[0].healthy = False
+    assert await event_names(client) == ["On the primary"]
+
+    # The health check puts a replica that answers again back in rotation
+    await database_router.check_health()
+    assert replicas[0].healthy and not broken.healthy
+
+
+def test_router_skips_unhealthy_replicas():
+    one, two, three = (Replica(f"replica-{i}", create_async_engine("sqlite+aiosqlite://")) for i in (1, 2, 3))
+    router = DatabaseRouter([one, two, three])
+    assert [router.pick().name for _ in range(4)] == ["replica-1", "replica-2", "replica-3", "replica-1"]
+    two.healthy = False
+    assert [router.pick().name for _ in range(3)] == ["replica-3", "replica-1", "replica-3"]
+    one.healthy = three.healthy = False
+    assert router.pick() is None
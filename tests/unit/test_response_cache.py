@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+from httpx import AsyncClient
+
+from app.services.image_db_service import ImageService
+from app.services.response_cache_service import MemoryResponseCacheBackend, response_cache
+
+EVENT = {
+    "name": "Sunday Service",
+    "description": "Weekly service",
+    "day": "Sunday",
+    "time": "10:00",
+    "location": "Main Sanctuary",
+}
+
+
+async def test_event_responses_are_cached_and_revalidated(client: AsyncClient, db):
+    created = (await client.post("/api/v1/events/", json=EVENT)).json()
+    url = f"/api/v1/events/{created['id']}"
+
+    first = await client.get(url)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    hits = response_cache.stats["hits"]
+    second = await client.get(url, headers={"If-None-Match": etag})
+    assert (second.status_code, second.content) == (304, b"")
+    assert response_cache.stats["hits"] == hits + 1
+
+    # Updating the event drops its cached responses, and only those
+    other = (await client.post("/api/v1/events/", json={**EVENT, "name": "Bible Study"})).json()
+    other_etag = (await client.get(f"/api/v1/events/{other['id']}")).headers["etag"]
+    await client.put(url, json={"name": "Easter Service"})
+
+    updated = await client.get(url, headers={"If-None-Match": etag})
+    assert updated.status_code == 200
+    assert updated.json()["name"] == "Easter Service"
+    assert updated.headers["etag"] != etag
+    names = {event["name"] for event in (await client.get("/api/v1/events/")).json()}
+    assert names == {"Easter Service", "Bible Study"}
+    hits = response_cache.stats["hits"]
+    assert (await client.get(f"/api/v1/events/{other['id']}", headers={"If-None-Match": other_etag})).status_code == 304
+    assert response_cache.stats["hits"] == hits + 1
+
+    await client.delete(url)
+    assert (await client.get(url)).status_code == 404
+
+
+async def test_image_listings_are_invalidated_by_writes(client: AsyncClient, db, storage):
+    service = ImageService(db)
+    image = await service.create_image({
+        "description": "Choir",
+        "image_url": "/images/choir.png",
+        "uploadthing_key": "choir.png",
+        "upload_date": datetime(2025, 4, 20, tzinfo=timezone.utc),
+    })
+    assert [i["description"] for i in (await client.get("/api/v1/images/")).json()] == ["Choir"]
+    grouped = await client.get("/api/v1/images/grouped")
+    assert (await client.get("/api/v1/images/grouped", headers={"If-None-Match": grouped.headers["etag"]})).status_code == 304
+
+    await client.put(f"/api/v1/images/{image.id}", json={"description": "Youth choir"})
+    assert [i["description"] for i in (await client.get("/api/v1/images/")).json()] == ["Youth choir"]
+    assert (await client.get("/api/v1/images/grouped", headers={"If-None-Match": grouped.headers["etag"]})).status_code == 200
+
+    await client.delete(f"/api/v1/images/{image.id}")
+    assert (await client.get("/api/v1/images/")).json() == []
+    assert (await client.get("/api/v1/images/grouped")).json()["year"] == {}
+
+
+async def test_backend_failures_do_not_fail_requests(client: AsyncClient, db, monkeypatch):
+    class BrokenBackend(MemoryResponseCacheBackend):
+        async def get(self, key):
+            raise ConnectionError("cache is down")
+
+    monkeypatch.setattr(response_cache, "backend", BrokenBackend(10))
+    await client.post("/api/v1/events/", json=EVENT)
+    response = await client.get("/api/v1/events/")
+    assert response.status_code == 200
+    assert [event["name"] for event in response.json()] == ["Sunday Service"]
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+from httpx import AsyncClient
+
+from app.main import app
+from app.schemas.event import Event as EventSchema, EventCreate
+from app.schemas.image import GroupedImagesResponse, Image as ImageSchema
+from app.services.event_service import EventService
+from app.services.image_db_service import ImageService
+
+
+async def add_image(db):
+    return await ImageService(db).create_image(
+        {
+            "description": "Harvest festival",
+            "image_url": "/images/harvest.jpg",
+            "uploadthing_key": "harvest.jpg",
+            "mime_type": "image/jpeg",
+            "width": 1600,
+            "height": 900,
+            "upload_date": datetime(2025, 9, 28, 11, 30, tzinfo=timezone.utc),
+        },
+        [
+            {
+                "name": f"w{width}",
+                "storage_key": f"harvest-w{width}.{ext}",
+                "image_url": f"/images/harvest-w{width}.{ext}",
+                "width": width,
+                "height": width * 9 // 16,
+                "mime_type": f"image/{mime}",
+            }
+            for width, ext, mime in [(800, "jpg", "jpeg"), (320, "jpg", "jpeg"), (800, "webp", "webp")]
+        ],
+    )
+
+
+async def test_list_responses_match_the_response_models(client: AsyncClient, db, storage):
+    image = await add_image(db)
+    expected = ImageSchema.model_validate(image).model_dump(mode="json")
+
+    assert (await client.get("/api/v1/images/")).json() == [expected]
+    assert (await client.get("/api/v1/images/", params={"skip": 0})).json() == [expected]
+    assert expected["srcset"] == "/images/harvest-w320.jpg 320w, /images/harvest-w800.jpg 800w, /images/harvest.jpg 1600w"
+
+    grouped = (await client.get("/api/v1/images/grouped")).json()
+    assert grouped == {
+        "year": {"2025": {"september": {"images": [expected], "total": 1, "next_cursor": None}}},
+        "next_cursor": None,
+    }
+    assert GroupedImagesResponse.model_validate(grouped).model_dump(mode="json") == grouped
+
+    event = await EventService(db).create_event(EventCreate(
+        name="Sunday Service", description="Weekly service", day="Sunday", time="10:00", location="Main Sanctuary",
+    ))
+    assert (await client.get("/api/v1/events/")).json() == [EventSchema.model_validate(event).model_dump(mode="json")]
+
+
+def test_openapi_schema_keeps_the_response_models():
+    paths = app.openapi()["paths"]
+
+    def schema(path):
+        return paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+    assert schema("/api/v1/images/")["items"] == {"$ref": "#/components/schemas/Image"}
+    assert schema("/api/v1/events/")["items"] == {"$ref": "#/components/schemas/Event"}
+    assert schema("/api/v1/images/grouped") == {"$ref": "#/components/schemas/GroupedImagesResponse"}
@@ -0,0 +1,78 @@
+from io import BytesIO
+
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.services.image_db_service import ImageService
+
+CONTENT = bytes(range(256)) * 4
+
+
+async def _create_image(db, storage) -> str:
+    res = await storage.upload_file(BytesIO(CONTENT), "photo.png")
+    await ImageService(db).create_image({
+        "description": "Sunday service",
+        "image_url": res["url"],
+        "uploadthing_key": res["key"],
+        "file_size": len(CONTENT),
+        "mime_type": "image/png",
+        "width": 1,
+        "height": 1,
+    })
+    return res["key"]
+
+
+async def test_serve_full_image(client: AsyncClient, db, storage):
+    key = await _create_image(db, storage)
+    response = await client.get(f"/api/v1/images/serve/{key}")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{key}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert "last-modified" in response.headers
+
+
+async def test_serve_range(client: AsyncClient, db, storage):
+    key = await _create_image(db, storage)
+    response = await client.get(f"/api/v1/images/serve/{key}", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    response = await client.get(f"/api/v1/images/serve/{key}", headers={"Range": "bytes=-5"})
+    assert response.content == CONTENT[-5:]
+
+    response = await client.get(f"/api/v1/images/serve/{key}", headers={"Range": "bytes=5000-"})
+    assert response.status_code == 416
+
+
+async def test_conditional_get_skips_storage(client: AsyncClient, db, storage):
+    key = await _create_image(db, storage)
+    await storage.delete(key)
+    response = await client.get(f"/api/v1/images/serve/{key}", headers={"If-None-Match": f'"{key}"'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+async def test_unknown_key(client: AsyncClient, db, storage):
+    response = await client.get("/api/v1/images/serve/missing.png")
+    assert response.status_code == 404
+
+
+async def test_redirect_mode(client: AsyncClient, db, storage, monkeypatch):
+    key = await _create_image(db, storage)
+    monkeypatch.setattr(settings, "IMAGE_SERVE_MODE", "redirect")
+
+    # The local backend cannot serve clients directly, so bytes are proxied
+    response = await client.get(f"/api/v1/images/serve/{key}", follow_redirects=False)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+    monkeypatch.setattr(settings, "IMAGE_PUBLIC_BASE_URL", "https://cdn.example.com/file/bucket/")
+    response = await client.get(f"/api/v1/images/serve/{key}", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == f"https://cdn.example.com/file/bucket/{key}"
+    assert "immutable" in response.headers["cache-control"]
+
+    response = await client.get("/api/v1/images/serve/missing.png", follow_redirects=False)
+    assert response.status_code == 404
@@ -0,0 +1,49 @@
+import pytest
+from b2sdk.v2.exception import InvalidAuthToken
+
+from app.services.storage_service import StorageService
+
+
+def _storage(monkeypatch) -> StorageService:
+    storage = StorageService()
+
+    def fake_authorize():
+        storage.bucket = object()
+        storage.stats["auth_refreshes"] += 1
+
+    monkeypatch.setattr(storage, "authorize", fake_authorize)
+    return storage
+
+
+def test_call_authorizes_lazily(monkeypatch):
+    storage = _storage(monkeypatch)
+    assert storage._call(lambda: "ok") == "ok"
+    assert storage.stats["auth_refreshes"] == 1
+    assert storage._call(lambda: "ok") == "ok"
+    assert storage.stats["auth_refreshes"] == 1
+
+
+def test_call_retries_once_on_expired_token(monkeypatch):
+    storage = _storage(monkeypatch)
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise InvalidAuthToken("expired", "expired_auth_token")
+        return "ok"
+
+    assert storage._call(operation) == "ok"
+    assert len(attempts) == 2
+    assert storage.stats["auth_expired_retries"] == 1
+
+
+def test_call_gives_up_after_one_retry(monkeypatch):
+    storage = _storage(monkeypatch)
+
+    def operation():
+        raise InvalidAuthToken("expired", "expired_auth_token")
+
+    with pytest.raises(InvalidAuthToken):
+        storage._call(operation)
+    assert storage.stats["auth_expired_retries"] == 1
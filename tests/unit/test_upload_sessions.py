@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+
+from httpx import AsyncClient
+from PIL import Image as PILImage
+from sqlalchemy import update
+
+from app.models.upload_session import UploadSession
+from app.services.upload_session_service import UploadSessionService
+
+
+def make_png(width: int = 600, height: int = 400) -> bytes:
+    output = BytesIO()
+    PILImage.new("RGB", (width, height), (30, 90, 160)).save(output, format="PNG")
+    return output.getvalue()
+
+
+async def start_session(client: AsyncClient, content_type: str = "image/png") -> dict:
+    response = await client.post(
+        "/api/v1/images/uploads/",
+        json={"filename": "choir.png", "content_type": content_type, "description": "Choir"},
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def send(client: AsyncClient, session: dict, content: bytes):
+    return await client.request(
+        session["upload_method"], session["upload_url"], content=content, headers=session["upload_headers"]
+    )
+
+
+async def test_direct_upload_and_finalize(client: AsyncClient, db, storage):
+    session = await start_session(client)
+    assert (await send(client, session, make_png())).status_code == 204
+
+    response = await client.post(f"/api/v1/images/uploads/{session['id']}/finalize")
+    assert response.status_code == 201
+    image = response.json()
+    # Stored under a key of its own; the staging copy is gone
+    assert image["uploadthing_key"] != session["storage_key"]
+    assert await storage.stat(session["storage_key"]) is None
+    assert (image["width"], image["height"], image["mime_type"]) == (600, 400, "image/png")
+
+    served = await client.get(f"/api/v1/images/serve/{image['uploadthing_key']}")
+    assert served.status_code == 200
+    # The link no longer accepts uploads, and could not change the image anyway
+    assert (await send(client, session, b"not an image")).status_code == 404
+    assert (await client.get(f"/api/v1/images/serve/{image['uploadthing_key']}")).content == served.content
+    # A session can only be finalized once
+    response = await client.post(f"/api/v1/images/uploads/{session['id']}/finalize")
+    assert response.status_code == 404
+
+
+async def test_finalize_rejects_missing_and_invalid_uploads(client: AsyncClient, db, storage):
+    session = await start_session(client, content_type="image/jpeg")
+    response = await client.post(f"/api/v1/images/uploads/{session['id']}/finalize")
+    assert response.status_code == 400
+
+    await send(client, session, make_png())
+    response = await client.post(f"/api/v1/images/uploads/{session['id']}/finalize")
+    assert response.status_code == 400
+    assert await storage.stat(session["storage_key"]) is None
+
+
+async def test_upload_link_must_be_signed(client: AsyncClient, db, storage):
+    session = await start_session(client)
+    session["upload_url"] = session["upload_url"].replace("signature=", "signature=0")
+    assert (await send(client, session, make_png())).status_code == 403
+
+
+async def test_expired_sessions_are_reaped(client: AsyncClient, db, storage):
+    session = await start_session(client)
+    await send(client, session, make_png())
+    await db.execute(
+        update(UploadSession).values(expires_at=datetime.now(timezone.utc) - timedelta(hours=1))
+    )
+    await db.commit()
+
+    assert await UploadSessionService(db, storage).reap_expired() == 1
+    assert await storage.stat(session["storage_key"]) is None
+    response = await client.post(f"/api/v1/images/uploads/{session['id']}/finalize")
+    assert response.status_code == 404